@@ -0,0 +1,389 @@
+import os
+import itertools
+from collections import namedtuple
+from benchmarks.synthetic import synthetic_ohlcv
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+# setup: fn(n_bars, workdir) -> zero-argument callable that is timed
+Case = namedtuple("Case", "name module setup sizes")
+
+CASES = {}
+
+
+class SkipCase(Exception):
+    """Raised by a setup when the case cannot run here (e.g. no trained model)."""
+
+
+def bench(name, sizes=SIZES):
+    """Decorator adding a benchmark setup to the registry; `name` is "module.what"."""
+    def wrap(setup):
+        CASES[name] = Case(name, name.split(".")[0], setup, tuple(sizes))
+        return setup
+    return wrap
+
+
+def _sr(df):
+    from src.sr_levels import identify_sr_levels
+    return identify_sr_levels(df)
+
+
+def _csv(df, workdir, name="EURUSD_M1_bench.csv"):
+    path = os.path.join(workdir, name)
+    df.rename_axis("Datetime").to_csv(path)
+    return path
+
+
+# --- Indicators and analysis ---
+
+@bench("indicators.compute_indicators")
+def _compute_indicators(n, workdir):
+    from src.indicators import INDICATORS, compute_indicators
+    df = synthetic_ohlcv(n)
+    keys = [(name, ()) for name in INDICATORS if name != "pattern_signal"]
+    return lambda: compute_indicators(df, keys, {})
+
+
+@bench("indicators.pattern_signal")
+def _pattern_signal(n, workdir):
+    from src.indicators import pattern_signal
+    df = synthetic_ohlcv(n)
+    return lambda: pattern_signal(df)
+
+
+@bench("swing_points.SwingPointIndex")
+def _swing_points(n, workdir):
+    from src.swing_points import SwingPointIndex
+    df = synthetic_ohlcv(n)
+
+    def run():
+        swings = SwingPointIndex(df)
+        swings.peaks('Close', 5)
+        swings.troughs('Close', 5)
+    return run
+
+
+@bench("sr_levels.identify_sr_levels")
+def _identify_sr_levels(n, workdir):
+    df = synthetic_ohlcv(n)
+    return lambda: _sr(df)
+
+
+@bench("chart_patterns.scan_double_top_bottom")
+def _scan_double_top_bottom(n, workdir):
+    from src.chart_patterns import scan_double_top_bottom
+    df = synthetic_ohlcv(n)
+    return lambda: scan_double_top_bottom(df)
+
+
+@bench("chart_patterns.detect_double_top_bottom")
+def _detect_double_top_bottom(n, workdir):
+    from src.chart_patterns import detect_double_top_bottom
+    df = synthetic_ohlcv(n)
+    return lambda: detect_double_top_bottom(df)
+
+
+@bench("trend_analyzer.detect_trend")
+def _detect_trend(n, workdir):
+    from src.trend_analyzer import detect_trend
+    df = synthetic_ohlcv(n)
+    return lambda: detect_trend(df)
+
+
+@bench("trend_analyzer.detect_trend_series")
+def _detect_trend_series(n, workdir):
+    from src.trend_analyzer import detect_trend_series
+    df = synthetic_ohlcv(n)
+    return lambda: detect_trend_series(df)
+
+
+@bench("indicator_analysis.analyze_indicators")
+def _analyze_indicators(n, workdir):
+    from src.indicator_analysis import analyze_indicators
+    df = synthetic_ohlcv(n)
+    return lambda: analyze_indicators(df)
+
+
+@bench("risk_manager.suggest_trade_levels_batch")
+def _suggest_trade_levels_batch(n, workdir):
+    from src.risk_manager import suggest_trade_levels_batch
+    from src.trend_analyzer import detect_trend_series
+    df = synthetic_ohlcv(n)
+    trend = detect_trend_series(df)["trend"]
+    return lambda: suggest_trade_levels_batch(df, trend)
+
+
+@bench("pipeline.AnalysisPipeline")
+def _analysis_pipeline(n, workdir):
+    from src.pipeline import AnalysisPipeline
+    df = synthetic_ohlcv(n)
+    pipeline = AnalysisPipeline()
+    return lambda: pipeline.run(df)
+
+
+@bench("pipeline.AnalysisPipeline[bars]")
+def _analysis_pipeline_bars(n, workdir):
+    from src.bars import Bars
+    from src.pipeline import AnalysisPipeline
+    bars = Bars.from_frame(synthetic_ohlcv(n))
+    pipeline = AnalysisPipeline()
+    return lambda: pipeline.run(bars)
+
+
+@bench("bars.Bars.recent")
+def _bars_recent(n, workdir):
+    from src.bars import Bars
+    df = synthetic_ohlcv(n)
+    return lambda: Bars.from_frame(df).recent("2D")
+
+
+# --- Machine learning ---
+
+@bench("ml_model.extract_features", sizes=(10_000, 100_000))
+def _extract_features(n, workdir):
+    from src.ml_model import extract_features
+    df = synthetic_ohlcv(n)
+    sr = _sr(df)
+    return lambda: extract_features(df, sr["support"], sr["resistance"])
+
+
+@bench("compiled_model.predict_proba_compiled")
+def _predict_proba_compiled(n, workdir):
+    from src.ml_model import MODEL_PATH, FEATURE_COLS, extract_features
+    from src.compiled_model import export_compiled_model, load_compiled_model, predict_proba_compiled
+    if not os.path.isfile(MODEL_PATH):
+        raise SkipCase(f"no trained model at {MODEL_PATH}")
+    path = os.path.join(workdir, "model.npz")
+    if not os.path.isfile(path):
+        try:
+            export_compiled_model(out_path=path)
+        except Exception as e:
+            raise SkipCase(f"cannot load {MODEL_PATH}: {type(e).__name__}")
+    compiled = load_compiled_model(path)
+    df = synthetic_ohlcv(min(n, 100_000))
+    X = extract_features(df, [], [])[FEATURE_COLS].to_numpy()
+    while len(X) < n:
+        X = X.repeat(2, axis=0)
+    X = X[:n]
+    return lambda: predict_proba_compiled(compiled, X)
+
+
+@bench("dataset_builder.build_file_shards", sizes=(10_000, 100_000))
+def _build_file_shards(n, workdir):
+    from src.dataset_builder import build_file_shards
+    path = _csv(synthetic_ohlcv(n), workdir)
+    out_dir = os.path.join(workdir, "shards")
+    os.makedirs(out_dir, exist_ok=True)
+    return lambda: build_file_shards(path, "EURUSD", "M1", out_dir)
+
+
+# --- Strategies and backtests ---
+
+@bench("strategy_engine.evaluate_rules")
+def _evaluate_rules(n, workdir):
+    from src.strategy_engine import evaluate_rules
+    df = synthetic_ohlcv(n)
+    rules = {"entry": "MACD > Signal and RSI < 30", "exit": "RSI > 50 or SL or TP"}
+    return lambda: evaluate_rules(df, rules, {})
+
+
+@bench("strategy_engine.run_custom_strategy")
+def _run_custom_strategy(n, workdir):
+    from src.strategy_engine import run_custom_strategy
+    df = synthetic_ohlcv(n)
+    rules = {"entry": "MACD > Signal and RSI < 30", "exit": "RSI > 50 or SL or TP"}
+    return lambda: run_custom_strategy(df, rules)
+
+
+@bench("backtester.run_backtest")
+def _run_backtest(n, workdir):
+    from src.backtester import run_backtest
+    df = synthetic_ohlcv(n)
+    return lambda: run_backtest(df, strategy="MA Crossover", log=False)
+
+
+@bench("backtester.run_backtest[trailing]")
+def _run_backtest_trailing(n, workdir):
+    from src.backtester import run_backtest
+    df = synthetic_ohlcv(n)
+    params = {"sl_atr": 1.5, "tp_atr": 3.0, "trail_atr": 1.0, "max_bars": 240}
+    return lambda: run_backtest(df, strategy="MA Crossover", params=params, log=False)
+
+
+@bench("backtester.run_multi_backtest")
+def _run_multi_backtest(n, workdir):
+    from src.backtester import run_multi_backtest
+    df = synthetic_ohlcv(n)
+    return lambda: run_multi_backtest(df, log=False)
+
+
+@bench("backtester.run_multi_backtest[processes]", sizes=(100_000, 1_000_000))
+def _run_multi_backtest_processes(n, workdir):
+    from src.backtester import run_multi_backtest
+    df = synthetic_ohlcv(n)
+    return lambda: run_multi_backtest(df, log=False, max_workers=4)
+
+
+@bench("backtester.backtest_summary")
+def _backtest_summary(n, workdir):
+    from src.backtester import backtest_summary
+    df = synthetic_ohlcv(n)
+    return lambda: backtest_summary(df, "RSI Reversal")
+
+
+@bench("backtester.optimize_ma_crossover", sizes=(10_000, 100_000))
+def _optimize_ma_crossover(n, workdir):
+    from src.backtester import optimize_ma_crossover
+    df = synthetic_ohlcv(n)
+    return lambda: optimize_ma_crossover(df)
+
+
+@bench("backtester.optimize_rsi_strategy", sizes=(10_000, 100_000))
+def _optimize_rsi_strategy(n, workdir):
+    from src.backtester import optimize_rsi_strategy
+    df = synthetic_ohlcv(n)
+    return lambda: optimize_rsi_strategy(df)
+
+
+@bench("backtester.optimize_rsi_strategy[processes]", sizes=(100_000,))
+def _optimize_rsi_strategy_processes(n, workdir):
+    from src.backtester import optimize_rsi_strategy
+    df = synthetic_ohlcv(n)
+    return lambda: optimize_rsi_strategy(df, max_workers=4)
+
+
+@bench("shared_bars.share_bars")
+def _share_bars(n, workdir):
+    from src.shared_bars import share_bars
+    df = synthetic_ohlcv(n)
+    return lambda: share_bars(df).release()
+
+
+@bench("intrabar.IntrabarResolver", sizes=(100_000, 1_000_000))
+def _intrabar(n, workdir):
+    # n is the number of lower-timeframe (M1) bars; the backtest runs on M15
+    from src.backtester import run_backtest
+    from src.intrabar import IntrabarResolver
+    m1 = synthetic_ohlcv(n)
+    m15 = m1.resample("15min").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last",
+                                    "Volume": "sum"}).dropna()
+    params = {"sl_pct": 0.1, "tp_pct": 0.1}
+
+    def run():
+        run_backtest(m15, strategy="ATR Breakout", params=params, log=False, intrabar=IntrabarResolver(m1))
+    return run
+
+
+def _trades(n):
+    from src.backtester import run_backtest
+    return run_backtest(synthetic_ohlcv(n), strategy="MACD Signal", log=False)["trades"]
+
+
+@bench("ledger.TradeLedger.to_frame")
+def _ledger_to_frame(n, workdir):
+    trades = _trades(n)
+    return trades.to_frame
+
+
+@bench("metrics.backtest_metrics")
+def _backtest_metrics(n, workdir):
+    from src.metrics import backtest_metrics
+    trades = _trades(n)
+    return lambda: backtest_metrics(trades)
+
+
+@bench("monte_carlo.monte_carlo_trades", sizes=(10_000, 100_000))
+def _monte_carlo_trades(n, workdir):
+    from src.monte_carlo import monte_carlo_trades
+    trades = _trades(n)
+    return lambda: monte_carlo_trades(trades, n_paths=2000, seed=0)
+
+
+@bench("walk_forward.walk_forward_optimize", sizes=(10_000, 100_000))
+def _walk_forward(n, workdir):
+    from src.walk_forward import walk_forward_optimize
+    df = synthetic_ohlcv(n)
+    grid = {"fast": [5, 10, 20], "slow": [30, 50, 100]}
+    return lambda: walk_forward_optimize(df, "MA Crossover", grid, train_bars=n // 5, test_bars=n // 20,
+                                         max_workers=1)
+
+
+@bench("optimizer.successive_halving", sizes=(10_000, 100_000))
+def _successive_halving(n, workdir):
+    from src.optimizer import successive_halving
+    df = synthetic_ohlcv(n)
+    return lambda: successive_halving(df, "MA Crossover", budget=40, min_bars=n // 9)
+
+
+@bench("portfolio_backtester.run_portfolio_backtest", sizes=(10_000, 100_000))
+def _portfolio(n, workdir):
+    from src.portfolio_backtester import run_portfolio_backtest
+    from benchmarks.synthetic import symbol_seed
+    frames = {s: synthetic_ohlcv(n, seed=symbol_seed(s)) for s in ("EURUSD", "GBPUSD", "AUDUSD")}
+    return lambda: run_portfolio_backtest(frames, strategies=("MA Crossover", "RSI Reversal"))
+
+
+# --- Data access (MT5 / Twelve Data are stubbed by the runner) ---
+
+@bench("data_handler.load_forex_data", sizes=(10_000, 100_000))
+def _load_forex_data(n, workdir):
+    from src.data_handler import load_forex_data
+    path = _csv(synthetic_ohlcv(n), workdir)
+    return lambda: load_forex_data(path)
+
+
+@bench("mt5_fetcher.fetch_mt5_data", sizes=(10_000, 100_000))
+def _fetch_mt5_data(n, workdir):
+    from src.mt5_fetcher import fetch_mt5_data
+    return lambda: fetch_mt5_data("EURUSD", "M1", bars=n)
+
+
+@bench("live_fetcher.fetch_live_forex", sizes=(5_000,))
+def _fetch_live_forex(n, workdir):
+    from src.live_fetcher import fetch_live_forex
+    return lambda: fetch_live_forex("EUR/USD", "1min", outputsize=n)
+
+
+@bench("multi_timeframe.analyze_confluence", sizes=(500,))
+def _analyze_confluence(n, workdir):
+    from src.multi_timeframe import analyze_confluence
+    return lambda: analyze_confluence("EURUSD")
+
+
+# --- Storage ---
+
+@bench("journal.log_trades", sizes=(10_000, 100_000))
+def _log_trades(n, workdir):
+    import src.journal as journal
+    rows = [(1.1, 1.09, 1.12, "win", 2.0, "2024-01-01 00:00")] * n
+    # A fresh database per round, so every round inserts into an empty table
+    names = itertools.count()
+
+    def run():
+        journal.JOURNAL_DB = os.path.join(workdir, f"log_{n}_{next(names)}.db")
+        journal.log_trades("MA Crossover", rows, "bench")
+    return run
+
+
+@bench("journal.query_trades", sizes=(10_000, 100_000))
+def _query_trades(n, workdir):
+    import src.journal as journal
+    journal.JOURNAL_DB = os.path.join(workdir, f"query_{n}.db")
+    if not journal.has_run("bench"):
+        dates = [f"2024-01-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}" for i in range(n)]
+        journal.log_trades("MA Crossover", [(1.1, 1.09, 1.12, "win" if i % 3 else "loss", 2.0, d)
+                                            for i, d in enumerate(dates)], "bench")
+    db = journal.JOURNAL_DB
+
+    def run():
+        journal.JOURNAL_DB = db
+        for page in range(10):
+            journal.query_trades(strategy="MA Crossover", result="win", page=page, page_size=100)
+    return run
+
+
+@bench("result_cache.frame_digest")
+def _frame_digest(n, workdir):
+    from src.result_cache import frame_digest
+    df = synthetic_ohlcv(n)
+    return lambda: frame_digest(df)
@@ -0,0 +1,173 @@
+"""
+Benchmark runner: times every case in benchmarks/cases.py at each data size,
+appends the results to a JSON history and flags regressions against the
+previous run on the same machine.
+
+    python -m benchmarks.run                      # all cases, all sizes
+    python -m benchmarks.run -k backtester --sizes 10000 100000
+    python -m benchmarks.run --fail-on-regression # exit 1 when something got slower
+
+Runs offline: MetaTrader5 and twelvedata are replaced with synthetic stubs,
+the result cache is disabled and the journal writes to a temporary database.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.stubs import install_offline_stubs
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+THRESHOLD = 0.25
+# Changes below this many seconds are timer noise, not regressions
+NOISE_FLOOR = 0.0005
+
+
+def machine_id() -> str:
+    return f"{platform.node()}|{platform.machine()}|{platform.python_version()}"
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def time_call(fn, min_rounds=3, max_rounds=50, min_time=1.0) -> dict:
+    """Warm up once, then time `fn` until both `min_rounds` and `min_time` seconds are reached."""
+    fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_rounds and (len(times) < min_rounds or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+
+
+def load_history(path=HISTORY_FILE) -> list:
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def previous_results(history, machine) -> dict:
+    """(case, bars) -> latest recorded median from earlier runs on `machine`."""
+    latest = {}
+    for run in history:
+        if run.get("machine") != machine:
+            continue
+        for r in run["results"]:
+            latest[(r["case"], r["bars"])] = r["median"]
+    return latest
+
+
+def flag_regressions(results, previous, threshold=THRESHOLD) -> list:
+    """Mark each result with its change vs. `previous`; returns the regressed ones."""
+    regressed = []
+    for r in results:
+        before = previous.get((r["case"], r["bars"]))
+        r["change"] = (r["median"] / before - 1) if before else None
+        r["regression"] = bool(before and r["median"] - before > NOISE_FLOOR and r["change"] > threshold)
+        if r["regression"]:
+            regressed.append(r)
+    return regressed
+
+
+def run_cases(cases, sizes=None, max_bars=None, min_time=1.0, workdir=None, report=print) -> list:
+    import src.journal as journal
+    import src.result_cache as result_cache
+    from benchmarks.cases import SkipCase
+
+    # Nothing may come from (or go to) the result cache or the real journal
+    result_cache.ENABLED = False
+    journal.JOURNAL_DB = os.path.join(workdir, "journal.db")
+    journal.JOURNAL_FILE = os.path.join(workdir, "no_legacy_journal.csv")
+
+    results = []
+    for case in cases:
+        for n in case.sizes:
+            if (sizes and n not in sizes) or (max_bars and n > max_bars):
+                continue
+            try:
+                stats = time_call(case.setup(n, workdir), min_time=min_time)
+            except SkipCase as e:
+                report(f"  {case.name:<48} {n:>9}  skipped ({e})")
+                continue
+            except ImportError as e:
+                report(f"  {case.name:<48} {n:>9}  skipped (missing {e.name})")
+                continue
+            except Exception as e:
+                # One broken case should not stop the rest of the suite
+                report(f"  {case.name:<48} {n:>9}  FAILED ({type(e).__name__}: {e})")
+                continue
+            results.append({"case": case.name, "module": case.module, "bars": n, **stats})
+            report(f"  {case.name:<48} {n:>9}  {stats['median'] * 1000:>10.2f} ms  ({stats['rounds']} rounds)")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis and backtest hot paths.")
+    parser.add_argument("-k", "--filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--sizes", type=int, nargs="*", help="only these bar counts")
+    parser.add_argument("--max-bars", type=int, help="skip sizes above this")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent timing each case")
+    parser.add_argument("--history", default=HISTORY_FILE, help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="regression threshold (0.25 = 25%% slower)")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on regressions")
+    args = parser.parse_args(argv)
+
+    install_offline_stubs()
+    from benchmarks.cases import CASES
+
+    cases = [c for name, c in CASES.items() if args.filter in name]
+    workdir = tempfile.mkdtemp(prefix="frexai-bench-")
+    try:
+        results = run_cases(cases, args.sizes, args.max_bars, args.min_time, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    history = load_history(args.history)
+    machine = machine_id()
+    regressed = flag_regressions(results, previous_results(history, machine), args.threshold)
+
+    print(f"\n{'case':<50} {'bars':>9} {'median ms':>12} {'change':>9}")
+    for r in results:
+        change = f"{r['change'] * 100:+.1f}%" if r["change"] is not None else "new"
+        flag = "  ⚠️ REGRESSION" if r["regression"] else ""
+        print(f"{r['case']:<50} {r['bars']:>9} {r['median'] * 1000:>12.2f} {change:>9}{flag}")
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "machine": machine,
+            "results": results,
+        })
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=1)
+
+    if regressed:
+        print(f"\n❌ {len(regressed)} regression(s) beyond {args.threshold:.0%}.")
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
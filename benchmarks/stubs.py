@@ -0,0 +1,56 @@
+import sys
+import types
+import numpy as np
+from benchmarks.synthetic import synthetic_ohlcv, symbol_seed
+
+TIMEFRAME_MINUTES = {"M1": 1, "M5": 5, "M15": 15, "M30": 30, "H1": 60, "H4": 240, "D1": 1440}
+
+
+def _mt5_module():
+    mt5 = types.ModuleType("MetaTrader5")
+    for name, minutes in TIMEFRAME_MINUTES.items():
+        setattr(mt5, f"TIMEFRAME_{name}", minutes)
+    mt5.initialize = lambda *args, **kwargs: True
+    mt5.shutdown = lambda: None
+
+    def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+        df = synthetic_ohlcv(count, seed=symbol_seed(symbol) + timeframe, freq=f"{timeframe}min")
+        rates = np.zeros(count, dtype=[("time", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+                                       ("close", "f8"), ("tick_volume", "i8"), ("spread", "i4"),
+                                       ("real_volume", "i8")])
+        rates["time"] = df.index.values.astype("datetime64[s]").astype(np.int64)
+        for col in ("Open", "High", "Low", "Close"):
+            rates[col.lower()] = df[col].to_numpy()
+        rates["tick_volume"] = df["Volume"].to_numpy()
+        return rates
+
+    mt5.copy_rates_from_pos = copy_rates_from_pos
+    return mt5
+
+
+def _twelvedata_module():
+    td = types.ModuleType("twelvedata")
+
+    class _TimeSeries:
+        def __init__(self, symbol, interval, outputsize):
+            freq = interval.replace("day", "D").replace("week", "W")
+            self.frame = synthetic_ohlcv(outputsize, seed=symbol_seed(symbol), freq=freq)
+
+        def as_pandas(self):
+            return self.frame.rename(columns=str.lower)
+
+    class TDClient:
+        def __init__(self, apikey=None, **kwargs):
+            self.apikey = apikey
+
+        def time_series(self, symbol, interval="1min", outputsize=100, **kwargs):
+            return _TimeSeries(symbol, interval, outputsize)
+
+    td.TDClient = TDClient
+    return td
+
+
+def install_offline_stubs():
+    """Replace MetaTrader5 and twelvedata with offline fakes serving synthetic bars."""
+    sys.modules["MetaTrader5"] = _mt5_module()
+    sys.modules["twelvedata"] = _twelvedata_module()
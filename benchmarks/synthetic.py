@@ -0,0 +1,28 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n, seed=0, start=1.1, freq="1min", volatility=0.0004) -> pd.DataFrame:
+    """
+    Deterministic forex-like OHLCV bars: a random walk whose volatility drifts
+    between calm and busy regimes, so trends, swings and patterns all occur.
+    """
+    rng = np.random.default_rng(seed)
+    regime = np.exp(np.cumsum(rng.normal(0, 0.02, n)).clip(-1.5, 1.5))
+    close = start * np.exp(np.cumsum(rng.normal(0, volatility / start, n) * regime))
+    open_ = np.concatenate([[start], close[:-1]])
+    wick = rng.uniform(0, volatility, (2, n)) * regime
+    index = pd.date_range("2024-01-01", periods=n, freq=freq)
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + wick[0],
+        "Low": np.minimum(open_, close) - wick[1],
+        "Close": close,
+        "Volume": rng.integers(1, 500, n).astype(np.float64),
+    }, index=index)
+
+
+def symbol_seed(symbol) -> int:
+    """Stable seed per symbol, so every symbol gets its own but repeatable history."""
+    return zlib.crc32(symbol.encode())
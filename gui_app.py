@@ -9,17 +9,21 @@ from src.ml_model import predict_signal, train_model
 from datetime import datetime
 from src.mt5_fetcher import fetch_mt5_data, is_mt5_available
 from src.data_handler import load_forex_data, fetch_live_forex
-from src.trend_analyzer import detect_trend
-from src.sr_levels import identify_sr_levels
-from src.chart_patterns import detect_double_top_bottom
-from src.indicator_analysis import analyze_indicators
-from src.risk_manager import suggest_trade_levels
+from src.pipeline import AnalysisPipeline
+from src.bars import Bars
 from src.visualizer import plot_chart_with_levels
 from src.alerts import send_email_alert, send_telegram_alert
-from src.backtester import run_backtest
-from src.journal import log_trade
+from src.backtester import run_backtest, run_multi_backtest
+from src.strategies import STRATEGIES
+from src.optimizer import SEARCH_SPACES, successive_halving
+from src.monte_carlo import monte_carlo_trades
+from src.metrics import backtest_metrics
+from src.intrabar import IntrabarResolver
+from src.ledger import DATE_FORMAT
+from src.journal import log_trade, query_trades, journal_values
 from src.multi_timeframe import analyze_confluence
-from src.backtester import optimize_rsi_strategy
+from src.profiling import Profile, span
+from src.backtester import optimize_rsi_strategy, optimize_ma_crossover
 
 # --- Custom CSS Injection ---
 def inject_custom_css():
@@ -90,7 +94,9 @@ with st.sidebar:
     use_plotly = st.checkbox("Interactive Plotly Chart", value=config.get("use_plotly", True))
     show_atr = st.checkbox("Show ATR Bands", value=config.get("show_atr", True))
     show_bb = st.checkbox("Show Bollinger Bands", value=config.get("show_bollinger", True))
-    config.update({"use_plotly": use_plotly, "show_atr": show_atr, "show_bollinger": show_bb})
+    trace_memory = st.checkbox("Trace Memory per Stage (slower)", value=config.get("trace_memory", False))
+    config.update({"use_plotly": use_plotly, "show_atr": show_atr, "show_bollinger": show_bb,
+                   "trace_memory": trace_memory})
 
     source = st.radio("Data Source", ["MT5", "CSV File"], index=0)
 
@@ -144,90 +150,89 @@ if config.get("auto_run"):
 # --- Analysis Logic ---
 if run_btn:
     with st.spinner("Fetching data and running analysis..."):
-        # Load Data
-        if source == "CSV File" and uploaded_file:
-            df = pd.read_csv(uploaded_file, index_col=0, parse_dates=True)
-            inferred_tf = tf_choice = "Custom"
-            pair = uploaded_file.name
-        elif source == "MT5":
-            if not is_mt5_available():
-                st.error("MT5 is not available. Please ensure it is running.")
+        profile = Profile("analysis", trace_memory=trace_memory)
+        # Stopped however the run ends (st.stop(), errors), so tracemalloc never outlives it
+        with profile.activate():
+            # Load Data
+            if source == "CSV File" and uploaded_file:
+                with span("read_csv"):
+                    df = pd.read_csv(uploaded_file, index_col=0, parse_dates=True)
+                inferred_tf = tf_choice = "Custom"
+                pair = uploaded_file.name
+            elif source == "MT5":
+                if not is_mt5_available():
+                    st.error("MT5 is not available. Please ensure it is running.")
+                    st.stop()
+                df = fetch_mt5_data(pair, tf_choice)
+                inferred_tf = tf_choice
+            else:
+                st.error("Only MT5 and CSV File supported currently.")
                 st.stop()
-            df = fetch_mt5_data(pair, tf_choice)
-            inferred_tf = tf_choice
-        else:
-            st.error("Only MT5 and CSV File supported currently.")
-            st.stop()
-
-        df = df[df.index >= df.index.max() - pd.Timedelta(days=2)]
-        st.session_state.df = df.copy()  # For backtesting reuse
-
-        # Analysis
-        trend_result = detect_trend(df)
-        sr_result = identify_sr_levels(df)
-        patterns = detect_double_top_bottom(df)
-        indicators = analyze_indicators(df)
-        risk_info = suggest_trade_levels(
-            df=df,
-            trend=trend_result['trend'],
-            support_levels=sr_result['support'],
-            resistance_levels=sr_result['resistance'],
-            capital=capital,
-            risk_percent=1.0,
-            rr_threshold=1.5,
-            slippage=0.0002
-        )
-        st.session_state['df'] = df
-        st.session_state['sr_result'] = sr_result
-
-        if "signal_score" in risk_info and risk_info['signal_score']['value'] >= 75:
-            st.success("🚨 High-Confidence Signal Detected!")
-
-            # --- 🔊 Play Audio Alert
-            st.audio("assets/alert.mp3", format="audio/mp3", start_time=0)
-
-            # --- 💬 Popup Notification (HTML workaround)
-            st.components.v1.html("""
-                <script>
-                const msg = new SpeechSynthesisUtterance("High confidence trade signal detected");
-                window.speechSynthesis.speak(msg);
-                </script>
-                """, height=0)
-
-        # Summary Display
-        st.subheader("Analysis Summary")
-        st.write(f"**Pair:** {pair}")
-        st.write(f"**Timeframe:** {inferred_tf}")
-        st.write(f"**Trend:** {trend_result['trend']} ({trend_result['confidence']})")
-        st.write(f"**Support Levels:** {[s['price'] for s in sr_result['support']]}")
-        st.write(f"**Resistance Levels:** {[r['price'] for r in sr_result['resistance']]}")
-
-        if patterns:
-            latest = patterns[-1]
-            st.write(f"**Pattern:** {latest['name']} ({latest['status']})")
-        else:
-            st.write("**Pattern:** None")
-
-        st.write("**RSI:**", indicators['rsi'])
-        st.write("**MACD:**", indicators['macd']['status'], "-", indicators['macd']['note'])
-
-        st.write("**Trade Suggestion:**")
-        st.json(risk_info)
-
-        # Chart
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_path = f"charts/chart_{timestamp}.{'html' if use_plotly else 'png'}"
-        plot_chart_with_levels(
-            df,
-            sr_result,
-            trend_info=trend_result,
-            patterns=patterns,
-            risk_info=risk_info,
-            save_file=save_path,
-            show_atr=show_atr,
-            show_bollinger=show_bb,
-            interactive=use_plotly
-        )
+
+            # Read-only bars: the analysis, chart and every backtest below share these arrays
+            df = Bars.from_frame(df).recent("2D")
+
+            # Analysis
+            analysis = AnalysisPipeline().run(
+                df,
+                capital=capital,
+                risk_percent=1.0,
+                rr_threshold=1.5,
+                slippage=0.0002
+            )
+            trend_result, sr_result = analysis['trend'], analysis['sr']
+            patterns, indicators, risk_info = analysis['patterns'], analysis['indicators'], analysis['risk']
+            st.session_state['df'] = df
+            st.session_state['sr_result'] = sr_result
+
+            if "signal_score" in risk_info and risk_info['signal_score']['value'] >= 75:
+                st.success("🚨 High-Confidence Signal Detected!")
+
+                # --- 🔊 Play Audio Alert
+                st.audio("assets/alert.mp3", format="audio/mp3", start_time=0)
+
+                # --- 💬 Popup Notification (HTML workaround)
+                st.components.v1.html("""
+                    <script>
+                    const msg = new SpeechSynthesisUtterance("High confidence trade signal detected");
+                    window.speechSynthesis.speak(msg);
+                    </script>
+                    """, height=0)
+
+            # Summary Display
+            st.subheader("Analysis Summary")
+            st.write(f"**Pair:** {pair}")
+            st.write(f"**Timeframe:** {inferred_tf}")
+            st.write(f"**Trend:** {trend_result['trend']} ({trend_result['confidence']})")
+            st.write(f"**Support Levels:** {[s['price'] for s in sr_result['support']]}")
+            st.write(f"**Resistance Levels:** {[r['price'] for r in sr_result['resistance']]}")
+
+            if patterns:
+                latest = patterns[-1]
+                st.write(f"**Pattern:** {latest['name']} ({latest['status']})")
+            else:
+                st.write("**Pattern:** None")
+
+            st.write("**RSI:**", indicators['rsi'])
+            st.write("**MACD:**", indicators['macd']['status'], "-", indicators['macd']['note'])
+
+            st.write("**Trade Suggestion:**")
+            st.json(risk_info)
+
+            # Chart
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            save_path = f"charts/chart_{timestamp}.{'html' if use_plotly else 'png'}"
+            plot_chart_with_levels(
+                df,
+                sr_result,
+                trend_info=trend_result,
+                patterns=patterns,
+                risk_info=risk_info,
+                save_file=save_path,
+                show_atr=show_atr,
+                show_bollinger=show_bb,
+                interactive=use_plotly
+            )
 
         if use_plotly:
             with open(save_path, "r", encoding="utf-8") as f:
@@ -238,6 +243,15 @@ if run_btn:
 
         st.success("Analysis Complete ✅")
 
+        with st.expander("⏱ Stage Timings"):
+            timings = pd.DataFrame.from_dict(profile.stages(), orient="index")
+            st.dataframe(timings.rename(columns={
+                "calls": "Calls", "wall_ms": "Wall (ms)", "cpu_ms": "CPU (ms)", "peak_kb": "Peak Alloc (KB)"
+            }))
+            st.bar_chart(timings["wall_ms"])
+            st.download_button("⬇️ Download Chrome Trace", json.dumps(profile.chrome_trace()),
+                               file_name=f"trace_{timestamp}.json", mime="application/json")
+
         # Alert Section
         if st.checkbox("📨 Send Alert"):
             alert_msg = f"""🚨 Trade Signal Alert: {pair} @ {inferred_tf}
@@ -305,7 +319,7 @@ with st.expander("🧪 Optimize RSI Reversal Strategy"):
         if "df" not in st.session_state:
             st.warning("⚠️ Please run analysis first to load data.")
         else:
-            df_bt = st.session_state.df.copy()
+            df_bt = st.session_state.df
 
             
 
@@ -331,40 +345,105 @@ with st.expander("🧪 Optimize RSI Reversal Strategy"):
                 pivot = df_rsi_opt.pivot(index="Oversold", columns="Overbought", values="Winrate (%)")
                 st.dataframe(pivot.style.background_gradient(cmap="YlGnBu"))
 
+with st.expander("📐 MA Crossover Window Sweep"):
+    st.write("Backtest every short/long moving-average pair at once.")
+
+    short_range = st.slider("Short MA Windows", 2, 100, (5, 50))
+    long_range = st.slider("Long MA Windows", 10, 400, (20, 200))
+    window_step = st.slider("Window Step", 1, 20, 5)
+
+    if st.button("Run MA Sweep"):
+        if "df" not in st.session_state:
+            st.warning("⚠️ Please run analysis first to load data.")
+        else:
+            with st.spinner("Sweeping MA windows..."):
+                df_ma_opt = optimize_ma_crossover(
+                    st.session_state.df,
+                    short_windows=range(short_range[0], short_range[1] + 1, window_step),
+                    long_windows=range(long_range[0], long_range[1] + 1, window_step)
+                )
+
+            if df_ma_opt.empty:
+                st.warning("No valid combinations found.")
+            else:
+                st.success(f"✅ Tested {len(df_ma_opt)} combinations")
+                st.dataframe(df_ma_opt.sort_values("Total Profit", ascending=False))
+
+                st.subheader("🔥 Profit Heatmap (Short x Long)")
+                pivot = df_ma_opt.pivot(index="Short", columns="Long", values="Total Profit")
+                st.dataframe(pivot.style.background_gradient(cmap="RdYlGn"))
+
+with st.expander("⚡ Adaptive Strategy Optimizer"):
+    st.write("Search strategy parameters within a fixed budget: candidates are screened on recent "
+             "history and only the best are promoted to full-history backtests.")
+
+    opt_strategy = st.selectbox("Strategy to optimize", list(SEARCH_SPACES), key="opt_strategy")
+    opt_budget = st.slider("Evaluation Budget", 20, 500, 150, step=10)
+    opt_metric = st.selectbox("Optimize for", ["profit", "winrate"], key="opt_metric")
+
+    if st.button("Run Adaptive Search"):
+        if "df" not in st.session_state:
+            st.warning("⚠️ Please run analysis first to load data.")
+        else:
+            progress_bar = st.progress(0.0)
+            status = st.empty()
+
+            def report(done, total, rung, bars):
+                progress_bar.progress(done / total)
+                status.write(f"Evaluated {done}/{total} (stage {rung + 1}, {bars} bars)")
+
+            opt = successive_halving(st.session_state.df, opt_strategy, budget=opt_budget,
+                                     metric=opt_metric, progress=report)
+            if opt["best_params"] is None:
+                st.warning("No valid parameter combinations found.")
+            else:
+                bt = opt["backtest"]
+                st.success(f"✅ Best parameters after {opt['evaluations']} evaluations: {opt['best_params']}")
+                st.write(f"**Trades:** {bt['total']} | **Winrate:** {bt['winrate']}%")
+                st.dataframe(opt["results"].drop(columns="params").assign(
+                    params=opt["results"]["params"].astype(str)).sort_values(["rung", "score"], ascending=False))
+
 
 
 with st.expander("Run Backtest"):
-    strategy = st.selectbox("Select Strategy", [
-        "MA Crossover",
-        "MACD Signal",
-        "Pattern Trigger",
-        "RSI Reversal",
-        "Bollinger Bounce",
-        "ATR Breakout"
-    ])
+    strategy = st.selectbox("Select Strategy", list(STRATEGIES))
+    ltf_file = st.file_uploader("Lower-timeframe CSV for intrabar SL/TP (optional, e.g. M1)", type=["csv"], key="ltf_csv")
+    exit_cols = st.columns(4)
+    sl_atr = exit_cols[0].number_input("SL (x ATR, 0 = 1%)", 0.0, 10.0, 0.0, 0.25, key="bt_sl_atr")
+    tp_atr = exit_cols[1].number_input("TP (x ATR, 0 = 2%)", 0.0, 20.0, 0.0, 0.25, key="bt_tp_atr")
+    trail_atr = exit_cols[2].number_input("Trailing stop (x ATR, 0 = off)", 0.0, 10.0, 0.0, 0.25, key="bt_trail_atr")
+    max_bars = exit_cols[3].number_input("Max bars in trade (0 = off)", 0, 10000, 0, 1, key="bt_max_bars")
     run_bt = st.button("Run Backtest")
 
     if run_bt:
         if "df" not in st.session_state:
             st.error("❌ Please run analysis first.")
         else:
-            df_bt = st.session_state.df.copy()
-            bt_result = run_backtest(df_bt, capital=capital, strategy=strategy)
+            df_bt = st.session_state.df
+            intrabar = None
+            if ltf_file is not None:
+                # Keep the parsed lower-timeframe arrays across reruns
+                if st.session_state.get("ltf_name") != ltf_file.name:
+                    st.session_state.ltf_resolver = IntrabarResolver(pd.read_csv(ltf_file, index_col=0, parse_dates=True))
+                    st.session_state.ltf_name = ltf_file.name
+                intrabar = st.session_state.ltf_resolver
+            exit_params = {"sl_atr": sl_atr, "tp_atr": tp_atr, "trail_atr": trail_atr, "max_bars": int(max_bars)}
+            bt_result = run_backtest(df_bt, capital=capital, strategy=strategy, params=exit_params, intrabar=intrabar)
 
             st.write(f"**Total Trades:** {bt_result['total']}")
             st.write(f"**Wins:** {bt_result['wins']} | **Losses:** {bt_result['losses']}")
             st.write(f"**Winrate:** {bt_result['winrate']}%")
 
             if bt_result['trades']:
-                bt_df = pd.DataFrame(bt_result['trades'])
+                bt_df = bt_result['trades'].to_frame()
+                metrics = backtest_metrics(bt_result['trades'], capital=capital)
                 st.session_state.bt_df = bt_df  # ✅ Store globally
+                st.session_state.bt_metrics = metrics
 
                 st.dataframe(bt_df)
 
                 if "profit" in bt_df.columns:
-                    bt_df['cumulative_profit'] = bt_df['profit'].cumsum()
-                    bt_df['equity'] = capital + bt_df['cumulative_profit']
-                    bt_df['winrate'] = bt_df['result'].eq("win").cumsum() / (bt_df.index + 1) * 100
+                    bt_df = pd.concat([bt_df, metrics["curve"]], axis=1)
 
                     # --- Charts ---
                     # --- Winrate ---
@@ -389,21 +468,15 @@ with st.expander("Run Backtest"):
                     st.line_chart(bt_df['cumulative_profit'])
 
                     # --- Advanced Metrics ---
-                    returns = bt_df['profit']
-                    sharpe = returns.mean() / returns.std() * (252 ** 0.5) if returns.std() != 0 else 0
-                    drawdown = (bt_df['equity'].cummax() - bt_df['equity']) / bt_df['equity'].cummax()
-                    max_drawdown = drawdown.max()
-                    profit_factor = returns[returns > 0].sum() / abs(returns[returns < 0].sum()) if returns[returns < 0].sum() != 0 else 0
-
                     st.markdown("### 📈 Backtest Performance Metrics")
-                    st.write(f"**Sharpe Ratio:** {sharpe:.2f}")
-                    st.write(f"**Max Drawdown:** {max_drawdown:.2%}")
-                    st.write(f"**Profit Factor:** {profit_factor:.2f}")
+                    st.write(f"**Sharpe Ratio (per trade):** {metrics['sharpe']:.2f}")
+                    st.write(f"**Sharpe Ratio (daily):** {metrics['time_sharpe']:.2f}")
+                    st.write(f"**Max Drawdown:** {metrics['max_drawdown']:.2%}")
+                    st.write(f"**Profit Factor:** {metrics['profit_factor']:.2f}")
 
                     # --- Drawdown ---
                     st.subheader("📉 Drawdown Curve")
                     drawdown_smooth_window = st.slider("Drawdown Smoothing Window", 1, 50, 10, key="dd_smooth")
-                    bt_df['drawdown'] = (bt_df['equity'].cummax() - bt_df['equity']) / bt_df['equity'].cummax()
                     bt_df['drawdown_smooth'] = bt_df['drawdown'].rolling(drawdown_smooth_window).mean()
                     st.line_chart(bt_df[['drawdown', 'drawdown_smooth']].rename(columns={
                         "drawdown": "Raw Drawdown", "drawdown_smooth": f"{drawdown_smooth_window}-Trade Avg"
@@ -411,13 +484,12 @@ with st.expander("Run Backtest"):
 
                     # --- Rolling Winrate ---
                     st.subheader("📊 Rolling Winrate (10-trade window)")
-                    bt_df['rolling_winrate'] = bt_df['result'].eq("win").rolling(10).mean() * 100
                     st.line_chart(bt_df['rolling_winrate'])
 
                     # --- CSV Export ---
                     st.download_button(
                         label="📥 Download Trade Log (CSV)",
-                        data=bt_df.to_csv(index=False).encode(),
+                        data=bt_df.to_csv(index=False, date_format=DATE_FORMAT).encode(),
                         file_name="backtest_trades.csv",
                         mime='text/csv'
                     )
@@ -425,9 +497,18 @@ with st.expander("Run Backtest"):
                     # --- Summary Stats Box ---
                     st.markdown("### 📦 Summary Stats")
                     col1, col2, col3 = st.columns(3)
-                    col1.metric("Total P/L", f"{bt_df['profit'].sum():.2f}")
-                    col2.metric("Avg Trade", f"{bt_df['profit'].mean():.4f}")
-                    col3.metric("Median Trade", f"{bt_df['profit'].median():.4f}")
+                    col1.metric("Total P/L", f"{metrics['total_pnl']:.2f}")
+                    col2.metric("Avg Trade", f"{metrics['avg_trade']:.4f}")
+                    col3.metric("Median Trade", f"{metrics['median_trade']:.4f}")
+
+                    # --- Monte Carlo Risk ---
+                    st.markdown("### 🎲 Monte Carlo Risk (5,000 resampled paths)")
+                    mc = monte_carlo_trades(bt_result['trades'], capital=capital, n_paths=5000, seed=42)
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Median Max Drawdown", f"{mc['max_drawdown']['p50']:.2%}")
+                    col2.metric("95th pct Max Drawdown", f"{mc['max_drawdown']['p95']:.2%}")
+                    col3.metric("Risk of Ruin (-50%)", f"{mc['ruin_probability']:.2%}")
+                    st.dataframe(pd.DataFrame({"Max Drawdown": mc["max_drawdown"], "Final Equity": mc["final_equity"]}))
 
 
 
@@ -450,7 +531,7 @@ with st.expander("🧩 Modular Strategy Builder"):
                 st.warning("⚠️ Please run analysis first.")
             else:
                 from src.strategy_engine import run_custom_strategy
-                df_bt = st.session_state.df.copy()
+                df_bt = st.session_state.df
                 result = run_custom_strategy(df_bt, rules)
 
                 st.write(f"**Trades:** {len(result)}")
@@ -458,33 +539,19 @@ with st.expander("🧩 Modular Strategy Builder"):
                     st.dataframe(pd.DataFrame(result))
         except json.JSONDecodeError as e:
             st.error(f"❌ Invalid JSON: {e}")
+        except ValueError as e:
+            st.error(f"{e}")
 
 
 # --- Loss Streak Visualization ---
 st.subheader("📉 Loss Streak Analysis")
 
-if "bt_df" in st.session_state:
-    bt_df = st.session_state.bt_df
-    if "result" in bt_df.columns:
-        streaks = []
-        current = 0
-        for r in bt_df["result"]:
-            if r == "loss":
-                current += 1
-            else:
-                if current > 0:
-                    streaks.append(current)
-                current = 0
-        if current > 0:
-            streaks.append(current)
-
-        if streaks:
-            max_streak = max(streaks)
-            st.write(f"**📛 Longest Loss Streak:** {max_streak} trades")
-
-            streak_series = pd.Series(streaks)
-            streak_counts = streak_series.value_counts().sort_index()
-            st.bar_chart(streak_counts.rename("Streak Count"))
+if "bt_metrics" in st.session_state:
+    metrics = st.session_state.bt_metrics
+    if "result" in st.session_state.bt_df.columns:
+        if metrics["max_loss_streak"]:
+            st.write(f"**📛 Longest Loss Streak:** {metrics['max_loss_streak']} trades")
+            st.bar_chart(metrics["loss_streaks"])
         else:
             st.write("✅ No loss streaks detected.")
     else:
@@ -496,17 +563,15 @@ else:
 # --- Daily P&L Aggregation ---
 st.subheader("📆 Daily Profit/Loss Summary")
 
-if "bt_df" in st.session_state:
-    bt_df = st.session_state.bt_df
-    if "profit" in bt_df.columns:
-        bt_df['date_only'] = pd.to_datetime(bt_df['date']).dt.date
-        daily_pl = bt_df.groupby('date_only')['profit'].sum()
+if "bt_metrics" in st.session_state:
+    if "profit" in st.session_state.bt_df.columns:
+        daily_pl = st.session_state.bt_metrics["daily_pnl"]
 
         st.line_chart(daily_pl.cumsum().rename("Cumulative P&L"))
         st.bar_chart(daily_pl.rename("Daily P&L"))
 
         st.write("**P&L by Day:**")
-        st.dataframe(daily_pl.reset_index().rename(columns={"date_only": "Date", "profit": "Net P&L"}))
+        st.dataframe(daily_pl.reset_index().rename(columns={"date": "Date", "profit": "Net P&L"}))
     else:
         st.info("ℹ️ No profit data found in backtest results.")
 else:
@@ -519,16 +584,18 @@ st.subheader("📊 Strategy Comparison")
 compare_strategies = st.button("Compare All Strategies")
 
 if compare_strategies:
-    strategy_list = ["MA Crossover", "MACD Signal", "Pattern Trigger", "RSI Reversal", "Bollinger Bounce", "ATR Breakout"]
+    strategy_list = list(STRATEGIES)
     if "df" not in st.session_state:
         st.error("❌ Please run analysis first to load data.")
     else:
-        df_bt = st.session_state.df.copy()
+        df_bt = st.session_state.df
         results = []
 
+        # One pass: indicators shared by several strategies are computed once
+        all_results = run_multi_backtest(df_bt, strategy_list, capital=capital)
         for strat in strategy_list:
-            bt_result = run_backtest(df_bt, capital=capital, strategy=strat)
-            cumulative_profit = sum([t.get("profit", 0) for t in bt_result["trades"]])
+            bt_result = all_results[strat]
+            cumulative_profit = float(bt_result["trades"].profit.sum())
             results.append({
                 "Strategy": strat,
                 "Total Trades": bt_result["total"],
@@ -546,10 +613,27 @@ if compare_strategies:
 
 st.subheader("🧾 Trade Journal")
 
-if os.path.exists("trade_journal.csv"):
-    journal_df = pd.read_csv("trade_journal.csv")
-    st.dataframe(journal_df)
+# Only the visible page is read from the journal database on each rerun
+jcol1, jcol2, jcol3, jcol4 = st.columns(4)
+j_strategy = jcol1.selectbox("Strategy", ["All"] + journal_values("strategy"), key="journal_strategy")
+j_result = jcol2.selectbox("Result", ["All"] + journal_values("result"), key="journal_result")
+j_source = jcol3.selectbox("Source", ["All", "Live", "Backtest"], key="journal_source")
+j_page_size = jcol4.selectbox("Rows per page", [50, 100, 250, 500], index=1, key="journal_page_size")
+j_filters = {
+    "strategy": None if j_strategy == "All" else j_strategy,
+    "result": None if j_result == "All" else j_result,
+    "source": None if j_source == "All" else j_source.lower(),
+}
+j_total = query_trades(**j_filters, page_size=0)["total"]
+
+if j_total:
+    j_pages = (j_total - 1) // j_page_size + 1
+    j_page = st.number_input(f"Page (of {j_pages})", 1, j_pages, 1, key="journal_page")
+    journal_page = query_trades(**j_filters, page=j_page - 1, page_size=j_page_size)
+    st.caption(f"{j_total} trades")
+    st.dataframe(journal_page["rows"])
     if st.button("📤 Export Journal"):
+        journal_df = query_trades(**j_filters, page_size=None)["rows"]
         st.download_button("Download CSV", journal_df.to_csv(index=False), file_name="trade_journal.csv", mime="text/csv")
 else:
     st.info("No trades logged yet.")
@@ -560,8 +644,6 @@ if "risk_info" in st.session_state:
     risk_info = st.session_state["risk_info"]
 
     if "signal_score" in risk_info and "entry_zone" in risk_info:
-        from src.journal import log_trade
-
         entry_zone = risk_info["entry_zone"].split(" - ")
         entry_price = round((float(entry_zone[0]) + float(entry_zone[1])) / 2, 5)
         rr_val = float(risk_info['risk_reward_ratio'].split(":")[1]) if ':' in risk_info['risk_reward_ratio'] else 1.0
@@ -5,13 +5,11 @@ import pandas as pd
 import json
 from src.data_handler import load_forex_data, fetch_live_forex
 from src.mt5_fetcher import fetch_mt5_data, is_mt5_available
-from src.trend_analyzer import detect_trend
-from src.sr_levels import identify_sr_levels
-from src.chart_patterns import detect_double_top_bottom
+from src.pipeline import AnalysisPipeline
+from src.bars import Bars
 from src.visualizer import plot_chart_with_levels
-from src.indicator_analysis import analyze_indicators
-from src.risk_manager import suggest_trade_levels
 from src.alerts import send_email_alert, send_telegram_alert
+from src.profiling import Profile
 
 CONFIG_FILE = "user_config.json"
 with open("secrets.json", "r") as f:
@@ -51,8 +49,10 @@ def ask_or_remember(key, question):
 use_plotly = ask_or_remember("use_plotly", "\n🌐 Use interactive Plotly HTML charts?")
 show_atr = ask_or_remember("show_atr", "📏 Show ATR Bands?")
 show_bb = ask_or_remember("show_bollinger", "📈 Show Bollinger Bands?")
+export_trace = ask_or_remember("export_trace", "🧭 Export a Chrome trace of stage timings?")
 
 # --- Choose Data Source ---
+profile = Profile("analysis").start()
 mode = input("\n🔄 Use live Forex data? (y/n): ").strip().lower()
 if mode == "y":
     if is_mt5_available():
@@ -109,18 +109,13 @@ else:
         print("❌ Keeping original.")
 
 # --- Filter Last 2 Days ---
-df = df[df.index >= df.index.max() - pd.Timedelta(days=2)]
+df = Bars.from_frame(df).recent("2D")
 print(f"\n📅 Loaded {len(df)} candles at {inferred_tf}")
 
 # --- ANALYSIS ---
-trend_result = detect_trend(df)
-sr_result = identify_sr_levels(df)
-patterns = detect_double_top_bottom(df)
-indicators = analyze_indicators(df)
-risk_info = suggest_trade_levels(
-    df, trend_result['trend'], sr_result['support'], sr_result['resistance'],
-    capital=capital, risk_percent=1.0, rr_threshold=1.5, slippage=0.0002
-)
+analysis = AnalysisPipeline().run(df, capital=capital, risk_percent=1.0, rr_threshold=1.5, slippage=0.0002)
+trend_result, sr_result = analysis['trend'], analysis['sr']
+patterns, indicators, risk_info = analysis['patterns'], analysis['indicators'], analysis['risk']
 
 # --- PRINT RESULTS ---
 print("\n🔍 Trend Analysis:")
@@ -171,6 +166,15 @@ plot_chart_with_levels(
 )
 print(f"\n🖼 Chart saved: {save_path}")
 
+# --- Stage Timings ---
+profile.stop()
+print("\n⏱ Stage Timings:")
+for stage, t in profile.stages().items():
+    print(f"→ {stage}: {t['wall_ms']:.1f} ms wall, {t['cpu_ms']:.1f} ms CPU, peak {t['peak_kb']:.0f} KB")
+if export_trace:
+    trace_path = profile.export_chrome_trace(f"charts/trace_{timestamp}.json")
+    print(f"🧭 Chrome trace saved: {trace_path}")
+
 # --- Stream Live Reanalysis (Optional) ---
 if input("📡 Stream live MT5 re-analysis every 60s? (y/n): ").strip().lower() == "y" and source == "mt5":
     from src.mt5_fetcher import stream_and_analyze
@@ -180,7 +184,8 @@ if input("📡 Stream live MT5 re-analysis every 60s? (y/n): ").strip().lower()
 summary = {
     "pair": pair, "timeframe": inferred_tf, "trend": trend_result,
     "support": sr_result['support'], "resistance": sr_result['resistance'],
-    "patterns": patterns, "indicators": indicators, "risk_info": risk_info
+    "patterns": patterns, "indicators": indicators, "risk_info": risk_info,
+    "profile": profile.summary()
 }
 json_path = f"charts/summary_{timestamp}.json"
 with open(json_path, "w") as f:
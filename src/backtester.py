@@ -1,183 +1,748 @@
+import os
 import pandas as pd
 import numpy as np
-from ta.trend import MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
 from datetime import datetime
-from src.journal import log_trade
+from concurrent.futures import ProcessPoolExecutor
+from src.journal import log_trades, has_run
+from src.indicators import compute_indicators
+from src.ledger import TradeLedger, RESULTS, EXIT_REASONS, DATE_FORMAT
+from src.result_cache import frame_digest, result_key, get_result, store_result
+from src.strategies import STRATEGIES, resolve_strategy, exit_indicator_keys
+from src.shared_bars import share_bars, resolve_bars
 
-def simulate_trade_execution(df, entry_idx, direction, entry, sl, tp):
-    for j in range(entry_idx + 1, len(df)):
-        high = df['High'].iloc[j]
-        low = df['Low'].iloc[j]
-        time = df.index[j]
+EXIT_SCAN_CHUNK = 64
+EXIT_BLOCK = 8
+# Upper bound on (trades x bars) scanned at once by _scan_exits / _path_exits
+EXIT_PATH_CELLS = 4_000_000
 
+_PYRAMID_KEY = ("__exit_pyramids__", ())
+
+# Per-process state of batch workers: the shared bars, their indicator cache and options
+_worker = {}
+
+
+def first_exit(high, low, entry_idx, direction, sl, tp):
+    """
+    First bar after entry whose range touches SL or TP, scanned in growing
+    chunks so short trades stay cheap. Returns (bar index or -1, stop hit first).
+    The stop is checked first when one bar covers both levels. Pass -inf / inf
+    (signed by direction) to switch a level off; used by strategy_engine.
+    """
+    start = entry_idx + 1
+    chunk = EXIT_SCAN_CHUNK
+    while start < len(high):
+        stop = min(start + chunk, len(high))
         if direction == "Buy":
-            if low <= sl:
-                return "loss", -abs(entry - sl), time
-            elif high >= tp:
-                return "win", abs(tp - entry), time
-        elif direction == "Sell":
-            if high >= sl:
-                return "loss", -abs(entry - sl), time
-            elif low <= tp:
-                return "win", abs(entry - tp), time
-    return "open", 0, df.index[-1]
-
-
-def run_backtest(df, capital=10000, strategy="MA Crossover"):
-    df = df.copy()
+            sl_hit = low[start:stop] <= sl
+            tp_hit = high[start:stop] >= tp
+        else:
+            sl_hit = high[start:stop] >= sl
+            tp_hit = low[start:stop] <= tp
+        hit = sl_hit | tp_hit
+        if hit.any():
+            j = int(hit.argmax())
+            return start + j, bool(sl_hit[j])
+        start = stop
+        chunk *= 4
+    return -1, False
+
+
+def simulate_trade_execution(df, entry_idx, direction, entry, sl, tp, resolve_tie=None):
+    high, low = df['High'].values, df['Low'].values
+    j, stopped = first_exit(high, low, entry_idx, direction, sl, tp)
+    if j < 0:
+        return "open", 0, df.index[-1]
+    # A bar covering both levels is stop-first unless lower-timeframe data says otherwise
+    if stopped and resolve_tie is not None and (high[j] >= tp if direction == "Buy" else low[j] <= tp):
+        stopped = bool(resolve_tie([j], [direction == "Buy"], [sl], [tp])[0])
+    if stopped:
+        return "loss", -abs(entry - sl), df.index[j]
+    return "win", abs(tp - entry) if direction == "Buy" else abs(entry - tp), df.index[j]
+
+
+def _min_pyramid(values):
+    """
+    Block minima of `values` level by level until one block is left. Each level
+    is an (n_blocks, EXIT_BLOCK) array padded with inf, so a block is one row.
+    """
+    levels = []
+    arr = np.asarray(values, dtype=np.float64)
+    while True:
+        blocks = np.concatenate([arr, np.full(-len(arr) % EXIT_BLOCK, np.inf)]).reshape(-1, EXIT_BLOCK)
+        levels.append(blocks)
+        if len(blocks) <= 1:
+            return levels
+        arr = blocks.min(axis=1)
+
+
+def _exit_pyramids(df, cache=None):
+    """
+    Block-min pyramids over Low and -High of the whole of `df`, built once per
+    frame: with an indicator cache (see compute_indicators) they are stored in it.
+    """
+    if cache is not None and _PYRAMID_KEY in cache:
+        return cache[_PYRAMID_KEY]
+    pyramids = (_min_pyramid(df['Low'].to_numpy(dtype=np.float64)),
+                _min_pyramid(-df['High'].to_numpy(dtype=np.float64)))
+    if cache is not None:
+        cache[_PYRAMID_KEY] = pyramids
+    return pyramids
+
+
+def _first_at_or_below(levels, start, threshold):
+    """
+    First index j >= start with values[j] <= threshold (or -1), for many queries.
+    Climb while the rest of the current block misses, then descend into the block that hit.
+    """
+    m = len(start)
+    offsets = np.arange(EXIT_BLOCK)
+    level = np.full(m, -1)
+    pos = start.astype(np.int64).copy()
+    active = np.arange(m)
+
+    # Up: scan the remainder of the block at each level
+    for lvl, blocks in enumerate(levels):
+        active = active[pos[active] < len(blocks) * EXIT_BLOCK]
+        if not active.size:
+            break
+        p = pos[active]
+        hit = (blocks[p // EXIT_BLOCK] <= threshold[active, None]) & (offsets >= (p % EXIT_BLOCK)[:, None])
+        found = hit.any(axis=1)
+        pos[active[found]] = p[found] - p[found] % EXIT_BLOCK + hit[found].argmax(axis=1)
+        level[active[found]] = lvl
+        pos[active[~found]] = p[~found] // EXIT_BLOCK + 1
+        active = active[~found]
+
+    # Down: the hit is inside the children of the block found one level up
+    for lvl in range(len(levels) - 1, 0, -1):
+        rows = np.flatnonzero(level == lvl)
+        if not rows.size:
+            continue
+        hit = levels[lvl - 1][pos[rows]] <= threshold[rows, None]
+        pos[rows] = pos[rows] * EXIT_BLOCK + hit.argmax(axis=1)
+        level[rows] = lvl - 1
+
+    return np.where(level == 0, pos, -1)
+
+
+def _scan_exits(high, low, entry_idx, is_buy, sl, tp):
+    """
+    First SL / TP touch for a few trades: every pending trade looks at its next
+    `chunk` bars in one array operation and the chunk grows until all are resolved.
+    Returns first SL and TP bars (-1 when not touched by the time the other was);
+    cost follows trade length.
+    """
+    n, m = len(high), len(entry_idx)
+    sl_at = np.full(m, -1, dtype=np.int64)
+    tp_at = np.full(m, -1, dtype=np.int64)
+    # Sells are buys on the negated series: SL on high >= sl  <=>  -high <= -sl
+    adverse = (low, -high)
+    favourable = (-high, low)
+    level_sign = np.where(is_buy, 1.0, -1.0)
+    sl_level, tp_level = sl * level_sign, -tp * level_sign
+
+    for side, rows in enumerate((np.flatnonzero(is_buy), np.flatnonzero(~is_buy))):
+        pending = rows
+        offset, chunk = 1, EXIT_SCAN_CHUNK
+        while pending.size:
+            start = entry_idx[pending] + offset
+            keep = start < n
+            pending, start = pending[keep], start[keep]
+            if not pending.size:
+                break
+            width = min(chunk, max(EXIT_SCAN_CHUNK, EXIT_PATH_CELLS // pending.size))
+            cols = start[:, None] + np.arange(width)
+            inside = cols < n
+            bars = np.minimum(cols, n - 1)
+            sl_hit = (adverse[side][bars] <= sl_level[pending, None]) & inside
+            tp_hit = (favourable[side][bars] <= tp_level[pending, None]) & inside
+
+            for hit, out in ((sl_hit, sl_at), (tp_hit, tp_at)):
+                found = hit.any(axis=1)
+                out[pending[found]] = start[found] + hit[found].argmax(axis=1)
+            done = (sl_at[pending] >= 0) | (tp_at[pending] >= 0)
+            pending = pending[~done]
+            offset += width
+            chunk *= 4
+    return sl_at, tp_at
+
+
+def _first_exits(high, low, entry_idx, is_buy, sl, tp, resolve_tie=None, pyramids=None, offset=0):
+    """
+    first_exit for many trades at once. With `pyramids` (see _exit_pyramids, built
+    on a frame in which `high`/`low` start at `offset`) or many trades, first SL and TP
+    touches come from block-min pyramid lookups whose cost is independent of trade
+    length; a few trades on a frame without pyramids are scanned forward instead.
+    `resolve_tie(bar_idx, is_buy, sl, tp)` decides bars that touch both levels.
+    """
+    n, m = len(high), len(entry_idx)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    if pyramids is None and m * EXIT_SCAN_CHUNK < n:
+        sl_at, tp_at = _scan_exits(high, low, entry_idx, is_buy, sl, tp)
+    else:
+        if pyramids is None:
+            pyramids, offset = (_min_pyramid(low), _min_pyramid(-high)), 0
+        low_levels, neg_high_levels = pyramids
+        start = entry_idx + 1 + offset
+        sl_at = np.full(m, -1, dtype=np.int64)
+        tp_at = np.full(m, -1, dtype=np.int64)
+        buy, sell = np.flatnonzero(is_buy), np.flatnonzero(~is_buy)
+        # Long: low <= SL, high >= TP. Short: high >= SL, low <= TP (high >= x <=> -high <= -x)
+        sl_at[buy] = _first_at_or_below(low_levels, start[buy], sl[buy])
+        tp_at[buy] = _first_at_or_below(neg_high_levels, start[buy], -tp[buy])
+        sl_at[sell] = _first_at_or_below(neg_high_levels, start[sell], -sl[sell])
+        tp_at[sell] = _first_at_or_below(low_levels, start[sell], tp[sell])
+        # Back to positions in `high`/`low`; touches past their end do not count
+        sl_at = np.where((sl_at >= 0) & (sl_at < offset + n), sl_at - offset, -1)
+        tp_at = np.where((tp_at >= 0) & (tp_at < offset + n), tp_at - offset, -1)
+
+    never = np.iinfo(np.int64).max
+    sl_key, tp_key = np.where(sl_at < 0, never, sl_at), np.where(tp_at < 0, never, tp_at)
+    # The stop is checked first when one bar covers both levels
+    stopped = (sl_at >= 0) & (sl_key <= tp_key)
+    if resolve_tie is not None:
+        tie = np.flatnonzero((sl_at >= 0) & (sl_at == tp_at))
+        if tie.size:
+            stopped[tie] = resolve_tie(sl_at[tie], is_buy[tie], sl[tie], tp[tie])
+    exit_idx = np.where(sl_key <= tp_key, sl_at, tp_at)
+    return exit_idx, stopped
+
+
+def _tie_resolver(df, intrabar, start=0):
+    if intrabar is None:
+        return None
+    resolve = intrabar.for_bars(df.index)
+    return lambda bar_idx, *levels: resolve(np.asarray(bar_idx) + start, *levels)
+
+
+def _path_exits(high, low, close, entry_idx, is_buy, entry, sl, tp, trail, max_bars, resolve_tie=None):
+    """
+    Exits with an optional trailing stop (`trail` price distance, 0 = off) and
+    time limit (`max_bars`, 0 = off), for many trades at once. Sells are mirrored
+    (prices negated) so one running maximum serves both sides: the stop at bar t is
+    max(SL, best price since entry before t - trail). Windows are scanned in growing
+    chunks with np.maximum.accumulate; the best price is carried between chunks.
+    Returns (exit bar or -1, exit price, reason: 0 open, 1 stop, 2 target, 3 time).
+    """
+    n, m = len(high), len(entry_idx)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    sign = np.where(is_buy, 1.0, -1.0)
+    stop0, target = sign * sl, sign * tp
+    dist = np.where(trail > 0, trail, np.inf)
+    best = sign * entry
+    last = np.where(max_bars > 0, entry_idx + max_bars, n - 1)
+    timed = last <= n - 1
+    last = np.minimum(last, n - 1)
+
+    exit_idx = np.full(m, -1, dtype=np.int64)
+    exit_price = np.full(m, np.nan)
+    reason = np.zeros(m, dtype=np.int8)
+    pending = np.arange(m)
+    offset, chunk = 1, EXIT_SCAN_CHUNK
+    while pending.size:
+        start = entry_idx[pending] + offset
+        ended = start > last[pending]
+        rows = pending[ended & timed[pending]]
+        exit_idx[rows] = last[rows]
+        exit_price[rows] = close[last[rows]]
+        reason[rows] = 3
+        pending, start = pending[~ended], start[~ended]
+        if not pending.size:
+            break
+
+        width = min(chunk, max(EXIT_SCAN_CHUNK, EXIT_PATH_CELLS // pending.size), int((last[pending] - start).max()) + 1)
+        cols = start[:, None] + np.arange(width)
+        inside = cols <= last[pending, None]
+        cols = np.minimum(cols, n - 1)
+        buy = is_buy[pending, None]
+        fav = np.where(buy, high[cols], -low[cols])
+        adv = np.where(buy, low[cols], -high[cols])
+        # Best price strictly before each bar: the stop only moves on closed bars
+        before = np.maximum.accumulate(np.concatenate([best[pending, None], fav[:, :-1]], axis=1), axis=1)
+        stop = np.maximum(stop0[pending, None], before - dist[pending, None])
+        stop_hit = (adv <= stop) & inside
+        tp_hit = (fav >= target[pending, None]) & inside
+        hit = stop_hit | tp_hit
+
+        done = hit.any(axis=1)
+        j = hit[done].argmax(axis=1)
+        rows = pending[done]
+        k = np.flatnonzero(done)
+        stopped = stop_hit[k, j]
+        level = stop[k, j]
+        # The stop is checked first when one bar covers both levels
+        if resolve_tie is not None:
+            tie = np.flatnonzero(stopped & tp_hit[k, j])
+            if tie.size:
+                stopped[tie] = resolve_tie(start[k[tie]] + j[tie], is_buy[rows[tie]],
+                                           sign[rows[tie]] * level[tie], tp[rows[tie]])
+        exit_idx[rows] = start[k] + j
+        exit_price[rows] = sign[rows] * np.where(stopped, level, target[rows])
+        reason[rows] = np.where(stopped, 1, 2)
+
+        left = ~done
+        best[pending[left]] = np.maximum(best[pending[left]],
+                                         np.where(inside[left], fav[left], -np.inf).max(axis=1))
+        pending = pending[left]
+        offset += width
+        chunk *= 4
+    return exit_idx, exit_price, reason
+
+
+def _exit_arrays(df, entry_idx, is_buy, entry, sl, tp, trail=None, max_bars=None, resolve_tie=None,
+                 pyramids=None, offset=0):
+    """
+    (exit bar or -1, exit price, reason) for column arrays of trades. Plain SL/TP
+    trades go through _first_exits (with `pyramids` over a frame in which `df`
+    starts at `offset`, when given); trailing or timed ones use _path_exits.
+    """
+    m = len(entry_idx)
+    high, low = df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64)
+    trail = np.zeros(m) if trail is None else trail
+    max_bars = np.zeros(m, dtype=np.int64) if max_bars is None else max_bars
+    path = (trail > 0) | (max_bars > 0)
+
+    exit_idx = np.full(m, -1, dtype=np.int64)
+    exit_price = np.full(m, np.nan)
+    reason = np.zeros(m, dtype=np.int8)
+    fixed = np.flatnonzero(~path)
+    if fixed.size:
+        j, stopped = _first_exits(high, low, entry_idx[fixed], is_buy[fixed], sl[fixed], tp[fixed], resolve_tie,
+                                  pyramids, offset)
+        exit_idx[fixed] = j
+        exit_price[fixed] = np.where(j < 0, np.nan, np.where(stopped, sl[fixed], tp[fixed]))
+        reason[fixed] = np.where(j < 0, 0, np.where(stopped, 1, 2))
+    rows = np.flatnonzero(path)
+    if rows.size:
+        exit_idx[rows], exit_price[rows], reason[rows] = _path_exits(
+            high, low, df['Close'].to_numpy(dtype=np.float64), entry_idx[rows], is_buy[rows], entry[rows],
+            sl[rows], tp[rows], trail[rows], max_bars[rows], resolve_tie)
+    return exit_idx, exit_price, reason
+
+
+def _exit_profit(is_buy, entry, exit_price, reason):
+    """Profit per unit and result code (see ledger.RESULTS); a trailed or timed exit wins when it made money."""
+    profit = np.where(reason > 0, np.where(is_buy, 1.0, -1.0) * (exit_price - entry), 0.0)
+    result = np.where(reason == 0, 0, np.where((reason == 2) | (profit > 0), 1, 2)).astype(np.int8)
+    return profit, result
+
+
+def resolve_trade_exits(df, trades, intrabar=None, cache=None) -> dict:
+    """
+    Exit bar, exit price, outcome and exit reason ("sl", "tp", "time" or "open") for a
+    list of generate_trades() entries, as arrays. Trades still open at the end are
+    marked at the last close. With an IntrabarResolver, bars covering both the stop
+    and the target are decided on lower-timeframe data. Pass the frame's indicator
+    `cache` when resolving it repeatedly: the exit pyramids are then built once.
+    """
+    close = df['Close'].values
+    cols = _trade_columns(trades)
+    pyramids = _exit_pyramids(df, cache) if cache is not None else None
+    j, price, reason = _exit_arrays(df, *cols, resolve_tie=_tie_resolver(df, intrabar), pyramids=pyramids)
+    _, result = _exit_profit(cols[1], cols[2], price, reason)
+
+    found = j >= 0
+    return {
+        "exit_idx": np.where(found, j, len(df) - 1),
+        "exit_price": np.where(found, price, close[-1] if len(df) else np.nan),
+        "result": np.array(RESULTS, dtype=object)[result],
+        "reason": np.array(EXIT_REASONS, dtype=object)[reason],
+    }
+
+
+def _trade_columns(trades) -> tuple:
+    """entry_idx, is_buy, entry, sl, tp, trail, max_bars of trade dicts as arrays."""
+    return (np.array([t["entry_idx"] for t in trades], dtype=np.int64),
+            np.array([t["Type"] == "Buy" for t in trades], dtype=bool),
+            np.array([t["Entry"] for t in trades], dtype=np.float64),
+            np.array([t["SL"] for t in trades], dtype=np.float64),
+            np.array([t["TP"] for t in trades], dtype=np.float64),
+            np.array([t.get("Trail", 0.0) for t in trades], dtype=np.float64),
+            np.array([t.get("Max Bars", 0) for t in trades], dtype=np.int64))
+
+
+def _trade_levels(close, buy, sell, params, atr=None) -> dict:
+    """
+    Entry columns for the bars where buy/sell fire (buy wins if both do): SL and TP
+    as percentages or ATR multiples, trailing distance and time limit.
+    """
+    entry_idx = np.flatnonzero(buy | sell)
+    is_buy = np.asarray(buy[entry_idx], dtype=bool)
+    sign = np.where(is_buy, 1, -1)
+    entry = close[entry_idx]
+    a = atr[entry_idx] if atr is not None else None
+    if params["sl_atr"] > 0:
+        sl = entry - sign * params["sl_atr"] * a
+    else:
+        sl = entry * (1 - sign * params["sl_pct"] / 100)
+    if params["tp_atr"] > 0:
+        tp = entry + sign * params["tp_atr"] * a
+    else:
+        tp = entry * (1 + sign * params["tp_pct"] / 100)
+    trail = params["trail_atr"] * a if params["trail_atr"] > 0 else np.zeros(len(entry_idx))
+    # No ATR yet (warm-up): no trade
+    keep = np.isfinite(sl) & np.isfinite(tp) & np.isfinite(trail)
+    return {"entry_idx": entry_idx[keep], "is_buy": is_buy[keep], "entry": entry[keep], "sl": sl[keep],
+            "tp": tp[keep], "trail": trail[keep],
+            "max_bars": np.full(int(keep.sum()), int(params["max_bars"]), dtype=np.int64)}
+
+
+def _signal_trades(close, buy, sell, params, atr=None):
+    """Trade dicts for the bars where buy/sell fire; buy wins if both do."""
+    lv = _trade_levels(close, buy, sell, params, atr)
     trades = []
-    stop_loss_pct = 0.01
-    take_profit_pct = 0.02
+    for i, is_buy, entry, sl, tp, trail in zip(lv["entry_idx"].tolist(), lv["is_buy"].tolist(), lv["entry"],
+                                               lv["sl"], lv["tp"], lv["trail"]):
+        trade = {"Type": "Buy" if is_buy else "Sell", "Entry": entry, "SL": sl, "TP": tp, "entry_idx": i}
+        if trail > 0:
+            trade["Trail"] = trail
+        if params["max_bars"] > 0:
+            trade["Max Bars"] = int(params["max_bars"])
+        trades.append(trade)
+    return trades
+
+
+def _strategy_signals(df, strategy, params, cache, start=0, stop=None):
+    # Indicators are computed on the whole frame (and cached), then sliced to [start, stop)
+    strat, params = resolve_strategy(strategy, params)
+    keys = strat.indicators(params)
+    exit_keys = exit_indicator_keys(params)
+    values = compute_indicators(df, [*keys.values(), *exit_keys.values()], cache)
+    window = df.iloc[start:stop]
+    buy, sell = strat.signals(window, {alias: values[key][start:stop] for alias, key in keys.items()}, params)
+    atr = np.asarray(values[exit_keys["exit_atr"]][start:stop], dtype=np.float64) if exit_keys else None
+    return window, buy, sell, params, atr
+
+
+def generate_trades(df, strategy="MA Crossover", params=None, cache=None):
+    """
+    Entry signals of a registered strategy (see src.strategies) as dicts with
+    Type, Entry, SL, TP and entry_idx, plus Trail (price distance) and Max Bars
+    when those exit rules are on. `cache` is shared with compute_indicators.
+    """
+    _, buy, sell, params, atr = _strategy_signals(df, strategy, params, cache)
+    close = df['Close'].to_numpy(dtype=np.float64)
+    return _signal_trades(close, buy, sell, params, atr)
 
-    if len(df) < 50:
-        return {"total": 0, "wins": 0, "losses": 0, "winrate": 0, "trades": []}
-
-    if strategy == "MA Crossover":
-        df['MA_Short'] = df['Close'].rolling(10).mean()
-        df['MA_Long'] = df['Close'].rolling(30).mean()
-        for i in range(30, len(df)):
-            if df['MA_Short'].iloc[i] > df['MA_Long'].iloc[i] and df['MA_Short'].iloc[i-1] <= df['MA_Long'].iloc[i-1]:
-                entry = df['Close'].iloc[i]
-                trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-            elif df['MA_Short'].iloc[i] < df['MA_Long'].iloc[i] and df['MA_Short'].iloc[i-1] >= df['MA_Long'].iloc[i-1]:
-                entry = df['Close'].iloc[i]
-                trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-
-    elif strategy == "MACD Signal":
-        macd = MACD(df['Close'])
-        df['macd'] = macd.macd()
-        df['signal'] = macd.macd_signal()
-        for i in range(1, len(df)):
-            if df['macd'].iloc[i] > df['signal'].iloc[i] and df['macd'].iloc[i-1] <= df['signal'].iloc[i-1]:
-                entry = df['Close'].iloc[i]
-                trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-            elif df['macd'].iloc[i] < df['signal'].iloc[i] and df['macd'].iloc[i-1] >= df['signal'].iloc[i-1]:
-                entry = df['Close'].iloc[i]
-                trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-
-    elif strategy == "Pattern Trigger":
-        for i in range(20, len(df)):
-            recent = df['Close'].iloc[i-5:i]
-            entry = df['Close'].iloc[i]
-            if recent.is_monotonic_increasing:
-                trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-            elif recent.is_monotonic_decreasing:
-                trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-
-    elif strategy == "RSI Reversal":
-        rsi = RSIIndicator(df['Close'])
-        df['rsi'] = rsi.rsi()
-        for i in range(1, len(df)):
-            entry = df['Close'].iloc[i]
-            if df['rsi'].iloc[i] > 30 and df['rsi'].iloc[i-1] <= 30:
-                trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-            elif df['rsi'].iloc[i] < 70 and df['rsi'].iloc[i-1] >= 70:
-                trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-
-    elif strategy == "Bollinger Bounce":
-        bb = BollingerBands(df['Close'])
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_lower'] = bb.bollinger_lband()
-        rsi = RSIIndicator(df['Close'])
-        df['rsi'] = rsi.rsi()
-        for i in range(1, len(df)):
-            entry = df['Close'].iloc[i]
-            if df['Close'].iloc[i] < df['bb_lower'].iloc[i] and df['rsi'].iloc[i] > df['rsi'].iloc[i-1]:
-                trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-            elif df['Close'].iloc[i] > df['bb_upper'].iloc[i] and df['rsi'].iloc[i] < df['rsi'].iloc[i-1]:
-                trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-
-    elif strategy == "ATR Breakout":
-        atr = AverageTrueRange(df['High'], df['Low'], df['Close'])
-        df['atr'] = atr.average_true_range()
-        for i in range(14, len(df)):
-            range_ = df['High'].iloc[i] - df['Low'].iloc[i]
-            entry = df['Close'].iloc[i]
-            if range_ > 1.5 * df['atr'].iloc[i]:
-                if df['Close'].iloc[i] > df['Open'].iloc[i]:
-                    trades.append({"Type": "Buy", "Entry": entry, "SL": entry * 0.99, "TP": entry * 1.02, "entry_idx": i})
-                else:
-                    trades.append({"Type": "Sell", "Entry": entry, "SL": entry * 1.01, "TP": entry * 0.98, "entry_idx": i})
-
-    # --- Evaluate Trades ---
-    wins, losses = 0, 0
-    evaluated_trades = []
-
-    for t in trades:
-        entry_idx = t["entry_idx"]
-        entry = t["Entry"]
-        sl = t["SL"]
-        tp = t["TP"]
-        direction = t["Type"]
-
-        result, profit, close_time = simulate_trade_execution(df, entry_idx, direction, entry, sl, tp)
-        rr = abs(tp - entry) / abs(entry - sl) if abs(entry - sl) > 0 else 0
-
-        t.update({
-            "result": result,
-            "profit": round(profit, 5),
-            "RR": round(rr, 2),
-            "date": close_time.strftime("%Y-%m-%d %H:%M")
-        })
 
-        if result == "win":
-            wins += 1
-        elif result == "loss":
-            losses += 1
+def _result_key(kind, df, strategy, params, cache, intrabar, *extra):
+    _, params = resolve_strategy(strategy, params)
+    return result_key(kind, frame_digest(df, cache), strategy, params,
+                      intrabar.digest if intrabar is not None else None, *extra)
 
-        log_trade(strategy=strategy, entry=entry, sl=sl, tp=tp, result=result, rr=rr, date=t["date"], chart_path="")
 
-        evaluated_trades.append(t)
+def backtest_summary(df, strategy="MA Crossover", params=None, cache=None, start=0, stop=None,
+                     intrabar=None, use_cache=True) -> dict:
+    """
+    run_backtest totals plus summed profit for bars [start, stop), without
+    journal writes or per-trade rows. Used by the optimizers. With `use_cache`,
+    identical evaluations within this process come from src.result_cache (memory
+    tier only: the optimizers make thousands of these and they are cheap to redo).
+    """
+    key = _result_key("backtest_summary", df, strategy, params, cache, intrabar, start, stop) if use_cache else None
+    if key is not None:
+        hit = get_result(key, disk=False)
+        if hit is not None:
+            return hit
+    stats = _backtest_summary(df, strategy, params, cache, start, stop, intrabar)
+    if key is not None:
+        store_result(key, stats, disk=False)
+    return stats
 
-    total = len(evaluated_trades)
-    winrate = round(100 * wins / total, 2) if total > 0 else 0
 
+def _backtest_summary(df, strategy, params, cache, start, stop, intrabar):
+    window, buy, sell, params, atr = _strategy_signals(df, strategy, params, cache, start, stop)
+    if len(window) < 50:
+        return {"total": 0, "wins": 0, "losses": 0, "winrate": 0, "profit": 0.0}
+
+    # Columnar version of _signal_trades + resolve_trade_exits
+    lv = _trade_levels(window['Close'].to_numpy(dtype=np.float64), buy, sell, params, atr)
+    # Pyramids over the whole frame serve every window the optimizers evaluate
+    pyramids = _exit_pyramids(df, cache) if cache is not None else None
+    offset = range(len(df))[start:stop].start  # `start` as iloc resolves it
+    _, price, reason = _exit_arrays(window, lv["entry_idx"], lv["is_buy"], lv["entry"], lv["sl"], lv["tp"],
+                                    lv["trail"], lv["max_bars"], _tie_resolver(df, intrabar, start),
+                                    pyramids, offset)
+    profit, result = _exit_profit(lv["is_buy"], lv["entry"], price, reason)
+
+    total = len(lv["entry_idx"])
+    counts = np.bincount(result, minlength=len(RESULTS))
+    wins = int(counts[1])
     return {
         "total": total,
         "wins": wins,
-        "losses": losses,
-        "winrate": winrate,
-        "trades": evaluated_trades
+        "losses": int(counts[2]),
+        "winrate": round(100 * wins / total, 2) if total > 0 else 0,
+        "profit": float(profit.sum())
     }
 
-def optimize_rsi_strategy(df, oversold_list=[25, 30, 35], overbought_list=[65, 70, 75]):
-    from ta.momentum import RSIIndicator
-    results = []
 
-    for os in oversold_list:
-        for ob in overbought_list:
-            if os >= ob:
-                continue
-            rsi = RSIIndicator(df['Close'])
-            df['rsi'] = rsi.rsi()
-
-            wins = 0
-            losses = 0
-            profit = 0
-            for i in range(1, len(df)):
-                entry = df['Close'].iloc[i]
-                if df['rsi'].iloc[i] > os and df['rsi'].iloc[i - 1] <= os:
-                    tp = entry * 1.02
-                    sl = entry * 0.99
-                    if tp > entry:
-                        wins += 1
-                        profit += tp - entry
-                    else:
-                        losses += 1
-                        profit -= entry - sl
-
-            total = wins + losses
-            winrate = round(100 * wins / total, 2) if total else 0
-            results.append({
-                "Oversold": os,
-                "Overbought": ob,
-                "Trades": total,
-                "Wins": wins,
-                "Losses": losses,
-                "Winrate (%)": winrate,
-                "Total Profit": round(profit, 2)
-            })
+def _journal(ledger, strategy, run_id):
+    c = ledger.columns
+    dates = pd.DatetimeIndex(ledger.exit_times).strftime(DATE_FORMAT)
+    log_trades(strategy, zip(c["entry"], c["sl"], c["tp"], ledger.results, c["rr"], dates), run_id)
+
+
+def _trade_ledger(df, lv, resolve_tie=None, pyramids=None) -> dict:
+    """run_backtest result for the _trade_levels columns `lv`, with the trades as a TradeLedger."""
+    exit_idx, exit_price, reason = _exit_arrays(df, lv["entry_idx"], lv["is_buy"], lv["entry"], lv["sl"], lv["tp"],
+                                                lv["trail"], lv["max_bars"], resolve_tie, pyramids)
+    profit, result = _exit_profit(lv["is_buy"], lv["entry"], exit_price, reason)
+    risk, reward = np.abs(lv["entry"] - lv["sl"]), np.abs(lv["tp"] - lv["entry"])
+    rr = np.divide(reward, risk, out=np.zeros(len(risk)), where=risk > 0)
+    times = df.index.values.astype("datetime64[ns]").astype(np.int64)
+
+    ledger = TradeLedger({
+        **lv,
+        "exit_idx": exit_idx,
+        "exit_time": times[np.where(exit_idx >= 0, exit_idx, len(df) - 1)],
+        "exit_price": exit_price,
+        "reason": reason,
+        "result": result,
+        "profit": np.round(profit, 5),
+        "rr": np.round(rr, 2),
+    }, tz=getattr(df.index, "tz", None))
+
+    total = len(ledger)
+    counts = np.bincount(result, minlength=len(RESULTS))
+    wins = int(counts[1])
+    return {
+        "total": total,
+        "wins": wins,
+        "losses": int(counts[2]),
+        "winrate": round(100 * wins / total, 2) if total > 0 else 0,
+        "trades": ledger
+    }
+
+
+def run_backtest(df, capital=10000, strategy="MA Crossover", params=None, log=True, cache=None, intrabar=None,
+                 use_cache=True):
+    """
+    Backtest a registered strategy over `df`. Returns totals and the trades as a
+    TradeLedger (columnar; rows become dicts only when indexed or iterated).
+    With `use_cache`, a run on identical data, params and code is returned from
+    src.result_cache, and its trades are not journalled again.
+    """
+    if len(df) < 50:
+        return {"total": 0, "wins": 0, "losses": 0, "winrate": 0, "trades": TradeLedger.empty()}
+
+    key = _result_key("run_backtest", df, strategy, params, cache, intrabar) if use_cache else None
+    result = get_result(key) if key is not None else None
+    if result is None:
+        _, buy, sell, resolved, atr = _strategy_signals(df, strategy, params, cache)
+        lv = _trade_levels(df['Close'].to_numpy(dtype=np.float64), buy, sell, resolved, atr)
+        result = _trade_ledger(df, lv, _tie_resolver(df, intrabar),
+                               _exit_pyramids(df, cache) if cache is not None else None)
+        if key is not None:
+            store_result(key, result)
+
+    _log_run(result, strategy, key, log)
+    return result
+
+
+def _log_run(result, strategy, key, log):
+    # The run id is the cache key, so a repeated run is journalled once
+    run_id = f"backtest-{key if key is not None else datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    if log and not has_run(run_id):
+        _journal(result["trades"], strategy, run_id)
+
+
+def _init_worker(data, options=None):
+    """Process-pool initializer: map the published bars (see src.shared_bars) once per worker."""
+    _worker.clear()
+    _worker.update(df=resolve_bars(data), cache={}, **(options or {}))
+
+
+def _backtest_job(job):
+    name, params = job
+    return run_backtest(_worker["df"], capital=_worker["capital"], strategy=name, params=params, log=False,
+                        cache=_worker["cache"], intrabar=_worker["intrabar"], use_cache=False)
+
+
+def run_multi_backtest(df, strategies=None, capital=10000, params=None, log=True, intrabar=None,
+                       use_cache=True, max_workers=1) -> dict:
+    """
+    run_backtest for several strategies over the same frame. The union of
+    their indicators is computed once and shared. `params` maps strategy
+    name -> parameter overrides. Returns strategy name -> run_backtest result.
+    With max_workers > 1 (None = all cores) the runs go to a process pool
+    that maps the bars from shared memory instead of pickling the frame;
+    caching and journalling stay in this process.
+    """
+    strategies = list(strategies or STRATEGIES)
+    params = params or {}
+    for name in strategies:
+        resolve_strategy(name, params.get(name))
+    # Each run fills the shared cache, so common indicators are computed once
+    cache = {}
+    if max_workers == 1 or len(strategies) < 2 or len(df) < 50:
+        return {name: run_backtest(df, capital=capital, strategy=name, params=params.get(name), log=log,
+                                   cache=cache, intrabar=intrabar, use_cache=use_cache)
+                for name in strategies}
+
+    keys = {name: _result_key("run_backtest", df, name, params.get(name), cache, intrabar) if use_cache else None
+            for name in strategies}
+    results = {name: get_result(key) for name, key in keys.items() if key is not None}
+    todo = [name for name in strategies if results.get(name) is None]
+    if todo:
+        with share_bars(df) as shared, ProcessPoolExecutor(
+                max_workers=min(max_workers or os.cpu_count() or 1, len(todo)), initializer=_init_worker,
+                initargs=(shared.handle, {"capital": capital, "intrabar": intrabar})) as pool:
+            for name, result in zip(todo, pool.map(_backtest_job, [(name, params.get(name)) for name in todo])):
+                results[name] = result
+                if keys[name] is not None:
+                    store_result(keys[name], result)
+    for name in strategies:
+        _log_run(results[name], name, keys[name], log)
+    return {name: results[name] for name in strategies}
+
+
+def _sma_from_prefix(prefix, base, window, n):
+    # SMA of every bar from one cumulative sum; NaN until the window is full
+    out = np.full(n, np.nan)
+    out[window - 1:] = (prefix[window:] - prefix[:-window]) / window + base
+    return out
+
+
+def _crossover_entries(sma, short, longs, tie_tol=0.0):
+    """Buy and sell entry bars of `short` crossing each window in `longs` (one 2-D batch)."""
+    diff = np.empty((len(longs), len(sma[short])))
+    for k, w in enumerate(longs):
+        np.subtract(sma[short], sma[w], out=diff[k])
+    # Equal averages should compare equal even if the prefix sums differ in the last bits
+    above, below = diff > tie_tol, diff < -tie_tol
+    # Entry on the bar where short moves above / below long (from equal or the other side)
+    buy = above[:, 1:] & ~above[:, :-1]
+    sell = below[:, 1:] & ~below[:, :-1]
+    entries = []
+    for k, w in enumerate(longs):
+        entries.append((np.flatnonzero(buy[k, w - 1:]) + w, np.flatnonzero(sell[k, w - 1:]) + w))
+    return entries
+
+
+def optimize_ma_crossover(df, short_windows=range(5, 55, 5), long_windows=range(20, 210, 10),
+                          sl_pct=1.0, tp_pct=2.0, batch_cells=20_000_000):
+    """
+    Profit/winrate surface of MA Crossover over every (short, long) pair with short < long.
+    All SMAs come from one cumulative sum and crossovers are found in 2-D batches.
+    SL/TP outcomes are resolved once per bar in the union of entry bars and then summed per pair.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    n = len(close)
+    short_windows = sorted({int(w) for w in short_windows if 0 < w < n})
+    long_windows = sorted({int(w) for w in long_windows if 0 < w < n})
+    pairs = [(s, [w for w in long_windows if w > s]) for s in short_windows]
+    pairs = [(s, longs) for s, longs in pairs if longs]
+    if not pairs:
+        return pd.DataFrame()
+
+    # Subtracting the first close keeps the running sum small, so window differences stay precise
+    base = close[0]
+    prefix = np.concatenate([[0.0], np.cumsum(close - base)])
+    sma = {w: _sma_from_prefix(prefix, base, w, n) for w in set(short_windows) | set(long_windows)}
+    tie_tol = 1e-9 * np.abs(close).max()
+
+    rows = max(1, batch_cells // n)
+    entries = {}
+    for s, longs in pairs:
+        for k in range(0, len(longs), rows):
+            batch = longs[k:k + rows]
+            entries.update(zip(((s, w) for w in batch), _crossover_entries(sma, s, batch, tie_tol)))
+
+    # Per-bar outcome of a buy / a sell entered at that bar; one bar may be both across pairs
+    buy_any = np.zeros(n, dtype=bool)
+    sell_any = np.zeros(n, dtype=bool)
+    for buy_idx, sell_idx in entries.values():
+        buy_any[buy_idx] = True
+        sell_any[sell_idx] = True
+    buy_idx, sell_idx = np.flatnonzero(buy_any), np.flatnonzero(sell_any)
+    entry_idx = np.concatenate([buy_idx, sell_idx])
+    is_buy = np.arange(len(entry_idx)) < len(buy_idx)
+    sign = np.where(is_buy, 1, -1)
+    entry = close[entry_idx]
+    sl = entry * (1 - sign * sl_pct / 100)
+    tp = entry * (1 + sign * tp_pct / 100)
+    j, stopped = _first_exits(df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64),
+                              entry_idx, is_buy, sl, tp, pyramids=_exit_pyramids(df))
+    profit = np.zeros((2, n))  # [buy/sell][bar]
+    outcome = np.zeros((2, n), dtype=np.int8)  # 1 win, -1 loss, 0 open
+    side = np.where(is_buy, 0, 1)
+    profit[side, entry_idx] = np.where(j >= 0, sign * (np.where(stopped, sl, tp) - entry), 0.0)
+    outcome[side, entry_idx] = np.where(j < 0, 0, np.where(stopped, -1, 1))
+
+    results = []
+    for (s, w), (b, e) in entries.items():
+        total = len(b) + len(e)
+        wins = int((outcome[0, b] > 0).sum() + (outcome[1, e] > 0).sum())
+        results.append({
+            "Short": s,
+            "Long": w,
+            "Trades": total,
+            "Wins": wins,
+            "Losses": int((outcome[0, b] < 0).sum() + (outcome[1, e] < 0).sum()),
+            "Winrate (%)": round(100 * wins / total, 2) if total else 0,
+            "Total Profit": round(float(profit[0, b].sum() + profit[1, e].sum()), 5)
+        })
 
     return pd.DataFrame(results)
+
+
+def _rsi_inputs(df):
+    from ta.momentum import RSIIndicator
+    # Kept local: the caller's frame (or read-only Bars) is not modified
+    return df['Close'].to_numpy(dtype=np.float64), RSIIndicator(df['Close']).rsi().to_numpy()
+
+
+def _rsi_combo(close, rsi, oversold, overbought) -> dict:
+    """One optimize_rsi_strategy row: a long entry whenever RSI crosses up through `oversold`."""
+    wins = 0
+    losses = 0
+    profit = 0
+    for i in range(1, len(close)):
+        entry = close[i]
+        if rsi[i] > oversold and rsi[i - 1] <= oversold:
+            tp = entry * 1.02
+            sl = entry * 0.99
+            if tp > entry:
+                wins += 1
+                profit += tp - entry
+            else:
+                losses += 1
+                profit -= entry - sl
+
+    total = wins + losses
+    winrate = round(100 * wins / total, 2) if total else 0
+    return {
+        "Oversold": oversold,
+        "Overbought": overbought,
+        "Trades": total,
+        "Wins": wins,
+        "Losses": losses,
+        "Winrate (%)": winrate,
+        "Total Profit": round(profit, 2)
+    }
+
+
+def _rsi_job(combo):
+    # RSI does not depend on the thresholds, so each worker computes it once
+    if "rsi_inputs" not in _worker:
+        _worker["rsi_inputs"] = _rsi_inputs(_worker["df"])
+    return _rsi_combo(*_worker["rsi_inputs"], *combo)
+
+
+def optimize_rsi_strategy(df, oversold_list=[25, 30, 35], overbought_list=[65, 70, 75], max_workers=1):
+    """
+    Score every oversold/overbought pair. With max_workers > 1 (None = all
+    cores) the pairs are split across processes that map the bars from shared
+    memory instead of receiving a pickled frame.
+    """
+    combos = [(oversold, overbought) for oversold in oversold_list for overbought in overbought_list
+              if oversold < overbought]
+    if max_workers == 1 or len(combos) < 2:
+        inputs = _rsi_inputs(df)
+        return pd.DataFrame([_rsi_combo(*inputs, *combo) for combo in combos])
+
+    with share_bars(df) as shared, ProcessPoolExecutor(
+            max_workers=min(max_workers or os.cpu_count() or 1, len(combos)), initializer=_init_worker,
+            initargs=(shared.handle,)) as pool:
+        return pd.DataFrame(list(pool.map(_rsi_job, combos)))
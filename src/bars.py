@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+REQUIRED_COLUMNS = ("Open", "High", "Low", "Close")
+
+
+def _frozen(values, dtype=None) -> np.ndarray:
+    """Contiguous read-only array; a view of `values` whenever no conversion is needed."""
+    arr = np.ascontiguousarray(values, dtype=dtype).view()
+    arr.flags.writeable = False
+    return arr
+
+
+class Bars:
+    """
+    Read-only OHLCV bars held as one contiguous NumPy array per column.
+    Quacks like the slice of a DataFrame the analysis code uses: bars['Close']
+    is a Series over the same memory, `index`, `columns`, len() and iloc[a:b]
+    work, and slicing returns views, so a history is allocated once and every
+    stage, backtest and chart of a run reads the same pages.
+    """
+
+    __slots__ = ("_index", "_arrays")
+
+    def __init__(self, index, arrays: dict, dtype=None):
+        missing = [c for c in REQUIRED_COLUMNS if c not in arrays]
+        if missing:
+            raise ValueError(f"❌ Bars need {', '.join(missing)} column(s).")
+        index = pd.Index(index)
+        arrays = {c: _frozen(arrays[c], dtype) for c in PRICE_COLUMNS if c in arrays}
+        if any(len(a) != len(index) for a in arrays.values()):
+            raise ValueError("❌ Every bar column must have one value per index entry.")
+        object.__setattr__(self, "_index", index)
+        object.__setattr__(self, "_arrays", arrays)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64) -> "Bars":
+        """
+        Bars over the OHLCV columns of `df` (other columns are dropped). Float64
+        columns are shared with `df` rather than copied; dtype=np.float32 halves
+        the footprint at the cost of one conversion.
+        """
+        if isinstance(df, Bars):
+            return cls(df._index, df._arrays, dtype)
+        return cls(df.index, {c: df[c].to_numpy() for c in PRICE_COLUMNS if c in df.columns}, dtype)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Bars are read-only")
+
+    def __reduce__(self):
+        return Bars, (self._index, self._arrays)
+
+    # --- DataFrame-like access ---
+
+    @property
+    def index(self) -> pd.Index:
+        return self._index
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(list(self._arrays))
+
+    @property
+    def empty(self) -> bool:
+        return len(self._index) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays.values()) + self._index.nbytes
+
+    @property
+    def iloc(self) -> "_BarsILoc":
+        return _BarsILoc(self)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, column):
+        return column in self._arrays
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._arrays:
+                raise KeyError(key)
+            return pd.Series(self._arrays[key], index=self._index, name=key, copy=False)
+        if isinstance(key, slice):
+            return self._take(key)
+        # Boolean / positional arrays select rows (this one does copy)
+        return self._take(np.asarray(key))
+
+    def __repr__(self):
+        dtype = next(iter(self._arrays.values())).dtype
+        span = f", {self._index[0]} .. {self._index[-1]}" if len(self) else ""
+        return f"Bars({len(self)} x {'/'.join(self._arrays)}, {dtype}{span})"
+
+    def _take(self, rows) -> "Bars":
+        return Bars(self._index[rows], {c: a[rows] for c, a in self._arrays.items()})
+
+    def array(self, column) -> np.ndarray:
+        """The read-only array behind `column`."""
+        return self._arrays[column]
+
+    def recent(self, duration) -> "Bars":
+        """
+        View of the bars within `duration` (a Timedelta or string like "2D") of
+        the last one; same rows as df[df.index >= df.index.max() - duration].
+        """
+        if self.empty:
+            return self
+        cutoff = self._index.max() - pd.Timedelta(duration)
+        if self._index.is_monotonic_increasing:
+            return self._take(slice(self._index.searchsorted(cutoff, side="left"), None))
+        return self._take(self._index >= cutoff)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame over the same (read-only) column arrays, for pandas-only consumers."""
+        return pd.DataFrame(dict(self._arrays), index=self._index, copy=False)
+
+
+class _BarsILoc:
+    __slots__ = ("_bars",)
+
+    def __init__(self, bars):
+        self._bars = bars
+
+    def __getitem__(self, rows):
+        if isinstance(rows, (int, np.integer)):
+            bars = self._bars
+            return pd.Series({c: a[rows] for c, a in bars._arrays.items()}, name=bars.index[rows])
+        return self._bars[rows]
+
+
+def as_frame(data, columns=None) -> pd.DataFrame:
+    """`data` (DataFrame or Bars) as a DataFrame, optionally limited to `columns`, without copying prices."""
+    df = data.to_frame() if isinstance(data, Bars) else data
+    return df[list(columns)] if columns is not None else df
@@ -1,78 +1,145 @@
 import pandas as pd
 import numpy as np
-from scipy.signal import find_peaks
+from numpy.lib.stride_tricks import sliding_window_view
+from src.swing_points import SwingPointIndex
+from src.profiling import profiled
 
-def detect_double_top_bottom(df: pd.DataFrame, threshold=0.005, min_distance=10) -> list:
-    patterns = []
+EVENT_COLUMNS = ["name", "direction", "first_idx", "second_idx", "confirm_idx",
+                 "first_price", "second_price", "neckline", "projected_target"]
 
-    prices = df['Close'].values
-    dates = df.index
 
-    # Detect peaks and troughs
-    peaks, _ = find_peaks(prices, distance=min_distance)
-    troughs, _ = find_peaks(-prices, distance=min_distance)
+def _double_candidates(prices, ext, threshold, top):
+    """Consecutive extremum pairs of similar price with a deeper swing between them."""
+    if len(ext) < 2:
+        return (np.empty(0, dtype=np.int64),) * 2 + (np.empty(0),)
 
-    # Track last used peak/trough to avoid overlap
-    last_top_index = -50
-    last_bottom_index = -50
+    p1, p2 = ext[:-1], ext[1:]
+    # Reduce each [p1 + 1, p2) gap in one pass; the odd slots are the gaps between pairs
+    bounds = np.column_stack([p1 + 1, p2]).ravel()
+    if top:
+        middle = np.minimum.reduceat(prices, bounds)[::2]
+        deeper = middle < np.minimum(prices[p1], prices[p2])
+    else:
+        middle = np.maximum.reduceat(prices, bounds)[::2]
+        deeper = middle > np.maximum(prices[p1], prices[p2])
 
-    # --- Double Top Detection ---
-    for i in range(len(peaks) - 1):
-        p1, p2 = peaks[i], peaks[i + 1]
+    similar = np.abs(prices[p1] - prices[p2]) / prices[p1] < threshold
+    keep = similar & (p2 - p1 > 1) & deeper
+    return p1[keep], p2[keep], middle[keep]
 
-        # Skip if too close to last detected pattern
-        if p1 - last_top_index < 30:
-            continue
 
-        # Price similarity check
-        if abs(prices[p1] - prices[p2]) / prices[p1] < threshold:
-            # Check for valley in between
-            middle = prices[p1+1:p2]
-            if len(middle) > 0 and middle.min() < min(prices[p1], prices[p2]):
-                neckline = middle.min()
-                projected_target = neckline - (prices[p1] - neckline)
-
-                pattern = {
-                    "name": "Double Top",
-                    "status": "forming" if p2 >= len(prices) - 2 else "completed",
-                    "validation_confidence": 0.8,
-                    "peak1": round(prices[p1], 5),
-                    "peak2": round(prices[p2], 5),
-                    "neckline": round(neckline, 5),
-                    "projected_target": round(projected_target, 5)
-                }
-                patterns.append(pattern)
-                last_top_index = p2  # prevent overlapping
-
-    # --- Double Bottom Detection ---
-    for i in range(len(troughs) - 1):
-        t1, t2 = troughs[i], troughs[i + 1]
-
-        # Skip if too close to last detected pattern
-        if t1 - last_bottom_index < 30:
-            continue
+def _pivots(prices, distance, top):
+    """
+    Causal swing points: bars that are the extreme of the `distance` bars on each
+    side (first one wins on ties). Each is known `distance` bars after it, and
+    bars whose right-hand window is not complete yet are never pivots.
+    """
+    n = len(prices)
+    if n <= distance:
+        return np.empty(0, dtype=np.int64)
+    signed = prices if top else -prices
+    padded = np.concatenate([np.full(distance, -np.inf), signed, np.full(distance, -np.inf)])
+    windows = sliding_window_view(padded, 2 * distance + 1)[:n - distance]
+    centre = signed[:n - distance]
+    is_pivot = (centre > windows[:, :distance].max(axis=1)) & (centre >= windows[:, distance + 1:].max(axis=1))
+    return np.flatnonzero(is_pivot)
+
+
+def _drop_overlaps(p1, p2, min_gap):
+    # Greedy like the original loop: a pattern must start min_gap bars after the previous one ended
+    keep = np.zeros(len(p1), dtype=bool)
+    last = -50
+    for i in range(len(p1)):
+        if p1[i] - last >= min_gap:
+            keep[i] = True
+            last = p2[i]
+    return keep
+
+
+def scan_double_top_bottom(df: pd.DataFrame, threshold=0.005, min_distance=10, min_gap=30,
+                           confirm_bars=50, swings=None, causal=False) -> pd.DataFrame:
+    """
+    Every double top and double bottom over the whole history as an event table.
+    `confirm_idx` is the first bar within `confirm_bars` after the second extremum
+    that closes through the neckline, or -1 if price never broke it.
+
+    The default extrema are find_peaks swings over the whole history, where a
+    later peak can displace an earlier one. With `causal`, extrema are pivots
+    known `min_distance` bars after they form, and a pattern confirms no earlier
+    than that. Every event then depends only on bars up to its confirm_idx, as
+    a backtest signal must.
+    """
+    prices = df['Close'].to_numpy(dtype=np.float64)
+    if causal:
+        extrema = (_pivots(prices, min_distance, True), _pivots(prices, min_distance, False))
+    else:
+        swings = swings if swings is not None else SwingPointIndex(df)
+        extrema = (swings.peaks('Close', min_distance), swings.troughs('Close', min_distance))
+    # The neckline can only be confirmed once the second extremum is known
+    lag = min_distance if causal else 1
+
+    # Pad with NaN so every second extremum has a full look-ahead window
+    window_bars = max(confirm_bars - lag + 1, 1)
+    ahead = sliding_window_view(np.concatenate([prices, np.full(confirm_bars + lag + 1, np.nan)]), window_bars)
 
-        # Price similarity check
-        if abs(prices[t1] - prices[t2]) / prices[t1] < threshold:
-            # Check for peak in between
-            middle = prices[t1+1:t2]
-            if len(middle) > 0 and middle.max() > max(prices[t1], prices[t2]):
-                neckline = middle.max()
-                projected_target = neckline + (neckline - prices[t1])
-
-                pattern = {
-                    "name": "Double Bottom",
-                    "status": "forming" if t2 >= len(prices) - 2 else "completed",
-                    "validation_confidence": 0.8,
-                    "trough1": round(prices[t1], 5),
-                    "trough2": round(prices[t2], 5),
-                    "neckline": round(neckline, 5),
-                    "projected_target": round(projected_target, 5)
-                }
-                patterns.append(pattern)
-                last_bottom_index = t2
-
-    latest_top = next((p for p in reversed(patterns) if p['name'] == 'Double Top'), None)
-    latest_bottom = next((p for p in reversed(patterns) if p['name'] == 'Double Bottom'), None)
-    return [p for p in [latest_top, latest_bottom] if p]
+    tables = []
+    for name, top, ext in (("Double Top", True, extrema[0]), ("Double Bottom", False, extrema[1])):
+        p1, p2, neck = _double_candidates(prices, ext, threshold, top)
+        keep = _drop_overlaps(p1, p2, min_gap)
+        p1, p2, neck = p1[keep], p2[keep], neck[keep]
 
+        window = ahead[p2 + lag]
+        broke = window < neck[:, None] if top else window > neck[:, None]
+        confirm = np.where(broke.any(axis=1), p2 + lag + broke.argmax(axis=1), -1)
+
+        height = prices[p1] - neck
+        tables.append(pd.DataFrame({
+            "name": name,
+            "direction": -1 if top else 1,
+            "first_idx": p1,
+            "second_idx": p2,
+            "confirm_idx": confirm,
+            "first_price": prices[p1],
+            "second_price": prices[p2],
+            "neckline": neck,
+            "projected_target": neck - height,
+        }, columns=EVENT_COLUMNS))
+
+    events = pd.concat(tables, ignore_index=True)
+    events["name"] = events["name"].astype("category")
+    return events.sort_values(["second_idx", "direction"], kind="stable").reset_index(drop=True)
+
+
+def pattern_signal_series(df: pd.DataFrame, events=None, **scan_kwargs) -> pd.Series:
+    """
+    Per-bar pattern signal: +1 on a confirmed double bottom, -1 on a confirmed double top.
+    Built from the causal scan, so each bar's value only uses bars up to it.
+    """
+    events = events if events is not None else scan_double_top_bottom(df, causal=True, **scan_kwargs)
+    confirmed = events[events["confirm_idx"] >= 0]
+    signal = np.zeros(len(df), dtype=np.int8)
+    signal[confirmed["confirm_idx"].to_numpy()] = confirmed["direction"].to_numpy()
+    return pd.Series(signal, index=df.index, name="pattern_signal")
+
+
+@profiled()
+def detect_double_top_bottom(df: pd.DataFrame, threshold=0.005, min_distance=10, swings=None) -> list:
+    events = scan_double_top_bottom(df, threshold=threshold, min_distance=min_distance, swings=swings)
+    n = len(df)
+
+    patterns = []
+    for name, first, second in (("Double Top", "peak1", "peak2"), ("Double Bottom", "trough1", "trough2")):
+        matches = events[events["name"] == name]
+        if matches.empty:
+            continue
+        e = matches.iloc[-1]
+        patterns.append({
+            "name": name,
+            "status": "forming" if e["second_idx"] >= n - 2 else "completed",
+            "validation_confidence": 0.8,
+            first: round(e["first_price"], 5),
+            second: round(e["second_price"], 5),
+            "neckline": round(e["neckline"], 5),
+            "projected_target": round(e["projected_target"], 5)
+        })
+    return patterns
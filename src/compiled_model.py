@@ -0,0 +1,131 @@
+import os
+import numpy as np
+from src.ml_model import MODEL_PATH, FEATURE_COLS, extract_features
+
+COMPILED_MODEL_PATH = "models/forex_model.npz"
+
+_loaded = {}
+
+
+def export_compiled_model(model=None, out_path=COMPILED_MODEL_PATH, check_X=None, atol=1e-6) -> str:
+    """
+    Flatten a fitted GradientBoostingClassifier into plain NumPy arrays.
+    All trees share one node table; `roots` holds the first node of each
+    (stage, class) tree. If `check_X` is given, the compiled probabilities
+    are checked against model.predict_proba before anything is written.
+    """
+    if model is None:
+        import joblib
+        model = joblib.load(MODEL_PATH)
+
+    if not hasattr(model, "estimators_") or not hasattr(model, "learning_rate"):
+        raise ValueError("❌ Only fitted gradient boosting classifiers can be compiled.")
+
+    stages = model.estimators_
+    n_stages, n_trees_per_stage = stages.shape
+    n_features = model.n_features_in_
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for stage in stages:
+        for est in stage:
+            tree = est.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            # Leaves point at themselves so traversal can run a fixed number of steps
+            own = np.arange(offset, offset + tree.node_count)
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+            value.append(tree.value[:, 0, 0])
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+
+    # Constant raw score of the init estimator, recovered from the public API
+    x0 = np.zeros((1, n_features))
+    raw = np.asarray(model.decision_function(x0), dtype=np.float64).reshape(1, -1)
+    tree_sum = np.array([[est.predict(x0.astype(np.float32))[0] for est in stage] for stage in stages]).sum(axis=0)
+    init_raw = raw[0] - model.learning_rate * tree_sum
+
+    compiled = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+        "init_raw": init_raw,
+        "learning_rate": np.float64(model.learning_rate),
+        "n_trees_per_stage": np.int32(n_trees_per_stage),
+        "max_depth": np.int32(max_depth),
+        "classes": np.asarray(model.classes_).astype(str),
+        "features": np.array(getattr(model, "feature_names_in_", FEATURE_COLS)).astype(str),
+    }
+
+    if check_X is not None:
+        expected = model.predict_proba(check_X)
+        got = predict_proba_compiled(compiled, check_X)
+        if not np.allclose(expected, got, atol=atol):
+            raise ValueError(f"❌ Compiled model deviates from predict_proba by {np.abs(expected - got).max():.2e}")
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez(out_path, **compiled)
+    _loaded.pop(out_path, None)
+    return out_path
+
+
+def load_compiled_model(path=COMPILED_MODEL_PATH) -> dict:
+    if path not in _loaded:
+        if not os.path.exists(path):
+            raise FileNotFoundError("❌ Compiled model not found. Train the model first from the GUI.")
+        with np.load(path) as data:
+            _loaded[path] = {k: data[k] for k in data.files}
+    return _loaded[path]
+
+
+def predict_proba_compiled(compiled, X) -> np.ndarray:
+    """
+    Batch predict_proba over all trees at once: every (row, tree) pair walks
+    one level per step, for max_depth steps.
+    """
+    # sklearn trees compare float32 inputs against float64 thresholds
+    X = np.asarray(X, dtype=np.float32)
+    n = len(X)
+    rows = np.arange(n)[:, None]
+
+    node = np.broadcast_to(compiled["roots"], (n, len(compiled["roots"]))).copy()
+    for _ in range(int(compiled["max_depth"])):
+        go_left = X[rows, compiled["feature"][node]] <= compiled["threshold"][node]
+        node = np.where(go_left, compiled["left"][node], compiled["right"][node])
+
+    k = int(compiled["n_trees_per_stage"])
+    leaf_sum = compiled["value"][node].reshape(n, -1, k).sum(axis=1)
+    raw = compiled["init_raw"] + compiled["learning_rate"] * leaf_sum
+
+    if k == 1:
+        p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+        return np.column_stack([1.0 - p, p])
+
+    raw = raw - raw.max(axis=1, keepdims=True)
+    exp = np.exp(raw)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def predict_compiled(compiled, X) -> np.ndarray:
+    return compiled["classes"][predict_proba_compiled(compiled, X).argmax(axis=1)]
+
+
+def predict_signal_compiled(df, support_levels, resistance_levels, path=COMPILED_MODEL_PATH):
+    """Same output as ml_model.predict_signal, without importing scikit-learn."""
+    compiled = load_compiled_model(path)
+    df = extract_features(df, support_levels, resistance_levels)
+
+    if df.empty:
+        raise ValueError("❌ No data to predict.")
+
+    latest = df[list(compiled["features"])].iloc[-1:].values
+    prob = predict_proba_compiled(compiled, latest)[0]
+
+    return compiled["classes"][prob.argmax()], round(prob.max() * 100, 2)
@@ -1,6 +1,8 @@
 import pandas as pd
 from src.live_fetcher import fetch_live_forex
+from src.profiling import profiled
 
+@profiled()
 def load_forex_data(filepath):
     df = pd.read_csv(filepath)
 
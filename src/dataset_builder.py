@@ -0,0 +1,145 @@
+import os
+import glob
+import json
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.data_handler import load_forex_data
+from src.sr_levels import identify_sr_levels
+from src.ml_model import extract_features, label_data, FEATURE_COLS
+
+DATA_DIR = "data"
+DATASET_DIR = "datasets/pooled"
+MANIFEST_FILE = "manifest.json"
+LABEL_HORIZON = 3  # bars looked ahead by label_data
+
+
+def discover_history_files(data_dir=DATA_DIR, symbols=None, timeframes=None):
+    """
+    Find local history CSVs named like `EURUSD_M15_2024.csv`.
+    Returns a list of (path, symbol, timeframe) tuples.
+    """
+    files = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "**", "*.csv"), recursive=True)):
+        parts = os.path.splitext(os.path.basename(path))[0].split("_")
+        symbol = parts[0].upper()
+        timeframe = parts[1].upper() if len(parts) > 1 else None
+
+        if symbols and symbol not in symbols:
+            continue
+        if timeframes and timeframe not in timeframes:
+            continue
+        files.append((path, symbol, timeframe))
+    return files
+
+
+def build_file_shards(path, symbol, timeframe, out_dir, window_bars=2000, rows_per_shard=500000):
+    """
+    Worker: turn one history file into labeled feature shards.
+    S/R levels are computed per window, the same way train_model sees a GUI window.
+    """
+    df, inferred_tf = load_forex_data(path)
+    timeframe = timeframe or inferred_tf
+
+    frames = []
+    for start in range(0, len(df), window_bars):
+        window = df.iloc[start:start + window_bars]
+        if len(window) < 100:
+            continue
+
+        sr = identify_sr_levels(window)
+        feats = label_data(extract_features(window, sr['support'], sr['resistance']))
+        # The last bars have no future close to label against
+        feats = feats.iloc[:-LABEL_HORIZON]
+        if feats.empty:
+            continue
+
+        out = feats[FEATURE_COLS + ['label']].astype({c: 'float64' for c in FEATURE_COLS})
+        out.insert(0, 'timestamp', feats.index.values)
+        out.insert(1, 'symbol', symbol)
+        out.insert(2, 'timeframe', timeframe)
+        frames.append(out)
+
+    if not frames:
+        return []
+
+    data = pd.concat(frames, ignore_index=True)
+    stem = f"{symbol}_{timeframe}_{os.path.splitext(os.path.basename(path))[0]}"
+    shards = []
+    for i, start in enumerate(range(0, len(data), rows_per_shard)):
+        shard_path = os.path.join(out_dir, f"{stem}_{i:04d}.parquet")
+        data.iloc[start:start + rows_per_shard].to_parquet(shard_path, index=False)
+        shards.append({"path": os.path.basename(shard_path), "rows": min(rows_per_shard, len(data) - start),
+                       "symbol": symbol, "timeframe": timeframe})
+    return shards
+
+
+def build_pooled_dataset(
+    data_dir=DATA_DIR,
+    out_dir=DATASET_DIR,
+    symbols=None,
+    timeframes=None,
+    window_bars=2000,
+    rows_per_shard=500000,
+    max_workers=None
+) -> dict:
+    """
+    Build a pooled training set from every matching history file in parallel.
+    Shards are written as Parquet next to a manifest describing them.
+    """
+    files = discover_history_files(data_dir, symbols, timeframes)
+    if not files:
+        raise FileNotFoundError(f"❌ No history CSVs found in {data_dir}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards, errors = [], []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(build_file_shards, path, symbol, tf, out_dir, window_bars, rows_per_shard): path
+            for path, symbol, tf in files
+        }
+        for future in as_completed(futures):
+            try:
+                shards.extend(future.result())
+            except Exception as e:
+                errors.append({"path": futures[future], "error": str(e)})
+
+    shards.sort(key=lambda s: s["path"])
+    manifest = {
+        "features": FEATURE_COLS,
+        "label": "label",
+        "rows": sum(s["rows"] for s in shards),
+        "shards": shards,
+        "errors": errors
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def iter_dataset_batches(dataset_dir=DATASET_DIR, batch_size=65536, columns=None):
+    """
+    Stream a pooled dataset back as DataFrames of exactly `batch_size` rows
+    (the last one may be shorter). Only one batch is held in memory at a time.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest_path = os.path.join(dataset_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"❌ No dataset manifest in {dataset_dir}. Build the dataset first.")
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    pending = None
+    for shard in manifest["shards"]:
+        reader = pq.ParquetFile(os.path.join(dataset_dir, shard["path"]))
+        for record_batch in reader.iter_batches(batch_size=batch_size, columns=columns):
+            table = pa.Table.from_batches([record_batch])
+            pending = table if pending is None else pa.concat_tables([pending, table])
+            while pending.num_rows >= batch_size:
+                yield pending.slice(0, batch_size).to_pandas()
+                pending = pending.slice(batch_size)
+
+    if pending is not None and pending.num_rows:
+        yield pending.to_pandas()
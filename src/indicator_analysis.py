@@ -1,17 +1,20 @@
 # src/indicator_analysis.py
 
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
-from ta.trend import SMAIndicator
+from src.indicators import compute_indicators
+from src.profiling import profiled
 
-def analyze_indicators(df: pd.DataFrame) -> dict:
-    df = df.copy()
+# (name, params) arrays read by analyze_indicators
+INDICATOR_KEYS = [("rsi", (14,)), ("macd", ()), ("signal", ()), ("macd_hist", ()), ("sma", (50,)), ("sma", (200,))]
+
+
+@profiled()
+def analyze_indicators(df: pd.DataFrame, cache=None) -> dict:
+    """`cache` is an indicator cache (see compute_indicators) shared with other stages."""
+    arrays = compute_indicators(df, INDICATOR_KEYS, cache)
 
     # --- RSI ---
-    rsi = RSIIndicator(close=df['Close'], window=14)
-    df['rsi'] = rsi.rsi()
-    rsi_value = df['rsi'].iloc[-1]
+    rsi_value = arrays[("rsi", (14,))][-1]
 
     if rsi_value > 70:
         rsi_status = "Overbought"
@@ -21,14 +24,9 @@ def analyze_indicators(df: pd.DataFrame) -> dict:
         rsi_status = "Neutral"
 
     # --- MACD ---
-    macd = MACD(close=df['Close'])
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    df['macd_hist'] = macd.macd_diff()
-
-    macd_val = df['macd'].iloc[-1]
-    signal_val = df['macd_signal'].iloc[-1]
-    hist_val = df['macd_hist'].iloc[-1]
+    macd_hist = arrays[("macd_hist", ())]
+    macd_val = arrays[("macd", ())][-1]
+    signal_val = arrays[("signal", ())][-1]
 
     if macd_val > signal_val:
         macd_status = "Bullish Crossover"
@@ -37,14 +35,11 @@ def analyze_indicators(df: pd.DataFrame) -> dict:
     else:
         macd_status = "Neutral"
 
-    hist_direction = "Increasing" if df['macd_hist'].iloc[-1] > df['macd_hist'].iloc[-2] else "Decreasing"
+    hist_direction = "Increasing" if macd_hist[-1] > macd_hist[-2] else "Decreasing"
 
     # --- Moving Averages ---
-    sma_50 = SMAIndicator(close=df['Close'], window=50).sma_indicator()
-    sma_200 = SMAIndicator(close=df['Close'], window=200).sma_indicator()
-
-    sma_50_val = sma_50.iloc[-1]
-    sma_200_val = sma_200.iloc[-1]
+    sma_50_val = arrays[("sma", (50,))][-1]
+    sma_200_val = arrays[("sma", (200,))][-1]
     price = df['Close'].iloc[-1]
 
     price_relation = (
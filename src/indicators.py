@@ -0,0 +1,109 @@
+import inspect
+import numpy as np
+import pandas as pd
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    # fmax skips the missing previous close on the first bar, like ta does
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def average_true_range(high, low, close, window=14) -> np.ndarray:
+    """
+    Wilder ATR with the same values as ta's AverageTrueRange (zeros during warm-up),
+    computed as one EWM pass instead of a per-bar Python loop.
+    """
+    tr = true_range(high, low, close)
+    atr = np.zeros(len(tr))
+    if len(tr) >= window:
+        seeded = np.concatenate([[tr[:window].mean()], tr[window:]])
+        atr[window - 1:] = pd.Series(seeded).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    return atr
+
+
+def sma(close, window=20) -> np.ndarray:
+    return pd.Series(close).rolling(window).mean().to_numpy()
+
+
+def ema(close, window=20) -> np.ndarray:
+    return pd.Series(close).ewm(span=window, min_periods=window, adjust=False).mean().to_numpy()
+
+
+def rsi(close, window=14) -> np.ndarray:
+    """Wilder RSI, same values as ta's RSIIndicator."""
+    diff = pd.Series(close).diff()
+    up = diff.where(diff > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    down = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(down == 0, 100, 100 - 100 / (1 + up / down))
+    return np.where(up.isna(), np.nan, out)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram, same values as ta's MACD."""
+    line = ema(close, fast) - ema(close, slow)
+    sig = pd.Series(line).ewm(span=signal, min_periods=signal, adjust=False).mean().to_numpy()
+    return line, sig, line - sig
+
+
+def bollinger_bands(close, window=20, dev=2):
+    """Lower and upper band (population std, like ta)."""
+    s = pd.Series(close).rolling(window)
+    mid, std = s.mean().to_numpy(), s.std(ddof=0).to_numpy()
+    return mid - dev * std, mid + dev * std
+
+
+def pattern_signal(df) -> np.ndarray:
+    """+1 / -1 on bars that confirm a double bottom / top (see chart_patterns)."""
+    from src.chart_patterns import pattern_signal_series
+    return pattern_signal_series(df).to_numpy()
+
+
+# Named indicators usable in strategy rules: name -> fn(df, *params)
+INDICATORS = {
+    "open": lambda df: df['Open'].to_numpy(dtype=np.float64),
+    "high": lambda df: df['High'].to_numpy(dtype=np.float64),
+    "low": lambda df: df['Low'].to_numpy(dtype=np.float64),
+    "close": lambda df: df['Close'].to_numpy(dtype=np.float64),
+    "volume": lambda df: df['Volume'].to_numpy(dtype=np.float64),
+    "rsi": lambda df, window=14: rsi(df['Close'], int(window)),
+    "macd": lambda df, fast=12, slow=26, signal=9: macd(df['Close'], int(fast), int(slow), int(signal))[0],
+    "signal": lambda df, fast=12, slow=26, signal=9: macd(df['Close'], int(fast), int(slow), int(signal))[1],
+    "macd_hist": lambda df, fast=12, slow=26, signal=9: macd(df['Close'], int(fast), int(slow), int(signal))[2],
+    "sma": lambda df, window=20: sma(df['Close'], int(window)),
+    "ema": lambda df, window=20: ema(df['Close'], int(window)),
+    "atr": lambda df, window=14: average_true_range(df['High'], df['Low'], df['Close'], int(window)),
+    "bb_lower": lambda df, window=20, dev=2: bollinger_bands(df['Close'], int(window), dev)[0],
+    "bb_upper": lambda df, window=20, dev=2: bollinger_bands(df['Close'], int(window), dev)[1],
+    "pattern_signal": lambda df: pattern_signal(df),
+}
+
+
+def check_indicator(name, params=()):
+    """Raise ValueError unless `name` is a registered indicator that accepts len(params) parameters."""
+    key = name.lower()
+    if key not in INDICATORS:
+        raise ValueError(f"❌ Unknown indicator '{name}'. Available: {', '.join(sorted(INDICATORS))}")
+    # Every parameter after df has a default, so 0..len(them) values are accepted
+    accepted = len(inspect.signature(INDICATORS[key]).parameters) - 1
+    if len(params) > accepted:
+        expected = f"up to {accepted} parameter{'s' if accepted > 1 else ''}" if accepted else "no parameters"
+        raise ValueError(f"❌ {name.upper()} takes {expected}, got {len(params)}.")
+    return key
+
+
+def compute_indicator(df, name, params=()) -> np.ndarray:
+    return INDICATORS[check_indicator(name, params)](df, *params)
+
+
+def compute_indicators(df, keys, cache=None) -> dict:
+    """Compute each (name, params) key once; `cache` is reused and filled in place."""
+    cache = {} if cache is None else cache
+    for name, params in keys:
+        if (name, params) not in cache:
+            cache[(name, params)] = compute_indicator(df, name, params)
+    return cache
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from src.result_cache import array_digest
+
+# Upper bound on (ambiguous bars x sub-bars) gathered at once
+INTRABAR_CELLS = 4_000_000
+
+
+def _ns(index) -> np.ndarray:
+    return pd.DatetimeIndex(index).values.astype("datetime64[ns]").astype(np.int64)
+
+
+def _bar_bounds(index) -> tuple:
+    """[start, end) of every bar in ns; the last bar is assumed as long as the one before it."""
+    starts = _ns(index)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    if len(starts):
+        ends[-1] = starts[-1] + (starts[-1] - starts[-2] if len(starts) > 1 else 60_000_000_000)
+    return starts, ends
+
+
+class IntrabarResolver:
+    """
+    Lower-timeframe (M1 or tick) highs/lows kept as time-sorted arrays, used to
+    decide whether SL or TP was hit first inside a bar whose range covers both.
+    Build it once per symbol and pass it to run_backtest / resolve_trade_exits.
+    Tick data can be given with a single price column (Bid/Close) instead of High/Low.
+    """
+
+    def __init__(self, lower_df: pd.DataFrame):
+        lower_df = lower_df.sort_index()
+        self.times = _ns(lower_df.index)
+        price = lower_df['High'] if 'High' in lower_df else lower_df.get('Bid', lower_df.get('Close'))
+        self.high = price.to_numpy(dtype=np.float64)
+        price = lower_df['Low'] if 'Low' in lower_df else lower_df.get('Bid', lower_df.get('Close'))
+        self.low = price.to_numpy(dtype=np.float64)
+        self._bounds = {}
+        # Identifies the data in result cache keys
+        self.digest = array_digest(self.times, self.high, self.low)
+
+    def stop_first(self, bar_start, bar_end, is_buy, sl, tp) -> np.ndarray:
+        """
+        For bars [bar_start, bar_end) (ns) that touch both levels: True where the
+        stop is reached first. Bars without sub-bars, or whose first touching
+        sub-bar covers both levels, stay pessimistic (stop first).
+        """
+        lo = np.searchsorted(self.times, bar_start, side="left")
+        hi = np.searchsorted(self.times, bar_end, side="left")
+        stopped = np.ones(len(lo), dtype=bool)
+        if not len(lo) or not len(self.times):
+            return stopped
+
+        width = int((hi - lo).max())
+        rows = max(1, INTRABAR_CELLS // max(width, 1))
+        for s in range(0, len(lo), rows):
+            part = slice(s, s + rows)
+            cols = lo[part, None] + np.arange(width)
+            inside = cols < hi[part, None]
+            cols = np.minimum(cols, len(self.times) - 1)
+            h, l = self.high[cols], self.low[cols]
+            buy = is_buy[part, None]
+            sl_hit = np.where(buy, l <= sl[part, None], h >= sl[part, None]) & inside
+            tp_hit = np.where(buy, h >= tp[part, None], l <= tp[part, None]) & inside
+            first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), width)
+            first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), width)
+            stopped[part] = first_sl <= first_tp
+        return stopped
+
+    def for_bars(self, index):
+        """Tie resolver for bars of `index`: fn(bar_idx, is_buy, sl, tp) -> stop hit first."""
+        key = (len(index), index[0], index[-1]) if len(index) else (0,)
+        if key not in self._bounds:
+            self._bounds = {key: _bar_bounds(index)}
+        starts, ends = self._bounds[key]
+
+        def resolve(bar_idx, is_buy, sl, tp):
+            bar_idx = np.asarray(bar_idx, dtype=np.int64)
+            return self.stop_first(starts[bar_idx], ends[bar_idx], np.asarray(is_buy, dtype=bool),
+                                   np.asarray(sl, dtype=np.float64), np.asarray(tp, dtype=np.float64))
+        return resolve
@@ -1,8 +1,73 @@
 import os
-import csv
-from datetime import datetime
+import sqlite3
+from contextlib import closing
+import pandas as pd
 
+JOURNAL_DB = "trade_journal.db"
+# Legacy CSV journal, imported into the database the first time it is opened
 JOURNAL_FILE = "trade_journal.csv"
+LIVE_RUN = "live"
+
+COLUMNS = ["Strategy", "Entry", "SL", "TP", "Result", "RR", "Date", "Screenshot"]
+_FIELDS = "strategy, entry, sl, tp, result, rr, date, screenshot"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    entry REAL,
+    sl REAL,
+    tp REAL,
+    result TEXT,
+    rr REAL,
+    date TEXT,
+    screenshot TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades(strategy, date);
+CREATE INDEX IF NOT EXISTS idx_trades_date ON trades(date);
+CREATE INDEX IF NOT EXISTS idx_trades_result ON trades(result, date);
+CREATE INDEX IF NOT EXISTS idx_trades_run ON trades(run_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Databases whose schema (and CSV import) was already checked in this process
+_ready = set()
+
+
+def _connect():
+    con = sqlite3.connect(JOURNAL_DB, timeout=30)
+    if JOURNAL_DB not in _ready:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(_SCHEMA)
+        if con.execute("SELECT 1 FROM meta WHERE key = 'csv_imported'").fetchone() is None:
+            _import_csv(con, JOURNAL_FILE)
+            with con:
+                con.execute("INSERT OR REPLACE INTO meta VALUES ('csv_imported', ?)", (JOURNAL_FILE,))
+        _ready.add(JOURNAL_DB)
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+def _import_csv(con, path) -> int:
+    if not os.path.isfile(path):
+        return 0
+    df = pd.read_csv(path).reindex(columns=COLUMNS)
+    df["Screenshot"] = df["Screenshot"].fillna("")
+    # The CSV does not say where a row came from; live signals are the only named ones
+    run_id = df["Strategy"].eq("Live Signal").map({True: LIVE_RUN, False: "csv-import"})
+    values = df.astype(object).where(df.notna(), None)
+    rows = zip(run_id, *(values[c] for c in COLUMNS))
+    with con:
+        con.executemany(f"INSERT INTO trades (run_id, {_FIELDS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(df)
+
+
+def import_csv(path=JOURNAL_FILE) -> int:
+    """Append the rows of a CSV journal (Strategy, Entry, ... columns); returns the number imported."""
+    with closing(_connect()) as con:
+        return _import_csv(con, path)
+
 
 def log_trade(
     strategy: str,
@@ -13,11 +78,76 @@ def log_trade(
     rr: float,
     date: str,
     chart_path: str = "",
-    mode: str = "a"
+    mode: str = "a",
+    run_id: str = LIVE_RUN
 ):
-    file_exists = os.path.isfile(JOURNAL_FILE)
-    with open(JOURNAL_FILE, mode, newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists or mode == "w":
-            writer.writerow(["Strategy", "Entry", "SL", "TP", "Result", "RR", "Date", "Screenshot"])
-        writer.writerow([strategy, entry, sl, tp, result, rr, date, chart_path])
+    with closing(_connect()) as con, con:
+        if mode == "w":
+            con.execute("DELETE FROM trades")
+        con.execute(f"INSERT INTO trades (run_id, {_FIELDS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, strategy, float(entry), float(sl), float(tp), result, float(rr), date, chart_path))
+
+
+def log_trades(strategy: str, rows, run_id: str) -> int:
+    """
+    Insert many (entry, sl, tp, result, rr, date) rows in one transaction,
+    e.g. all trades of one backtest under its `run_id`.
+    """
+    rows = [(run_id, strategy, float(e), float(s), float(t), r, float(rr), d, "") for e, s, t, r, rr, d in rows]
+    with closing(_connect()) as con, con:
+        con.executemany(f"INSERT INTO trades (run_id, {_FIELDS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def has_run(run_id: str) -> bool:
+    with closing(_connect()) as con:
+        return con.execute("SELECT 1 FROM trades WHERE run_id = ? LIMIT 1", (run_id,)).fetchone() is not None
+
+
+def _where(strategy=None, result=None, source=None, date_from=None, date_to=None):
+    clauses, args = [], []
+    if strategy:
+        clauses.append("strategy = ?")
+        args.append(strategy)
+    if result:
+        clauses.append("result = ?")
+        args.append(result)
+    if source == "live":
+        clauses.append("run_id = ?")
+        args.append(LIVE_RUN)
+    elif source == "backtest":
+        clauses.append("run_id != ?")
+        args.append(LIVE_RUN)
+    if date_from:
+        clauses.append("date >= ?")
+        args.append(str(date_from))
+    if date_to:
+        clauses.append("date <= ?")
+        args.append(str(date_to))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+def query_trades(strategy=None, result=None, source=None, date_from=None, date_to=None,
+                 page=0, page_size=100) -> dict:
+    """
+    One page of journal rows, newest first, plus the total number of matches.
+    `source` is "live", "backtest" or None for both; dates compare as
+    "YYYY-MM-DD HH:MM" strings. page_size=None returns every match.
+    """
+    where, args = _where(strategy, result, source, date_from, date_to)
+    sql = f"SELECT {_FIELDS}, run_id FROM trades{where} ORDER BY date DESC, id DESC"
+    if page_size is not None:
+        sql += f" LIMIT {int(page_size)} OFFSET {int(page) * int(page_size)}"
+    with closing(_connect()) as con:
+        total = con.execute(f"SELECT COUNT(*) FROM trades{where}", args).fetchone()[0]
+        rows = pd.read_sql_query(sql, con, params=args)
+    rows.columns = COLUMNS + ["Run"]
+    return {"rows": rows, "total": total}
+
+
+def journal_values(column: str) -> list:
+    """Distinct strategies or results, for filter menus."""
+    if column not in ("strategy", "result"):
+        raise ValueError("❌ column must be 'strategy' or 'result'.")
+    with closing(_connect()) as con:
+        return [v for (v,) in con.execute(f"SELECT DISTINCT {column} FROM trades ORDER BY {column}") if v is not None]
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Code -> label for the int8 columns
+DIRECTIONS = ("Sell", "Buy")
+RESULTS = ("open", "win", "loss")
+EXIT_REASONS = ("open", "sl", "tp", "time")
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class TradeLedger:
+    """
+    Backtest trades as typed columns: int64 bar indices and exit times (ns),
+    float64 prices, profit and RR, int8 codes for direction, result and exit reason.
+    Dicts and formatted dates are only built when a row is indexed or iterated,
+    so it can be used where run_backtest used to return a list of trade dicts.
+    """
+
+    def __init__(self, columns: dict, tz=None):
+        self.columns = columns
+        self.tz = tz
+
+    @classmethod
+    def empty(cls):
+        ints, floats, codes = np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int8)
+        return cls({"entry_idx": ints, "is_buy": np.empty(0, dtype=bool), "entry": floats, "sl": floats, "tp": floats,
+                    "trail": floats, "max_bars": ints, "exit_idx": ints, "exit_time": ints, "exit_price": floats,
+                    "reason": codes, "result": codes, "profit": floats, "rr": floats})
+
+    def __len__(self):
+        return len(self.columns["entry_idx"])
+
+    def __getitem__(self, i):
+        return self._row(range(len(self))[i])
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    @property
+    def profit(self) -> np.ndarray:
+        return self.columns["profit"]
+
+    @property
+    def results(self) -> np.ndarray:
+        """Result labels ("win", "loss", "open") as an object array."""
+        return np.array(RESULTS, dtype=object)[self.columns["result"]]
+
+    @property
+    def exit_times(self) -> np.ndarray:
+        """Exit times as naive datetime64[ns] in the frame's own timezone."""
+        times = pd.DatetimeIndex(self.columns["exit_time"].view("datetime64[ns]"))
+        if self.tz is not None:
+            times = times.tz_localize("UTC").tz_convert(self.tz).tz_localize(None)
+        return times.to_numpy()
+
+    def _time(self, i) -> pd.Timestamp:
+        time = pd.Timestamp(int(self.columns["exit_time"][i]))
+        return time.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else time
+
+    def _has_path_rules(self) -> bool:
+        return bool((self.columns["trail"] > 0).any() or (self.columns["max_bars"] > 0).any())
+
+    def _row(self, i) -> dict:
+        c = self.columns
+        row = {"Type": DIRECTIONS[int(c["is_buy"][i])], "Entry": c["entry"][i], "SL": c["sl"][i], "TP": c["tp"][i],
+               "entry_idx": int(c["entry_idx"][i])}
+        if c["trail"][i] > 0:
+            row["Trail"] = c["trail"][i]
+        if c["max_bars"][i] > 0:
+            row["Max Bars"] = int(c["max_bars"][i])
+        row.update({
+            "result": RESULTS[c["result"][i]],
+            "profit": c["profit"][i],
+            "RR": c["rr"][i],
+            "date": self._time(i).strftime(DATE_FORMAT)
+        })
+        if "Trail" in row or "Max Bars" in row:
+            row["exit"] = EXIT_REASONS[c["reason"][i]]
+        return row
+
+    def to_frame(self) -> pd.DataFrame:
+        """Display table with the trade-dict column names; Type/result are categorical, date is datetime64."""
+        c = self.columns
+        frame = pd.DataFrame({
+            "Type": pd.Categorical.from_codes(c["is_buy"].astype(np.int8), DIRECTIONS),
+            "Entry": c["entry"],
+            "SL": c["sl"],
+            "TP": c["tp"],
+            "entry_idx": c["entry_idx"],
+        })
+        path_rules = self._has_path_rules()
+        if path_rules:
+            frame["Trail"] = c["trail"]
+            frame["Max Bars"] = c["max_bars"]
+        frame["result"] = pd.Categorical.from_codes(c["result"], RESULTS)
+        frame["profit"] = c["profit"]
+        frame["RR"] = c["rr"]
+        frame["date"] = self.exit_times
+        if path_rules:
+            frame["exit"] = pd.Categorical.from_codes(c["reason"], EXIT_REASONS)
+        return frame
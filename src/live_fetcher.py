@@ -1,8 +1,10 @@
 from twelvedata import TDClient
 import os
+from src.profiling import profiled
 
 TD_API_KEY = os.getenv("TD_API_KEY") or "2e4977cb99c34d1188b62619ed07d89a"
 
+@profiled()
 def fetch_live_forex(symbol: str, interval: str = "1min", outputsize: int = 100):
     td = TDClient(apikey=TD_API_KEY)
 
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from src.ledger import TradeLedger
+
+TRADING_DAYS = 252
+
+
+def trade_columns(trades) -> dict:
+    """profit / result / close time of run_backtest trades (TradeLedger, list of dicts or DataFrame) as arrays."""
+    if isinstance(trades, TradeLedger):
+        return {"profit": trades.profit, "result": trades.results, "time": trades.exit_times}
+    if isinstance(trades, pd.DataFrame):
+        frame = trades
+    else:
+        frame = pd.DataFrame(list(trades))
+    n = len(frame)
+    profit = frame["profit"].to_numpy(dtype=np.float64) if "profit" in frame else np.zeros(n)
+    result = frame["result"].to_numpy(dtype=object) if "result" in frame else np.full(n, "", dtype=object)
+    time = pd.to_datetime(frame["date"]).to_numpy() if "date" in frame else np.full(n, np.datetime64("NaT"))
+    return {"profit": profit, "result": result, "time": time}
+
+
+def run_lengths(mask) -> np.ndarray:
+    """Lengths of the runs of True in `mask`, in order (run-length encoding)."""
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8))
+    return np.flatnonzero(edges < 0) - np.flatnonzero(edges > 0)
+
+
+def streak_histogram(lengths) -> pd.Series:
+    """Streak length -> number of streaks of that length."""
+    counts = np.bincount(lengths) if len(lengths) else np.zeros(1, dtype=np.int64)
+    present = np.flatnonzero(counts)
+    return pd.Series(counts[present], index=pd.Index(present, name="streak"), name="Streak Count")
+
+
+def _rolling_mean(values, window):
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        csum = np.cumsum(np.concatenate([[0.0], values]))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _sharpe(returns, periods=TRADING_DAYS):
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    return float(returns.mean() / std * np.sqrt(periods)) if std else 0.0
+
+
+def daily_pnl(profit, time) -> pd.Series:
+    """Net profit per calendar day of trade close."""
+    valid = ~np.isnat(time)
+    days = time[valid].astype("datetime64[D]")
+    if not days.size:
+        return pd.Series(dtype=np.float64, name="profit")
+    first = days.min()
+    sums = np.bincount((days - first).astype(np.int64), weights=profit[valid])
+    index = first + np.arange(len(sums))
+    traded = np.isin(index, days)
+    return pd.Series(sums[traded], index=pd.Index(pd.to_datetime(index[traded]).date, name="date"), name="profit")
+
+
+def time_sharpe(profit, time, capital=10000, periods=TRADING_DAYS) -> float:
+    """
+    Annualised Sharpe from daily account returns. Trades are bucketed by close
+    date and weekdays without trades count as zero return.
+    """
+    valid = ~np.isnat(time)
+    if not valid.any():
+        return 0.0
+    days = time[valid].astype("datetime64[D]")
+    first = days.min()
+    pnl = np.bincount((days - first).astype(np.int64), weights=profit[valid])
+    calendar = first + np.arange(len(pnl))
+    weekday = np.is_busday(calendar) | (pnl != 0)
+    equity_before = capital + np.concatenate([[0.0], np.cumsum(pnl)[:-1]])
+    return _sharpe((pnl / equity_before)[weekday], periods)
+
+
+def backtest_metrics(trades, capital=10000, rolling_window=10) -> dict:
+    """
+    Every backtest panel statistic in one pass over the trade columns:
+    equity/winrate/drawdown curves, Sharpe (per trade and per day), profit factor,
+    loss and win streaks, and daily P&L.
+    """
+    cols = trade_columns(trades)
+    profit, result, time = cols["profit"], cols["result"], cols["time"]
+    n = len(profit)
+    wins = result == "win"
+    losses = result == "loss"
+
+    cumulative = np.cumsum(profit)
+    equity = capital + cumulative
+    peak = np.maximum.accumulate(equity) if n else equity
+    drawdown = (peak - equity) / peak if n else equity
+
+    gains = profit[profit > 0].sum()
+    pains = profit[profit < 0].sum()
+    loss_streaks = run_lengths(losses)
+    win_streaks = run_lengths(wins)
+
+    curve = pd.DataFrame({
+        "cumulative_profit": cumulative,
+        "equity": equity,
+        "winrate": np.cumsum(wins) / np.arange(1, n + 1) * 100,
+        "rolling_winrate": _rolling_mean(wins.astype(np.float64), rolling_window) * 100,
+        "drawdown": drawdown,
+    })
+
+    return {
+        "trades": n,
+        "total_pnl": float(profit.sum()),
+        "avg_trade": float(profit.mean()) if n else 0.0,
+        "median_trade": float(np.median(profit)) if n else 0.0,
+        "sharpe": _sharpe(profit),
+        "time_sharpe": time_sharpe(profit, time, capital),
+        "max_drawdown": float(drawdown.max()) if n else 0.0,
+        "profit_factor": float(gains / abs(pains)) if pains != 0 else 0.0,
+        "max_loss_streak": int(loss_streaks.max()) if loss_streaks.size else 0,
+        "max_win_streak": int(win_streaks.max()) if win_streaks.size else 0,
+        "loss_streaks": streak_histogram(loss_streaks),
+        "win_streaks": streak_histogram(win_streaks),
+        "daily_pnl": daily_pnl(profit, time),
+        "curve": curve
+    }
@@ -1,30 +1,33 @@
 import os
-import joblib
+import warnings
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.model_selection import train_test_split
 from ta.momentum import RSIIndicator
 from ta.trend import MACD
 from ta.volatility import AverageTrueRange
+from src.bars import as_frame
 
 MODEL_PATH = "models/forex_model.pkl"
+FEATURE_COLS = ['rsi', 'macd', 'macd_signal', 'ma_diff', 'candle_body',
+                'upper_shadow', 'lower_shadow', 'atr', 'dist_to_nearest_sr']
 
 def extract_features(df, support_levels, resistance_levels):
-    df = df.copy()
-    rsi = RSIIndicator(df['Close']).rsi()
-    macd = MACD(df['Close'])
-    df['rsi'] = rsi
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    df['ma_diff'] = df['Close'].rolling(5).mean() - df['Close'].rolling(20).mean()
-    df['candle_body'] = abs(df['Close'] - df['Open'])
-    df['upper_shadow'] = df['High'] - df[['Close', 'Open']].max(axis=1)
-    df['lower_shadow'] = df[['Close', 'Open']].min(axis=1) - df['Low']
-    df['atr'] = AverageTrueRange(df['High'], df['Low'], df['Close']).average_true_range()
-
+    # assign() returns a new frame sharing the price columns, so `df` itself is never copied
+    df = as_frame(df)
+    close, open_ = df['Close'], df['Open']
+    macd = MACD(close)
     sr_prices = [s['price'] for s in support_levels + resistance_levels]
-    df['dist_to_nearest_sr'] = df['Close'].apply(lambda x: min([abs(x - sr) for sr in sr_prices]) if sr_prices else 0)
+    df = df.assign(
+        rsi=RSIIndicator(close).rsi(),
+        macd=macd.macd(),
+        macd_signal=macd.macd_signal(),
+        ma_diff=close.rolling(5).mean() - close.rolling(20).mean(),
+        candle_body=abs(close - open_),
+        upper_shadow=df['High'] - np.fmax(close, open_),
+        lower_shadow=np.fmin(close, open_) - df['Low'],
+        atr=AverageTrueRange(df['High'], df['Low'], close).average_true_range(),
+        dist_to_nearest_sr=close.apply(lambda x: min([abs(x - sr) for sr in sr_prices]) if sr_prices else 0),
+    )
     df = df.dropna()
     return df
 
@@ -39,11 +42,16 @@ def label_data(df):
     return df
 
 def train_model(df, support_levels, resistance_levels):
+    # scikit-learn is only needed for training; inference can go through src.compiled_model
+    import joblib
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.model_selection import train_test_split
+    from src.compiled_model import export_compiled_model
+
     df = extract_features(df, support_levels, resistance_levels)
     df = label_data(df)
 
-    feature_cols = ['rsi', 'macd', 'macd_signal', 'ma_diff', 'candle_body',
-                    'upper_shadow', 'lower_shadow', 'atr', 'dist_to_nearest_sr']
+    feature_cols = FEATURE_COLS
 
     if len(df) < 100 or df['label'].nunique() < 2:
         raise ValueError("❌ Not enough data to train model or labels are not diverse.")
@@ -60,10 +68,60 @@ def train_model(df, support_levels, resistance_levels):
     if hasattr(model, "feature_importances_"):
         os.makedirs("models", exist_ok=True)
         joblib.dump(model, MODEL_PATH)
+        export_compiled_model(model, check_X=X_test)
 
     return model
 
+def train_pooled_model(dataset_dir, batch_size=65536, trees_per_batch=10, max_batches=None):
+    """
+    Train the classifier on a sharded dataset written by src.dataset_builder.
+    Each streamed batch adds `trees_per_batch` boosting stages fitted on that
+    batch only, so the full pooled history never has to fit in memory.
+    """
+    import joblib
+    from sklearn.ensemble import GradientBoostingClassifier
+    from src.dataset_builder import iter_dataset_batches
+    from src.compiled_model import export_compiled_model
+
+    model = GradientBoostingClassifier(n_estimators=0, warm_start=True)
+    classes = None
+    used = 0
+    skipped = []
+
+    for i, batch in enumerate(iter_dataset_batches(dataset_dir, batch_size=batch_size, columns=FEATURE_COLS + ['label'])):
+        batch_classes = sorted(batch['label'].unique())
+        if classes is None:
+            if len(batch_classes) < 2:
+                skipped.append((i, batch_classes))
+                continue
+            classes = batch_classes
+        elif batch_classes != classes:
+            # Label encoding must stay identical between stages
+            skipped.append((i, batch_classes))
+            continue
+
+        model.n_estimators += trees_per_batch
+        model.fit(batch[FEATURE_COLS], batch['label'])
+        fitted = batch
+        used += 1
+        if max_batches and used >= max_batches:
+            break
+
+    if used == 0:
+        raise ValueError("❌ No usable batches found in dataset (labels are not diverse).")
+    if skipped:
+        detail = ", ".join(f"#{i} {labels}" for i, labels in skipped[:5]) + (", ..." if len(skipped) > 5 else "")
+        warnings.warn(f"⚠️ Skipped {len(skipped)} of {used + len(skipped)} batches whose labels differ "
+                      f"from the model classes {classes}: {detail}. Use a larger batch_size or shuffle the dataset.")
+
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(model, MODEL_PATH)
+    export_compiled_model(model, check_X=fitted[FEATURE_COLS])
+    return model
+
 def predict_signal(df, support_levels, resistance_levels):
+    import joblib
+
     if not os.path.exists(MODEL_PATH):
         raise FileNotFoundError("❌ Trained model not found. Train it first from the GUI.")
 
@@ -74,9 +132,8 @@ def predict_signal(df, support_levels, resistance_levels):
         raise ValueError("❌ No data to predict.")
 
     latest = df.iloc[-1:]
-    features = ['rsi', 'macd', 'macd_signal', 'ma_diff', 'candle_body',
-                'upper_shadow', 'lower_shadow', 'atr', 'dist_to_nearest_sr']
-    
+    features = FEATURE_COLS
+
     pred = model.predict(latest[features])[0]
     prob = model.predict_proba(latest[features]).max()
 
@@ -0,0 +1,79 @@
+import numpy as np
+from src.ledger import TradeLedger
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _trade_profits(trades) -> np.ndarray:
+    """`profit` of run_backtest trades (TradeLedger or dicts, or any sequence of numbers) as an array."""
+    if isinstance(trades, TradeLedger):
+        return trades.profit.astype(np.float64)
+    if len(trades) and isinstance(trades[0], dict):
+        return np.array([t.get("profit", 0.0) for t in trades], dtype=np.float64)
+    return np.asarray(trades, dtype=np.float64)
+
+
+def _percentiles(values) -> dict:
+    return {f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def monte_carlo_trades(
+    trades,
+    capital=10000,
+    units=1.0,
+    n_paths=10000,
+    method="bootstrap",
+    ruin_level=0.5,
+    seed=None,
+    chunk_cells=5_000_000
+) -> dict:
+    """
+    Resample a backtest's trade sequence into `n_paths` equity paths.
+    `method` is "bootstrap" (draw trades with replacement) or "shuffle" (reorder them).
+    Equity is capital + cumulative profit * units, like the backtest equity curve.
+    A path is ruined once equity falls to `ruin_level` * capital or below.
+    Paths are built as (paths x trades) matrices in chunks of about `chunk_cells` values.
+    """
+    if method not in ("bootstrap", "shuffle"):
+        raise ValueError("❌ method must be 'bootstrap' or 'shuffle'.")
+    profits = _trade_profits(trades) * units
+    n = len(profits)
+    if n == 0:
+        return {"paths": 0, "trades": 0, "ruin_probability": 0.0, "max_drawdown": {}, "final_equity": {},
+                "max_drawdown_samples": np.empty(0), "final_equity_samples": np.empty(0)}
+
+    rng = np.random.default_rng(seed)
+    # float32 paths halve memory traffic; the error is cents on a 10k account
+    steps = profits.astype(np.float32)
+    max_dd = np.empty(n_paths)
+    final = np.empty(n_paths)
+    min_equity = np.empty(n_paths)
+    rows = max(1, chunk_cells // n)
+
+    for start in range(0, n_paths, rows):
+        k = min(rows, n_paths - start)
+        if method == "bootstrap":
+            sample = steps[rng.integers(0, n, size=(k, n), dtype=np.int32)]
+        else:
+            # permuted() is fastest on 8-byte items, so shuffle in float64 and narrow afterwards
+            sample = rng.permuted(np.broadcast_to(profits, (k, n)), axis=1).astype(np.float32)
+
+        equity = np.cumsum(sample, axis=1, out=sample)
+        equity += np.float32(capital)
+        # The starting balance is the first peak
+        peak = np.maximum.accumulate(equity, axis=1)
+        np.maximum(peak, np.float32(capital), out=peak)
+        # Drawdown beyond a total loss is capped at 100%
+        max_dd[start:start + k] = np.minimum(1 - (equity / peak).min(axis=1), 1.0)
+        final[start:start + k] = equity[:, -1]
+        min_equity[start:start + k] = np.minimum(equity.min(axis=1), capital)
+
+    return {
+        "paths": n_paths,
+        "trades": n,
+        "ruin_probability": float((min_equity <= capital * ruin_level).mean()),
+        "max_drawdown": _percentiles(max_dd),
+        "final_equity": _percentiles(final),
+        "max_drawdown_samples": max_dd,
+        "final_equity_samples": final
+    }
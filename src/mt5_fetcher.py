@@ -1,6 +1,7 @@
 import MetaTrader5 as mt5
 import pandas as pd
 import time
+from src.profiling import profiled
 
 # Map string timeframe to MT5 constant
 TIMEFRAME_MAP = {
@@ -19,6 +20,7 @@ def is_mt5_available() -> bool:
     except Exception:
         return False
 
+@profiled()
 def fetch_mt5_data(symbol="EURUSD", timeframe_str="M15", bars=500):
     if not mt5.initialize():
         raise ConnectionError("❌ MT5 initialization failed. Ensure terminal is open and logged in.")
@@ -62,32 +64,39 @@ def stream_and_analyze(
     updates=5,
     capital=10000
 ):
-    from src.trend_analyzer import detect_trend
-    from src.sr_levels import identify_sr_levels
-    from src.chart_patterns import detect_double_top_bottom
-    from src.indicator_analysis import analyze_indicators
-    from src.risk_manager import suggest_trade_levels
+    from src.sr_levels import SRLevelBook
+    from src.swing_points import SwingPointIndex
+    from src.pipeline import AnalysisPipeline
 
     print(f"\n📡 Starting live MT5 analysis: {symbol} @ {timeframe_str}, every {interval_sec}s\n")
 
+    # Extrema of confirmed bars carry over between updates
+    swing_history = SwingPointIndex(pd.DataFrame(columns=['Open', 'High', 'Low', 'Close']))
+    sr_book = SRLevelBook(window=bars)
+    pipeline = AnalysisPipeline()
+
     for i in range(updates):
         try:
             df = fetch_mt5_data(symbol, timeframe_str, bars)
+            swings = swing_history.sync(df)
             print(f"\n⏱ Update {i+1}: Last bar @ {df.index[-1]}")
 
+            # Swings and S/R are maintained incrementally, the pipeline does the rest
+            sr_result = sr_book.sync(swing_history).nearest(df['Close'].iloc[-1])
+            analysis = pipeline.run(df, given={"swings": swings, "sr": sr_result}, capital=capital)
+
             # Trend
-            trend_result = detect_trend(df)
+            trend_result = analysis['trend']
             print(f"→ Trend: {trend_result['trend']} | Confidence: {trend_result['confidence']}")
 
             # Support/Resistance
-            sr_result = identify_sr_levels(df)
             support = [f"{s['price']} ({s['strength']})" for s in sr_result['support']]
             resistance = [f"{r['price']} ({r['strength']})" for r in sr_result['resistance']]
             print(f"→ Support: {', '.join(support[:2])}")
             print(f"→ Resistance: {', '.join(resistance[:2])}")
 
             # Patterns
-            patterns = detect_double_top_bottom(df)
+            patterns = analysis['patterns']
             if patterns:
                 p = patterns[-1]
                 print(f"→ Pattern: {p['name']} ({p['status']}) @ Target: {p['projected_target']}")
@@ -95,18 +104,12 @@ def stream_and_analyze(
                 print("→ Pattern: None")
 
             # Indicators
-            indicators = analyze_indicators(df)
+            indicators = analysis['indicators']
             print(f"→ RSI: {indicators['rsi']['value']} ({indicators['rsi']['status']})")
             print(f"→ MACD: {indicators['macd']['status']}, {indicators['macd']['note']}")
 
             # Risk Management
-            risk_info = suggest_trade_levels(
-                df=df,
-                trend=trend_result['trend'],
-                support_levels=sr_result['support'],
-                resistance_levels=sr_result['resistance'],
-                capital=capital
-            )
+            risk_info = analysis['risk']
 
             if 'note' in risk_info:
                 print(f"→ Trade Signal: {risk_info['note']}")
@@ -1,20 +1,11 @@
 from src.mt5_fetcher import fetch_mt5_data
-from src.trend_analyzer import detect_trend
-from src.risk_manager import suggest_trade_levels
-from src.sr_levels import identify_sr_levels
+from src.pipeline import AnalysisPipeline
 
 def analyze_confluence(symbol, tf1="M15", tf2="H1", capital=10000):
-    df1 = fetch_mt5_data(symbol, tf1)
-    df2 = fetch_mt5_data(symbol, tf2)
-
-    trend1 = detect_trend(df1)
-    trend2 = detect_trend(df2)
-
-    sr1 = identify_sr_levels(df1)
-    sr2 = identify_sr_levels(df2)
-
-    risk1 = suggest_trade_levels(df1, trend1['trend'], sr1['support'], sr1['resistance'], capital=capital)
-    risk2 = suggest_trade_levels(df2, trend2['trend'], sr2['support'], sr2['resistance'], capital=capital)
+    pipeline = AnalysisPipeline()
+    result1 = pipeline.run(fetch_mt5_data(symbol, tf1), ("trend", "risk"), capital=capital)
+    result2 = pipeline.run(fetch_mt5_data(symbol, tf2), ("trend", "risk"), capital=capital)
+    trend1, trend2 = result1['trend'], result2['trend']
 
     trend_agree = trend1['trend'] == trend2['trend'] and trend1['trend'] != "Sideways"
 
@@ -24,6 +15,6 @@ def analyze_confluence(symbol, tf1="M15", tf2="H1", capital=10000):
         "trend_2": trend2,
         "agreement": trend_agree,
         "verdict": "✅ Strong Confluence" if trend_agree else "⚠️ Trend Mismatch",
-        "risk_1": risk1,
-        "risk_2": risk2
+        "risk_1": result1['risk'],
+        "risk_2": result2['risk']
     }
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+import pandas as pd
+from src.backtester import backtest_summary, run_backtest
+from src.walk_forward import expand_grid, METRICS
+from src.strategies import resolve_strategy
+
+# Default search spaces for the adaptive optimizer (values per registered param)
+SEARCH_SPACES = {
+    "MA Crossover": {"fast": [5, 8, 10, 13, 15, 20, 25, 30], "slow": [20, 30, 40, 50, 75, 100, 150, 200],
+                     "sl_pct": [0.5, 1.0, 1.5], "tp_pct": [1.0, 2.0, 3.0]},
+    "RSI Reversal": {"window": [7, 10, 14, 21], "oversold": [20, 25, 30, 35], "overbought": [65, 70, 75, 80],
+                     "sl_pct": [0.5, 1.0, 1.5], "tp_pct": [1.0, 2.0, 3.0]},
+    "Bollinger Bounce": {"window": [10, 15, 20, 30, 40], "sl_pct": [0.5, 1.0, 1.5], "tp_pct": [1.0, 2.0, 3.0]},
+    "ATR Breakout": {"window": [7, 10, 14, 21], "multiplier": [1.0, 1.25, 1.5, 2.0, 2.5],
+                     "sl_pct": [0.5, 1.0, 1.5], "tp_pct": [1.0, 2.0, 3.0]},
+}
+
+
+def _sensible(params):
+    # Drop combinations that cannot mean anything, e.g. a fast MA slower than the slow one
+    if params.get("fast", 0) >= params.get("slow", math.inf):
+        return False
+    if params.get("oversold", 0) >= params.get("overbought", math.inf):
+        return False
+    return True
+
+
+def rung_sizes(n_bars, min_bars=2000, eta=3) -> list:
+    """History lengths of the halving rungs: min_bars * eta^k, ending with the full history."""
+    sizes = []
+    size = min_bars
+    while size < n_bars:
+        sizes.append(size)
+        size *= eta
+    return sizes + [n_bars]
+
+
+def successive_halving(
+    df: pd.DataFrame,
+    strategy="MA Crossover",
+    param_grid=None,
+    budget=200,
+    eta=3,
+    min_bars=2000,
+    metric="profit",
+    min_trades=5,
+    seed=0,
+    progress=None
+) -> dict:
+    """
+    Adaptive parameter search with a fixed budget of backtest evaluations.
+    Candidates are first scored on the most recent `min_bars` bars; the best
+    1/eta of each rung are re-scored on eta times more history, up to the full
+    frame. `progress(done, total, rung, bars)` is called after each evaluation.
+    The winner is re-run with run_backtest (without journalling).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"❌ Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}")
+    grid = param_grid or SEARCH_SPACES.get(strategy, {})
+    candidates = [p for p in expand_grid(grid) if _sensible(p)]
+    for params in candidates:
+        resolve_strategy(strategy, params)
+
+    sizes = rung_sizes(len(df), min(min_bars, len(df)), eta)
+    last = len(sizes) - 1
+
+    def schedule(n):
+        # Candidates per rung; a lone survivor goes straight to the full history
+        counts = [max(1, math.ceil(n / eta ** k)) for k in range(len(sizes))]
+        return [c if c > 1 or k == last else 0 for k, c in enumerate(counts)]
+
+    # Start with as many candidates as the budget allows across all rungs
+    n_start = min(len(candidates), budget)
+    while n_start > 1 and sum(schedule(n_start)) > budget:
+        n_start -= 1
+    if n_start < len(candidates):
+        rng = np.random.default_rng(seed)
+        candidates = [candidates[i] for i in sorted(rng.choice(len(candidates), n_start, replace=False))]
+
+    counts = schedule(n_start)
+    total = sum(counts)
+    cache, rows, done = {}, [], 0
+
+    for rung, bars in enumerate(sizes):
+        if not counts[rung]:
+            continue
+        candidates = candidates[:counts[rung]]
+        scores = []
+        for params in candidates:
+            stats = backtest_summary(df, strategy, params, cache, start=len(df) - bars)
+            score = stats[metric] if stats["total"] >= min_trades else -math.inf
+            scores.append(score)
+            rows.append({"rung": rung, "bars": bars, "params": params, "score": score, **stats})
+            done += 1
+            if progress:
+                progress(done, total, rung, bars)
+        # Stable sort keeps grid order among ties
+        order = np.argsort(-np.array(scores), kind="stable")
+        candidates = [candidates[i] for i in order]
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return {"best_params": None, "best": None, "backtest": None, "evaluations": 0, "results": results}
+
+    final = results[results["rung"] == results["rung"].max()]
+    best = final.loc[final["score"].idxmax()]
+    return {
+        "best_params": best["params"],
+        "best": best.to_dict(),
+        "backtest": run_backtest(df, strategy=strategy, params=best["params"], log=False),
+        "evaluations": done,
+        "results": results
+    }
@@ -0,0 +1,112 @@
+import contextvars
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.indicators import compute_indicators
+from src.trend_analyzer import detect_trend, trend_indicator_keys
+from src.swing_points import SwingPointIndex
+from src.sr_levels import identify_sr_levels
+from src.chart_patterns import detect_double_top_bottom
+from src.indicator_analysis import analyze_indicators, INDICATOR_KEYS
+from src.risk_manager import suggest_trade_levels, ATR_KEY
+from src.profiling import span
+
+# One analysis step: `run(df, inputs, cache, options)` gets the outputs of `requires`
+# and the shared indicator cache, already holding every key in `indicators`
+Stage = namedtuple("Stage", ["name", "requires", "indicators", "run"])
+
+
+def _swing_index(df, inputs, cache, options):
+    with span("swing_points"):
+        return SwingPointIndex(df)
+
+
+STAGES = {
+    "trend": Stage("trend", (), trend_indicator_keys(),
+                   lambda df, inputs, cache, options: detect_trend(df, cache=cache)),
+    "swings": Stage("swings", (), [], _swing_index),
+    "sr": Stage("sr", ("swings",), [],
+                lambda df, inputs, cache, options: identify_sr_levels(df, swings=inputs["swings"])),
+    "patterns": Stage("patterns", ("swings",), [],
+                      lambda df, inputs, cache, options: detect_double_top_bottom(df, swings=inputs["swings"])),
+    "indicators": Stage("indicators", (), INDICATOR_KEYS,
+                        lambda df, inputs, cache, options: analyze_indicators(df, cache=cache)),
+    "risk": Stage("risk", ("trend", "sr"), [ATR_KEY],
+                  lambda df, inputs, cache, options: suggest_trade_levels(
+                      df, inputs["trend"]["trend"], inputs["sr"]["support"], inputs["sr"]["resistance"],
+                      cache=cache, **options)),
+}
+
+OUTPUTS = ("trend", "sr", "patterns", "indicators", "risk")
+WORKERS = 4
+
+
+class AnalysisPipeline:
+    """
+    The trend / S/R / patterns / indicators / risk analysis as a dependency graph.
+    Only the stages needed for the requested outputs run; the indicator arrays
+    they share (MACD, SMAs, RSI, ATR) are computed once up front, and stages
+    whose inputs are ready run concurrently on a thread pool.
+    """
+
+    def __init__(self, stages=None, workers=WORKERS):
+        self.stages = STAGES if stages is None else stages
+        self.workers = workers
+
+    def plan(self, outputs=OUTPUTS, given=()) -> list:
+        """Stages needed for `outputs` in dependency order, minus those in `given`."""
+        order, seen = [], set(given)
+
+        def visit(name, path=()):
+            if name in seen:
+                return
+            if name not in self.stages:
+                raise ValueError(f"❌ Unknown analysis stage '{name}'. Available: {', '.join(self.stages)}")
+            if name in path:
+                raise ValueError(f"❌ Stage dependency cycle: {' -> '.join(path + (name,))}")
+            for dep in self.stages[name].requires:
+                visit(dep, path + (name,))
+            seen.add(name)
+            order.append(name)
+
+        for name in outputs:
+            visit(name)
+        return order
+
+    def run(self, df, outputs=OUTPUTS, given=None, cache=None, **options) -> dict:
+        """
+        Compute `outputs` for `df`. `given` supplies stage results computed
+        elsewhere (e.g. incrementally maintained swings / S/R), which are not rerun.
+        Extra keyword options (capital, risk_percent, ...) go to the risk stage.
+        """
+        results = dict(given or {})
+        order = self.plan(outputs, results)
+        cache = {} if cache is None else cache
+
+        keys = list(dict.fromkeys(k for name in order for k in self.stages[name].indicators))
+        if keys:
+            with span("shared_indicators"):
+                compute_indicators(df, keys, cache)
+
+        def run_stage(name):
+            stage = self.stages[name]
+            return stage.run(df, {dep: results[dep] for dep in stage.requires}, cache, options)
+
+        if self.workers <= 1 or len(order) <= 1:
+            for name in order:
+                results[name] = run_stage(name)
+        else:
+            self._run_concurrent(order, results, run_stage)
+        return {name: results[name] for name in outputs}
+
+    def _run_concurrent(self, order, results, run_stage):
+        pending, running = list(order), {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n].requires)]:
+                    pending.remove(name)
+                    # Copy the context so profiling spans reach the active profile
+                    running[pool.submit(contextvars.copy_context().run, run_stage, name)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+
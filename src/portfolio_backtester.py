@@ -0,0 +1,172 @@
+import heapq
+import numpy as np
+import pandas as pd
+from src.backtester import generate_trades, resolve_trade_exits
+from src.risk_manager import calculate_position_size
+
+
+def _quote_to_account(symbol, price, account_currency, conversion_rates):
+    """
+    Account-currency value of one unit of `symbol`'s quote currency.
+    EURUSD on a USD account is 1, USDJPY is 1 / price; other crosses need
+    `conversion_rates` (quote currency -> account currency). Names that are
+    not six-letter pairs (e.g. uploaded files) are assumed to be quoted in the account currency.
+    """
+    code = symbol.replace("/", "").upper()
+    if len(code) != 6 or not code.isalpha():
+        return np.ones_like(price)
+    base, quote = code[:3], code[3:]
+    if quote == account_currency:
+        return np.ones_like(price)
+    if base == account_currency:
+        return 1.0 / price
+    if quote in conversion_rates:
+        return np.full_like(price, conversion_rates[quote])
+    raise ValueError(f"❌ No conversion rate from {quote} to {account_currency} for {symbol}.")
+
+
+def _candidate_trades(frames, strategies, account_currency, conversion_rates):
+    """
+    Every strategy signal on every symbol with its exit, as columns sorted by
+    entry time. Exits are resolved in one vectorized call per symbol and strategy.
+    """
+    columns = []
+    for s_id, (symbol, df) in enumerate(frames.items()):
+        if len(df) < 50:
+            continue
+        times = df.index.values.astype("datetime64[ns]").astype(np.int64)
+        cache = {}
+        for strategy in strategies:
+            trades = generate_trades(df, strategy, cache=cache)
+            if not trades:
+                continue
+            entry_idx = np.array([t["entry_idx"] for t in trades], dtype=np.int64)
+            entry = np.array([t["Entry"] for t in trades], dtype=np.float64)
+            direction = np.array([1 if t["Type"] == "Buy" else -1 for t in trades], dtype=np.int8)
+            exits = resolve_trade_exits(df, trades, cache=cache)
+            exit_rate = _quote_to_account(symbol, exits["exit_price"], account_currency, conversion_rates)
+            columns.append({
+                "symbol_id": np.full(len(trades), s_id),
+                "strategy": np.full(len(trades), strategy, dtype=object),
+                "direction": direction,
+                "entry_idx": entry_idx,
+                "entry_time": times[entry_idx],
+                "entry": entry,
+                "sl": np.array([t["SL"] for t in trades], dtype=np.float64),
+                "tp": np.array([t["TP"] for t in trades], dtype=np.float64),
+                "entry_rate": _quote_to_account(symbol, entry, account_currency, conversion_rates),
+                "exit_time": times[exits["exit_idx"]],
+                "exit_price": exits["exit_price"],
+                "result": exits["result"],
+                "pnl_per_unit": direction * (exits["exit_price"] - entry) * exit_rate,
+            })
+
+    if not columns:
+        return None
+    merged = {k: np.concatenate([c[k] for c in columns]) for k in columns[0]}
+    order = np.lexsort((merged["symbol_id"], merged["entry_time"]))
+    return {k: v[order] for k, v in merged.items()}
+
+
+def run_portfolio_backtest(
+    frames: dict,
+    strategies=("MA Crossover",),
+    capital=10000,
+    risk_percent=1.0,
+    max_positions=5,
+    leverage=30,
+    account_currency="USD",
+    conversion_rates=None,
+    one_per_symbol=True
+) -> dict:
+    """
+    Run several strategies over several symbols against one account.
+    Trades are sized from current balance with risk_manager, limited to
+    `max_positions` concurrent positions and to available margin, and all
+    P&L is booked in `account_currency`. With `one_per_symbol`, a symbol holds
+    at most one position at a time, whichever strategy opened it.
+    """
+    symbols = list(frames)
+    conversion_rates = conversion_rates or {}
+    cand = _candidate_trades(frames, strategies, account_currency, conversion_rates)
+    empty_equity = pd.Series([float(capital)], name="equity")
+    if cand is None:
+        return {"trades": pd.DataFrame(), "equity": empty_equity, "final_equity": capital,
+                "return_pct": 0.0, "max_drawdown": 0.0, "skipped": {}}
+
+    n = len(cand["entry"])
+    units = np.zeros(n)
+    taken = np.zeros(n, dtype=bool)
+    pnl = np.zeros(n)
+    exit_time, pnl_per_unit = cand["exit_time"], cand["pnl_per_unit"]
+    margin = cand["entry"] * cand["entry_rate"] / leverage  # per unit, account currency
+    risk_per_unit = np.abs(cand["entry"] - cand["sl"]) * cand["entry_rate"]
+
+    balance = float(capital)
+    used_margin = 0.0
+    open_heap = []  # (exit_time, trade index)
+    open_symbols = set()
+    skipped = {"max_positions": 0, "margin": 0, "symbol_busy": 0}
+    equity_time, equity_value = [], []
+
+    def close_until(t):
+        nonlocal balance, used_margin
+        while open_heap and open_heap[0][0] <= t:
+            closed_at, k = heapq.heappop(open_heap)
+            pnl[k] = units[k] * pnl_per_unit[k]
+            balance += pnl[k]
+            used_margin -= units[k] * margin[k]
+            open_symbols.discard(cand["symbol_id"][k])
+            equity_time.append(closed_at)
+            equity_value.append(balance)
+
+    # Events are trades, not bars: entries in time order, exits drained from a heap
+    for k in range(n):
+        close_until(cand["entry_time"][k])
+
+        symbol_id = cand["symbol_id"][k]
+        if len(open_heap) >= max_positions:
+            skipped["max_positions"] += 1
+            continue
+        if one_per_symbol and symbol_id in open_symbols:
+            skipped["symbol_busy"] += 1
+            continue
+
+        size = float(calculate_position_size(balance, risk_percent, risk_per_unit[k]))
+        if size <= 0 or used_margin + size * margin[k] > balance:
+            skipped["margin"] += 1
+            continue
+
+        units[k] = size
+        taken[k] = True
+        used_margin += size * margin[k]
+        open_symbols.add(symbol_id)
+        heapq.heappush(open_heap, (exit_time[k], k))
+
+    close_until(np.iinfo(np.int64).max)
+
+    trades = pd.DataFrame({
+        "symbol": np.array(symbols, dtype=object)[cand["symbol_id"][taken]],
+        "strategy": cand["strategy"][taken],
+        "direction": np.where(cand["direction"][taken] > 0, "Buy", "Sell"),
+        "entry_time": pd.to_datetime(cand["entry_time"][taken]),
+        "exit_time": pd.to_datetime(exit_time[taken]),
+        "units": units[taken],
+        "entry": cand["entry"][taken],
+        "exit": cand["exit_price"][taken],
+        "result": cand["result"][taken],
+        "pnl": pnl[taken],
+    })
+
+    equity = pd.Series([float(capital)] + equity_value,
+                       index=pd.to_datetime([cand["entry_time"][0]] + equity_time), name="equity")
+    peak = equity.cummax()
+
+    return {
+        "trades": trades,
+        "equity": equity,
+        "final_equity": round(balance, 2),
+        "return_pct": round(100 * (balance - capital) / capital, 2),
+        "max_drawdown": round(float(((peak - equity) / peak).max()), 4),
+        "skipped": skipped
+    }
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+import contextvars
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# Profile collecting spans in the current context; None means spans cost nothing
+_active = contextvars.ContextVar("active_profile", default=None)
+
+
+class Profile:
+    """
+    Wall time, CPU time and peak traced allocations of named stages.
+    Activate it around a run and every `span()` / `@profiled` stage inside is
+    recorded. tracemalloc is process-wide, so peaks of stages running at the
+    same time in other threads overlap.
+    """
+
+    def __init__(self, name="analysis", trace_memory=True):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._token = None
+
+    def start(self):
+        """Make this the active profile of the current context (and of threads started from a copy of it)."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active.set(self)
+        return self
+
+    def stop(self):
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def activate(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **args):
+        stack = self._stack()
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {"mem_start": 0, "mem_peak": 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["mem_peak"] = max(stack[-1]["mem_peak"], peak)
+            tracemalloc.reset_peak()
+            frame.update(mem_start=current, mem_peak=current)
+        stack.append(frame)
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start, time.thread_time() - cpu_start
+            stack.pop()
+            peak_bytes = 0
+            if tracing:
+                frame["mem_peak"] = max(frame["mem_peak"], tracemalloc.get_traced_memory()[1])
+                peak_bytes = frame["mem_peak"] - frame["mem_start"]
+                if stack:
+                    stack[-1]["mem_peak"] = max(stack[-1]["mem_peak"], frame["mem_peak"])
+                tracemalloc.reset_peak()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start_ms": round((start - self._origin) * 1000, 3),
+                    "wall_ms": round(wall * 1000, 3),
+                    "cpu_ms": round(cpu * 1000, 3),
+                    "peak_kb": round(peak_bytes / 1024, 1),
+                    "depth": len(stack),
+                    "thread": threading.get_ident(),
+                    **({"args": args} if args else {}),
+                })
+
+    def stages(self) -> dict:
+        """Per stage name: calls, total wall/CPU ms and the largest peak."""
+        out = {}
+        for s in self.spans:
+            agg = out.setdefault(s["name"], {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "peak_kb": 0.0})
+            agg["calls"] += 1
+            agg["wall_ms"] = round(agg["wall_ms"] + s["wall_ms"], 3)
+            agg["cpu_ms"] = round(agg["cpu_ms"] + s["cpu_ms"], 3)
+            agg["peak_kb"] = max(agg["peak_kb"], s["peak_kb"])
+        return out
+
+    def summary(self) -> dict:
+        """JSON-ready record: every span plus the per-stage totals."""
+        # Elapsed from the first span start to the last span end (stages may overlap)
+        end = max((s["start_ms"] + s["wall_ms"] for s in self.spans), default=0.0)
+        start = min((s["start_ms"] for s in self.spans), default=0.0)
+        return {
+            "name": self.name,
+            "memory_traced": self.trace_memory,
+            "total_wall_ms": round(end - start, 3),
+            "stages": self.stages(),
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+    def chrome_trace(self) -> dict:
+        """Spans as Chrome trace events (open in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        threads = {t: i for i, t in enumerate(dict.fromkeys(s["thread"] for s in self.spans))}
+        events = [{
+            "name": s["name"], "cat": self.name, "ph": "X", "pid": pid, "tid": threads[s["thread"]],
+            "ts": s["start_ms"] * 1000, "dur": s["wall_ms"] * 1000,
+            "args": {"cpu_ms": s["cpu_ms"], "peak_kb": s["peak_kb"], **s.get("args", {})},
+        } for s in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path) -> str:
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+def active_profile():
+    return _active.get()
+
+
+def span(name, **args):
+    """Context manager timing `name` in the active Profile; does nothing without one."""
+    profile = _active.get()
+    return profile.span(name, **args) if profile is not None else nullcontext()
+
+
+def profiled(name=None):
+    """Decorator recording every call of the function as a span (named after it by default)."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def run(*args, **kwargs):
+            profile = _active.get()
+            if profile is None:
+                return fn(*args, **kwargs)
+            with profile.span(label):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
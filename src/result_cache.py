@@ -0,0 +1,171 @@
+import os
+import copy
+import json
+import pickle
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+CACHE_DIR = "cache/results"
+MEMORY_ENTRIES = 256
+DISK_LIMIT_BYTES = 256 * 1024 * 1024
+# Switch for callers that must always recompute (e.g. benchmarks)
+ENABLED = True
+
+# Sources whose behaviour is part of every cached result
+CODE_FILES = ("backtester.py", "strategies.py", "indicators.py", "chart_patterns.py", "swing_points.py", "ledger.py",
+              "intrabar.py")
+
+# Once over the limit, files are evicted down to this share of it, so the directory is not rescanned on every store
+DISK_EVICT_TO = 0.9
+
+_memory = OrderedDict()
+_disk_bytes = {}  # CACHE_DIR -> bytes in it as far as this process knows
+_code_version = {}
+_DIGEST_KEY = ("__frame_digest__", ())
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=20)
+
+
+def code_version() -> str:
+    """Hash of the backtesting sources, so results from older code are never reused."""
+    if not _code_version:
+        h = _hasher()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in CODE_FILES:
+            path = os.path.join(here, name)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    h.update(f.read())
+        _code_version["value"] = h.hexdigest()
+    return _code_version["value"]
+
+
+def array_digest(*arrays) -> str:
+    h = _hasher()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.dtype.str, arr.shape)).encode())
+        h.update(arr.view(np.uint8).reshape(-1) if arr.size else b"")
+    return h.hexdigest()
+
+
+def frame_digest(df, cache=None) -> str:
+    """
+    Content hash of the OHLCV columns and the index. With an indicator cache
+    (see compute_indicators) the digest is stored in it and computed once per frame.
+    """
+    if cache is not None and _DIGEST_KEY in cache:
+        return cache[_DIGEST_KEY]
+    cols = [df[c].to_numpy(dtype=np.float64) for c in ("Open", "High", "Low", "Close", "Volume") if c in df]
+    digest = array_digest(df.index.values.astype("datetime64[ns]").astype(np.int64), *cols)
+    if cache is not None:
+        cache[_DIGEST_KEY] = digest
+    return digest
+
+
+def result_key(kind, digest, strategy, params, *extra) -> str:
+    """Key of one result: what was run, on which data, with which params and code."""
+    payload = json.dumps([kind, digest, strategy, params, [str(e) for e in extra], code_version()],
+                         sort_keys=True, default=str)
+    h = _hasher()
+    h.update(payload.encode())
+    return h.hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+
+def get_result(key, disk=True):
+    """
+    Cached value for `key` (memory first, then disk unless `disk` is False) or None.
+    Every hit is a private copy, so callers may modify what they get back.
+    """
+    if not ENABLED:
+        return None
+    if key in _memory:
+        _memory.move_to_end(key)
+        return copy.deepcopy(_memory[key])
+    if not disk:
+        return None
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+        # Touch so disk eviction drops the least recently used files
+        os.utime(path)
+    except (OSError, pickle.PickleError, EOFError):
+        # Also covers a file evicted by another process between the read and the touch
+        return None
+    _remember(key, copy.deepcopy(value))
+    return value
+
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def store_result(key, value, disk=True):
+    """Keep `value` in memory and, with `disk`, in CACHE_DIR for later runs."""
+    if not ENABLED:
+        return
+    # A copy, so later changes to `value` by the caller do not reach the cache
+    _remember(key, copy.deepcopy(value))
+    if not disk:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{_path(key)}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = f.tell()
+    os.replace(tmp, _path(key))
+
+    # The directory is scanned once per process and again only when the running total passes the limit
+    if CACHE_DIR not in _disk_bytes:
+        _disk_bytes[CACHE_DIR] = _disk_usage()[0]
+    else:
+        _disk_bytes[CACHE_DIR] += size
+    if _disk_bytes[CACHE_DIR] > DISK_LIMIT_BYTES:
+        _evict_disk()
+
+
+def _disk_usage():
+    """(total bytes, {path: stat}) of the cache files; files removed meanwhile by other processes are skipped."""
+    stats = {}
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".pkl"):
+            try:
+                stats[entry.path] = entry.stat()
+            except OSError:
+                continue
+    return sum(s.st_size for s in stats.values()), stats
+
+
+def _evict_disk():
+    total, stats = _disk_usage()
+    target = DISK_LIMIT_BYTES * DISK_EVICT_TO if total > DISK_LIMIT_BYTES else total
+    for path in sorted(stats, key=lambda p: stats[p].st_mtime):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= stats[path].st_size
+    _disk_bytes[CACHE_DIR] = total
+
+
+def clear_results(disk=True):
+    """Empty the memory tier and, with `disk`, the cache directory."""
+    _memory.clear()
+    _disk_bytes.pop(CACHE_DIR, None)
+    if disk and os.path.isdir(CACHE_DIR):
+        for entry in os.scandir(CACHE_DIR):
+            if entry.name.endswith(".pkl"):
+                os.remove(entry.path)
@@ -1,6 +1,118 @@
-from ta.volatility import AverageTrueRange
+import numpy as np
 import pandas as pd
+from src.indicators import average_true_range, compute_indicators
+from src.profiling import profiled
+
+MIN_CANDLES = 20
+ATR_KEY = ("atr", (14,))
+
+# (minimum RR, score points, reasoning)
+RR_SCORE_TIERS = [
+    (2.0, 30, "RR ≥ 2.0"),
+    (1.5, 20, "RR ≥ 1.5"),
+    (1.2, 10, "RR ≥ 1.2"),
+]
+
+
+def _trend_direction(trend, n) -> np.ndarray:
+    """+1 for Uptrend, -1 for Downtrend, 0 otherwise; `trend` is one label or one per row."""
+    labels = pd.Series(np.broadcast_to(np.asarray(trend, dtype=object), (n,))).str.lower()
+    return np.select([labels == "uptrend", labels == "downtrend"], [1, -1], default=0).astype(np.int8)
+
+
+def calculate_position_size(capital, risk_percent, risk_per_unit):
+    """Units such that hitting the stop loses `risk_percent` of `capital`."""
+    risk_capital = np.asarray(capital, dtype=np.float64) * (risk_percent / 100)
+    risk_per_unit = np.asarray(risk_per_unit, dtype=np.float64)
+    size = np.divide(risk_capital, risk_per_unit, out=np.zeros(np.broadcast(risk_capital, risk_per_unit).shape),
+                     where=risk_per_unit > 0)
+    return np.round(size, 2)
+
+
+def trade_level_arrays(close, atr, direction, risk_percent=1.0, capital=10000, slippage=0.0002) -> dict:
+    """
+    Core of suggest_trade_levels over arrays: entry, SL, TP, RR, size and score
+    for every element at once. Rows with direction 0 or no ATR are not `valid`.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    direction = np.asarray(direction)
+
+    entry = np.round(close + direction * slippage, 5)
+    stop_loss = np.round(entry - direction * atr, 5)
+    take_profit = np.round(entry + direction * 2 * atr, 5)
+    trailing_stop = np.round(np.where(direction > 0, close - atr, close + atr), 5)
+
+    risk_per_unit = np.abs(entry - stop_loss)
+    reward_per_unit = np.abs(take_profit - entry)
+    rr_ratio = np.round(np.divide(reward_per_unit, risk_per_unit, out=np.zeros(len(entry)),
+                                  where=risk_per_unit > 0), 2)
+
+    atr_ok = np.nan_to_num(atr) > 0
+    valid = (direction != 0) & atr_ok
+    score = (
+        30 + 20
+        + np.select([rr_ratio >= t for t, _, _ in RR_SCORE_TIERS], [p for _, p, _ in RR_SCORE_TIERS], default=0)
+        + 20 * atr_ok
+    )
+    score = np.where(valid, score, 0)
 
+    return {
+        "direction": direction,
+        "entry": entry,
+        "stop_loss": stop_loss,
+        "take_profit": take_profit,
+        "trailing_stop": trailing_stop,
+        "atr": atr,
+        "rr_ratio": rr_ratio,
+        "position_size": calculate_position_size(capital, risk_percent, risk_per_unit),
+        "signal_score": score,
+        "valid": valid,
+    }
+
+
+def suggest_trade_levels_batch(
+    df: pd.DataFrame,
+    trend,
+    risk_percent: float = 1.0,
+    capital: float = 10000,
+    slippage: float = 0.0002
+) -> pd.DataFrame:
+    """
+    suggest_trade_levels for every bar of `df` as columns. `trend` is a single
+    label or one label per bar (e.g. detect_trend_series(df)["trend"]).
+    Bars before MIN_CANDLES are marked invalid.
+    """
+    atr = average_true_range(df['High'], df['Low'], df['Close'], window=14)
+    levels = trade_level_arrays(
+        df['Close'].to_numpy(dtype=np.float64), atr, _trend_direction(trend, len(df)),
+        risk_percent=risk_percent, capital=capital, slippage=slippage
+    )
+    levels["valid"] = levels["valid"] & (np.arange(len(df)) >= MIN_CANDLES - 1)
+    return pd.DataFrame(levels, index=df.index)
+
+
+def suggest_trade_levels_watchlist(
+    frames: dict,
+    trends: dict,
+    risk_percent: float = 1.0,
+    capital: float = 10000,
+    slippage: float = 0.0002
+) -> pd.DataFrame:
+    """Latest-bar trade levels for every symbol in `frames`, one row per symbol."""
+    symbols = list(frames)
+    close = np.array([frames[s]['Close'].iloc[-1] for s in symbols], dtype=np.float64)
+    atr = np.array([average_true_range(frames[s]['High'], frames[s]['Low'], frames[s]['Close'])[-1]
+                    for s in symbols])
+    direction = _trend_direction([trends.get(s, "") for s in symbols], len(symbols))
+
+    levels = trade_level_arrays(close, atr, direction, risk_percent=risk_percent,
+                                capital=capital, slippage=slippage)
+    levels["valid"] = levels["valid"] & np.array([len(frames[s]) >= MIN_CANDLES for s in symbols])
+    return pd.DataFrame(levels, index=pd.Index(symbols, name="symbol"))
+
+
+@profiled()
 def suggest_trade_levels(
     df: pd.DataFrame,
     trend: str,
@@ -9,12 +121,10 @@ def suggest_trade_levels(
     risk_percent: float = 1.0,
     capital: float = 10000,
     rr_threshold: float = 1.5,
-    slippage: float = 0.0002  # e.g., 2 pips
+    slippage: float = 0.0002,  # e.g., 2 pips
+    cache=None
 ) -> dict:
 
-    df = df.copy()
-
-    MIN_CANDLES = 20
     if len(df) < MIN_CANDLES:
         return {
             "trade_direction": "Not available",
@@ -24,8 +134,7 @@ def suggest_trade_levels(
     current_price = df['Close'].iloc[-1]
 
     try:
-        atr_series = AverageTrueRange(high=df['High'], low=df['Low'], close=df['Close'], window=14).average_true_range()
-        atr_value = atr_series.dropna().iloc[-1]
+        atr_value = compute_indicators(df, [ATR_KEY], cache)[ATR_KEY][-1]
     except Exception:
         atr_value = (df['High'] - df['Low']).rolling(5).mean().iloc[-1]  # fallback: 5-bar range average
 
@@ -35,76 +144,33 @@ def suggest_trade_levels(
             "trade_direction": "Insufficient data"
     }
 
-
-    sl_buffer = atr_value
-    tp_buffer = 2 * atr_value
-    trailing_stop = round(current_price - atr_value if trend.lower() == "uptrend" else current_price + atr_value, 5)
-
-    if trend.lower() == "uptrend":
-        direction = "Long"
-        entry = round(current_price + slippage, 5)
-        stop_loss = round(entry - sl_buffer, 5)
-        take_profits = [round(entry + tp_buffer, 5)]
-    elif trend.lower() == "downtrend":
-        direction = "Short"
-        entry = round(current_price - slippage, 5)
-        stop_loss = round(entry + sl_buffer, 5)
-        take_profits = [round(entry - tp_buffer, 5)]
-    else:
+    direction = _trend_direction(trend, 1)
+    if direction[0] == 0:
         return {
             "trade_direction": "No clear direction",
             "note": "Trend not strong enough to justify a trade"
         }
 
-    # --- Risk-Reward Calculation ---
-    risk_per_unit = abs(entry - stop_loss)
-    reward_per_unit = abs(take_profits[0] - entry)
-    rr_ratio = round(reward_per_unit / risk_per_unit, 2) if risk_per_unit else 0.0
+    # --- Levels, sizing and score come from the columnar core ---
+    levels = {k: v[0] for k, v in trade_level_arrays(
+        [current_price], [atr_value], direction,
+        risk_percent=risk_percent, capital=capital, slippage=slippage
+    ).items()}
+
+    entry = float(levels["entry"])
+    rr_ratio = float(levels["rr_ratio"])
+    risk_capital = capital * (risk_percent / 100)
+    position_size = float(levels["position_size"])
 
     rr_warning = None
     if rr_ratio < rr_threshold:
         rr_warning = f"⚠️ Risk-Reward Ratio {rr_ratio} is below threshold {rr_threshold}!"
 
-    # --- Position Size Calculation ---
-    risk_capital = capital * (risk_percent / 100)
-    position_size = round(risk_capital / risk_per_unit, 2) if risk_per_unit else 0
-
-
-
     # --- Confidence Scoring ---
-    score = 0
-    details = []
-
-    # Trend
-    if trend.lower() == "uptrend" or trend.lower() == "downtrend":
-        score += 30
-        details.append("Trend confirmed")
-    else:
-        details.append("No clear trend")
-
-    # Indicators (optional: pass in indicators dict if needed)
-    # For now we just assume that if risk_info got here, indicators agree
-    score += 20
-    details.append("Indicators assumed aligned")
-
-    # Risk-Reward
-    rr_val = rr_ratio
-    if rr_val >= 2:
-        score += 30
-        details.append("RR ≥ 2.0")
-    elif rr_val >= 1.5:
-        score += 20
-        details.append("RR ≥ 1.5")
-    elif rr_val >= 1.2:
-        score += 10
-        details.append("RR ≥ 1.2")
-    else:
-        details.append("Poor RR")
-
-    # ATR Valid
-    if atr_value > 0:
-        score += 20
-        details.append("ATR valid")
+    score = int(levels["signal_score"])
+    details = ["Trend confirmed", "Indicators assumed aligned"]
+    details.append(next((label for t, _, label in RR_SCORE_TIERS if rr_ratio >= t), "Poor RR"))
+    details.append("ATR valid")
 
     # Tag
     if score >= 75:
@@ -115,13 +181,13 @@ def suggest_trade_levels(
         confidence_level = "Weak"
 
     return {
-        "trade_direction": direction,
+        "trade_direction": "Long" if direction[0] > 0 else "Short",
         "entry_zone": f"{round(entry * 0.999, 5)} - {round(entry * 1.001, 5)}",
-        "stop_loss": stop_loss,
-        "take_profit_levels": take_profits,
+        "stop_loss": float(levels["stop_loss"]),
+        "take_profit_levels": [float(levels["take_profit"])],
         "risk_reward_ratio": f"1:{rr_ratio} (to first TP)",
-        "atr": round(atr_value, 5),
-        "trailing_stop_suggestion": trailing_stop,
+        "atr": round(float(atr_value), 5),
+        "trailing_stop_suggestion": float(levels["trailing_stop"]),
         "position_sizing_guidance": f"Risking {risk_percent}% of ${capital} = ${risk_capital:.2f}; suggested size: {position_size} units",
         "slippage_applied": slippage,
         "rr_alert": rr_warning,
@@ -0,0 +1,156 @@
+import os
+import sys
+import atexit
+import threading
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from src.bars import Bars
+
+# Column offsets are rounded up to this many bytes (cache-line aligned arrays)
+ALIGN = 64
+INDEX_COLUMN = "__index__"
+
+# Everything a worker needs to map a published block; small and cheap to pickle
+BarsHandle = namedtuple("BarsHandle", ["name", "length", "columns", "dtypes", "offsets", "index_name", "tz"])
+
+# Python 3.13+ can attach without registering the block with this process's resource tracker
+_ATTACH_KWARGS = {"track": False} if sys.version_info >= (3, 13) else {}
+
+_published = {}  # source key -> SharedBars, in the publishing process
+_attached = {}   # block name -> (SharedMemory, Bars), in worker processes
+_lock = threading.Lock()
+
+
+def _source_key(bars):
+    close = bars.array("Close")
+    return close.__array_interface__["data"][0], len(close), close.dtype.str
+
+
+def _index_array(index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        # UTC instants; the time zone travels in the handle
+        return index.values
+    if index.dtype.kind in "iuf":
+        return index.to_numpy()
+    raise ValueError(f"❌ Only datetime or numeric indexes can be shared, got {index.dtype}.")
+
+
+def _map(shm, handle) -> Bars:
+    arrays = {c: np.ndarray(handle.length, dtype=np.dtype(dt), buffer=shm.buf, offset=off)
+              for c, dt, off in zip(handle.columns, handle.dtypes, handle.offsets)}
+    index = pd.Index(arrays.pop(INDEX_COLUMN), name=handle.index_name, copy=False)
+    if handle.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(handle.tz)
+    return Bars(index, arrays)
+
+
+class SharedBars:
+    """
+    OHLCV bars copied once into a multiprocessing.shared_memory block. Pass
+    `handle` to worker processes instead of the frame; attach_bars() maps the
+    same pages there. Reference counted: the block is unlinked when the last
+    user releases it (or at interpreter exit). `bars` reads the shared copy.
+    """
+
+    def __init__(self, data, key=None):
+        bars = Bars.from_frame(data, dtype=None)
+        columns = {INDEX_COLUMN: _index_array(bars.index), **{c: bars.array(c) for c in bars.columns}}
+
+        offsets, size = [], 0
+        for arr in columns.values():
+            offsets.append(size)
+            size += -(-arr.nbytes // ALIGN) * ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, ALIGN))
+        for arr, off in zip(columns.values(), offsets):
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=self.shm.buf, offset=off)[:] = arr
+
+        self.handle = BarsHandle(self.shm.name, len(bars), tuple(columns), tuple(a.dtype.str for a in columns.values()),
+                                 tuple(offsets), bars.index.name, getattr(bars.index, "tz", None))
+        self.bars = _map(self.shm, self.handle)
+        self.refs = 0
+        self._key = key
+        self._owner = os.getpid()
+        # Holding the source keeps its address (the registry key) from being reused
+        self._source = bars
+
+    def acquire(self) -> "SharedBars":
+        with _lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        with _lock:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+            _published.pop(self._key, None)
+        self._unlink()
+
+    def _unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            self.shm.close()
+        except BufferError:
+            # self.bars still points into the block; the mapping goes when those arrays do
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def share_bars(data) -> SharedBars:
+    """
+    Publish `data` (DataFrame or Bars) to shared memory, or add a reference to
+    the block already holding the same arrays. Use as a context manager, or
+    call release() when the workers are done.
+    """
+    bars = Bars.from_frame(data, dtype=None)
+    key = _source_key(bars)
+    with _lock:
+        shared = _published.get(key)
+        if shared is None:
+            shared = _published[key] = SharedBars(bars, key)
+        shared.refs += 1
+    return shared
+
+
+def attach_bars(handle) -> Bars:
+    """Worker side: read-only Bars over the block named by `handle`, mapped once per process."""
+    hit = _attached.get(handle.name)
+    if hit is None:
+        shm = shared_memory.SharedMemory(name=handle.name, **_ATTACH_KWARGS)
+        hit = _attached[handle.name] = (shm, _map(shm, handle))
+    return hit[1]
+
+
+def detach_bars(name):
+    """Forget a mapping made by attach_bars (long-lived workers)."""
+    shm, _ = _attached.pop(name, (None, None))
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+def resolve_bars(data):
+    """The bars behind `data`: attached when it is a BarsHandle, else `data` itself."""
+    return attach_bars(data) if isinstance(data, BarsHandle) else data
+
+
+@atexit.register
+def _release_all():
+    # Only the publishing process unlinks (forked workers inherit this registry)
+    for shared in list(_published.values()):
+        if shared._owner == os.getpid():
+            shared.refs = 0
+            shared._unlink()
+    _published.clear()
@@ -2,56 +2,143 @@
 
 import pandas as pd
 import numpy as np
-from scipy.signal import find_peaks
-from collections import defaultdict
+from bisect import bisect_left
+from collections import deque
+from src.swing_points import SwingPointIndex, SETTLE_SPANS
+from src.profiling import profiled
 
-def identify_sr_levels(df: pd.DataFrame, distance=5, threshold=0.0015, round_to=0.0005) -> dict:
+def _strength(touches):
+    return (
+        "strong" if touches >= 4 else
+        "moderate" if touches == 3 else
+        "weak"
+    )
+
+
+class SRLevelBook:
+    """
+    Support/resistance touch counts bucketed by `round_to` ticks over a sliding
+    window of bars. Touches come from swing highs/lows; active ticks are kept
+    sorted so the nearest levels around a price are found by bisection.
+    """
+
+    def __init__(self, window=500, round_to=0.0005, threshold=0.0015):
+        self.window = window
+        self.round_to = round_to
+        self.threshold = threshold
+        self.counts = {}
+        self._ticks = []
+        self._touches = deque()   # settled (bar_idx, tick), oldest first
+        self._provisional = []    # ticks of recent extrema that may still move
+        self._settled_upto = -1
+        self._length = 0
+
+    def _inc(self, tick, n=1):
+        if tick not in self.counts:
+            self.counts[tick] = 0
+            self._ticks.insert(bisect_left(self._ticks, tick), tick)
+        self.counts[tick] += n
+
+    def _dec(self, tick, n=1):
+        self.counts[tick] -= n
+        if self.counts[tick] <= 0:
+            del self.counts[tick]
+            del self._ticks[bisect_left(self._ticks, tick)]
+
+    def _to_ticks(self, prices):
+        return np.rint(np.asarray(prices) / self.round_to).astype(np.int64)
+
+    def sync(self, swings: SwingPointIndex, distance=5):
+        """
+        Bring the book up to date with `swings` (an index that only grows).
+        New settled extrema are added, recent ones are re-read every call,
+        and touches older than the window expire.
+        """
+        n = len(swings)
+        if n < self._length:
+            # The index was rebuilt from scratch, positions no longer line up
+            self.__init__(self.window, self.round_to, self.threshold)
+        settled_upto = n - 1 - SETTLE_SPANS * distance
+
+        for tick in self._provisional:
+            self._dec(tick)
+        self._provisional = []
+
+        peaks = swings.peaks('High', distance)
+        troughs = swings.troughs('Low', distance)
+        idx = np.concatenate([peaks, troughs])
+        prices = np.concatenate([swings.values('High')[peaks], swings.values('Low')[troughs]])
+        order = np.argsort(idx, kind='stable')
+        idx, ticks = idx[order], self._to_ticks(prices[order])
+
+        fresh = (idx > self._settled_upto) & (idx > n - 1 - self.window)
+        settled = fresh & (idx <= settled_upto)
+        for tick, count in zip(*np.unique(ticks[settled], return_counts=True)):
+            self._inc(int(tick), int(count))
+        self._touches.extend(zip(idx[settled].tolist(), ticks[settled].tolist()))
+
+        self._provisional = ticks[fresh & ~settled].tolist()
+        for tick in self._provisional:
+            self._inc(tick)
+
+        self._settled_upto = max(self._settled_upto, settled_upto)
+        self._length = n
+        self.expire(n - 1 - self.window)
+        return self
+
+    def expire(self, before_idx):
+        while self._touches and self._touches[0][0] <= before_idx:
+            self._dec(self._touches.popleft()[1])
+
+    def _walk(self, positions, current_price, n):
+        """
+        Cluster levels within `threshold` of each other while walking away from price.
+        A cluster is reported at its member nearest `current_price` (the first one
+        reached) with the touches of all its members.
+        """
+        tolerance = self.threshold * current_price
+        clusters = []
+        for pos in positions:
+            tick = self._ticks[pos]
+            price = round(tick * self.round_to, 5)
+            touches = self.counts[tick]
+            if clusters and abs(price - clusters[-1]["price"]) <= tolerance:
+                clusters[-1]["touches"] += touches
+                continue
+            if len(clusters) == n:
+                break
+            clusters.append({"price": price, "touches": touches})
+
+        return [
+            {"price": c["price"], "strength": _strength(c["touches"]), "touches": c["touches"]}
+            for c in clusters
+        ]
+
+    def nearest(self, current_price, n=3) -> dict:
+        """Nearest `n` supports below and resistances above `current_price`."""
+        split = bisect_left(self._ticks, current_price / self.round_to)
+        below = (i for i in range(split - 1, -1, -1)
+                 if round(self._ticks[i] * self.round_to, 5) < current_price)
+        above = (i for i in range(max(split - 1, 0), len(self._ticks))
+                 if round(self._ticks[i] * self.round_to, 5) > current_price)
+
+        return {
+            "support": self._walk(below, current_price, n),
+            "resistance": self._walk(above, current_price, n)
+        }
+
+
+@profiled()
+def identify_sr_levels(df: pd.DataFrame, distance=5, threshold=0.0015, round_to=0.0005, swings=None) -> dict:
     """
     Identify support and resistance levels based on local extrema clustering.
     Returns a dictionary with level, type, and strength.
+    Levels closer than `threshold` (relative to price) are merged into one.
+    Pass a SwingPointIndex built on `df` to reuse already computed extrema.
     """
+    swings = swings if swings is not None else SwingPointIndex(df)
+    book = SRLevelBook(window=len(df), round_to=round_to, threshold=threshold)
+    book.sync(swings, distance)
 
-    highs = df['High'].values
-    lows = df['Low'].values
-
-    # Find local peaks (resistance)
-    res_idx, _ = find_peaks(highs, distance=distance)
-    sup_idx, _ = find_peaks(-lows, distance=distance)
-
-    levels = defaultdict(int)
-
-    for idx in res_idx:
-        level = round(highs[idx] / round_to) * round_to
-        levels[level] += 1
-
-    for idx in sup_idx:
-        level = round(lows[idx] / round_to) * round_to
-        levels[level] += 1
-
-    # Filter and sort
-    sr_levels = []
-    for level, touches in sorted(levels.items(), key=lambda x: x[0]):
-        strength = (
-            "strong" if touches >= 4 else
-            "moderate" if touches == 3 else
-            "weak"
-        )
-        sr_levels.append({
-            "price": round(level, 5),
-            "strength": strength,
-            "touches": touches
-        })
-
-    # Separate support/resistance based on current price
     current_price = df['Close'].iloc[-1]
-    supports = [lvl for lvl in sr_levels if lvl["price"] < current_price]
-    resistances = [lvl for lvl in sr_levels if lvl["price"] > current_price]
-
-    supports = sorted(supports, key=lambda x: -x["price"])[:3]
-    resistances = sorted(resistances, key=lambda x: x["price"])[:3]
-
-    return {
-        "support": supports,
-        "resistance": resistances
-    }
-    
\ No newline at end of file
+    return book.nearest(current_price, n=3)
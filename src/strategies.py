@@ -0,0 +1,122 @@
+import numpy as np
+from collections import namedtuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+# indicators: fn(params) -> {alias: (indicator name, indicator params)} for src.indicators
+# signals: fn(df, ind, params) -> (buy mask, sell mask), `ind` maps alias -> array
+Strategy = namedtuple("Strategy", "name params indicators signals")
+
+# Exit rules shared by every strategy. sl_atr / tp_atr (ATR multiples) replace the
+# percentage levels when > 0; trail_atr > 0 adds an ATR trailing stop; max_bars > 0
+# closes the trade at that bar's close.
+DEFAULT_PARAMS = {"sl_pct": 1.0, "tp_pct": 2.0, "sl_atr": 0.0, "tp_atr": 0.0, "trail_atr": 0.0, "max_bars": 0,
+                  "atr_window": 14}
+
+STRATEGIES = {}
+
+
+def register_strategy(name, indicators, **params):
+    """Decorator adding a vectorized signal function to the registry."""
+    def wrap(signals):
+        STRATEGIES[name] = Strategy(name, {**DEFAULT_PARAMS, **params}, indicators, signals)
+        return signals
+    return wrap
+
+
+def resolve_strategy(name, params=None):
+    """Registered strategy and its params with `params` overriding the defaults."""
+    if name not in STRATEGIES:
+        raise ValueError(f"❌ Unknown strategy '{name}'. Available: {', '.join(STRATEGIES)}")
+    strategy = STRATEGIES[name]
+    unknown = set(params or {}) - set(strategy.params)
+    if unknown:
+        raise ValueError(f"❌ Unknown parameter(s) for {name}: {', '.join(sorted(unknown))}")
+    return strategy, {**strategy.params, **(params or {})}
+
+
+def exit_indicator_keys(params) -> dict:
+    """Indicators the exit rules need: ATR when any level is in ATR multiples."""
+    if params["sl_atr"] > 0 or params["tp_atr"] > 0 or params["trail_atr"] > 0:
+        return {"exit_atr": ("atr", (params["atr_window"],))}
+    return {}
+
+
+def indicator_keys(name, params=None) -> dict:
+    strategy, params = resolve_strategy(name, params)
+    return {**strategy.indicators(params), **exit_indicator_keys(params)}
+
+
+def _crosses_above(a, b):
+    prev_a, prev_b = np.roll(a, 1), np.roll(b, 1)
+    out = (a > b) & (prev_a <= prev_b)
+    out[:1] = False
+    return out
+
+
+@register_strategy("MA Crossover", lambda p: {"fast": ("sma", (p["fast"],)), "slow": ("sma", (p["slow"],))},
+                   fast=10, slow=30)
+def ma_crossover(df, ind, p):
+    buy = _crosses_above(ind["fast"], ind["slow"])
+    sell = _crosses_above(-ind["fast"], -ind["slow"])
+    buy[:p["slow"]] = sell[:p["slow"]] = False
+    return buy, sell
+
+
+@register_strategy("MACD Signal", lambda p: {"macd": ("macd", ()), "signal": ("signal", ())})
+def macd_signal(df, ind, p):
+    return _crosses_above(ind["macd"], ind["signal"]), _crosses_above(-ind["macd"], -ind["signal"])
+
+
+@register_strategy("Pattern Trigger", lambda p: {"signal": ("pattern_signal", ())})
+def pattern_trigger(df, ind, p):
+    # Confirmed double bottoms buy, double tops sell (causal scan, see chart_patterns.pattern_signal_series)
+    return ind["signal"] > 0, ind["signal"] < 0
+
+
+@register_strategy("Run Reversal", lambda p: {"close": ("close", ())}, run=5)
+def run_reversal(df, ind, p):
+    # Fade `run` bars of one-way closes (the rule "Pattern Trigger" used before it traded real patterns)
+    # Close[i-run:i] monotonic <=> its run-1 diffs share a sign (zeros allowed)
+    close, run = ind["close"], p["run"]
+    n = len(close)
+    rising = np.zeros(n, dtype=bool)
+    falling = np.zeros(n, dtype=bool)
+    if n > run:
+        window = sliding_window_view(np.diff(close, prepend=np.nan), run - 1)
+        rising[run:] = (window >= 0).all(axis=1)[1:n - run + 1]
+        falling[run:] = (window <= 0).all(axis=1)[1:n - run + 1]
+    sell, buy = rising, falling & ~rising
+    buy[:20] = sell[:20] = False
+    return buy, sell
+
+
+@register_strategy("RSI Reversal", lambda p: {"rsi": ("rsi", (p["window"],))},
+                   window=14, oversold=30, overbought=70)
+def rsi_reversal(df, ind, p):
+    rsi = ind["rsi"]
+    buy = _crosses_above(rsi, np.full(len(rsi), float(p["oversold"])))
+    sell = _crosses_above(-rsi, np.full(len(rsi), -float(p["overbought"])))
+    return buy, sell
+
+
+@register_strategy("Bollinger Bounce", lambda p: {"close": ("close", ()), "rsi": ("rsi", ()),
+                                                  "lower": ("bb_lower", (p["window"],)),
+                                                  "upper": ("bb_upper", (p["window"],))},
+                   window=20)
+def bollinger_bounce(df, ind, p):
+    rsi = ind["rsi"]
+    prev_rsi = np.concatenate([[np.nan], rsi[:-1]])
+    buy = (ind["close"] < ind["lower"]) & (rsi > prev_rsi)
+    sell = (ind["close"] > ind["upper"]) & (rsi < prev_rsi)
+    return buy, sell
+
+
+@register_strategy("ATR Breakout", lambda p: {"open": ("open", ()), "high": ("high", ()), "low": ("low", ()),
+                                              "close": ("close", ()), "atr": ("atr", (p["window"],))},
+                   window=14, multiplier=1.5)
+def atr_breakout(df, ind, p):
+    breakout = (ind["high"] - ind["low"]) > p["multiplier"] * ind["atr"]
+    breakout[:p["window"]] = False
+    bullish = ind["close"] > ind["open"]
+    return breakout & bullish, breakout & ~bullish
+
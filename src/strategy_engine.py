@@ -1,31 +1,333 @@
-import pandas as pd
-from ta.trend import MACD
-from ta.momentum import RSIIndicator
+import re
+import json
+import hashlib
+import numpy as np
+from collections import namedtuple
+from src.indicators import compute_indicators, check_indicator
+from src.backtester import first_exit
+
+# --- Typed AST: every node knows whether it yields numbers or booleans ---
+Number = namedtuple("Number", "value")
+Indicator = namedtuple("Indicator", "name params")
+Arith = namedtuple("Arith", "op left right")
+Compare = namedtuple("Compare", "op left right")
+Cross = namedtuple("Cross", "above left right")
+Logic = namedtuple("Logic", "op items")
+Not = namedtuple("Not", "item")
+Flag = namedtuple("Flag", "name")  # SL / TP markers in exit rules
+
+NUMERIC = (Number, Indicator, Arith)
+COMPARE_OPS = {">": np.greater, "<": np.less, ">=": np.greater_equal,
+               "<=": np.less_equal, "==": np.equal, "!=": np.not_equal}
+ARITH_OPS = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}
+EXIT_FLAGS = {"sl", "tp"}
+
+TOKEN_RE = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_][A-Za-z_0-9]*)|(>=|<=|==|!=|[><+\-*/(),]))")
+
+_compiled = {}
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"❌ Unexpected character at position {pos}: '{text[pos:pos + 10]}'")
+        number, word, op = m.groups()
+        tokens.append(("num", float(number)) if number else ("word", word.lower()) if word else ("op", op))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser for rule expressions like `MACD > Signal and RSI(14) < 30`."""
+
+    def __init__(self, text, allow_flags=False):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.allow_flags = allow_flags
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        tok = self.peek()
+        if (kind and tok[0] != kind) or (value is not None and tok[1] != value):
+            raise ValueError(f"❌ Expected {value or kind}, got {tok[1] if tok[1] is not None else 'end of rule'}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"❌ Unexpected '{self.peek()[1]}' in rule")
+        return _expect_bool(node)
+
+    def parse_or(self):
+        items = [self.parse_and()]
+        while self.peek() == ("word", "or"):
+            self.take()
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Logic("or", tuple(_expect_bool(i) for i in items))
+
+    def parse_and(self):
+        items = [self.parse_not()]
+        while self.peek() == ("word", "and"):
+            self.take()
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else Logic("and", tuple(_expect_bool(i) for i in items))
+
+    def parse_not(self):
+        if self.peek() == ("word", "not"):
+            self.take()
+            return Not(_expect_bool(self.parse_not()))
+        return self.parse_compare()
+
+    def parse_compare(self):
+        left = self.parse_sum()
+        kind, value = self.peek()
+        if kind == "op" and value in COMPARE_OPS:
+            self.take()
+            return Compare(value, _expect_num(left), _expect_num(self.parse_sum()))
+        if (kind, value) == ("word", "crosses"):
+            self.take()
+            side = self.take("word")[1]
+            if side not in ("above", "below"):
+                raise ValueError("❌ Use 'crosses above' or 'crosses below'")
+            return Cross(side == "above", _expect_num(left), _expect_num(self.parse_sum()))
+        return left
+
+    def parse_sum(self):
+        node = self.parse_product()
+        while self.peek()[0] == "op" and self.peek()[1] in "+-":
+            op = self.take()[1]
+            node = Arith(op, _expect_num(node), _expect_num(self.parse_product()))
+        return node
+
+    def parse_product(self):
+        node = self.parse_atom()
+        while self.peek()[0] == "op" and self.peek()[1] in "*/":
+            op = self.take()[1]
+            node = Arith(op, _expect_num(node), _expect_num(self.parse_atom()))
+        return node
+
+    def parse_atom(self):
+        kind, value = self.peek()
+        if kind == "num":
+            self.take()
+            return Number(value)
+        if (kind, value) == ("op", "-"):
+            self.take()
+            return Arith("-", Number(0.0), _expect_num(self.parse_atom()))
+        if (kind, value) == ("op", "("):
+            self.take()
+            node = self.parse_or()
+            self.take("op", ")")
+            return node
+        if kind == "word":
+            self.take()
+            if value in EXIT_FLAGS:
+                if not self.allow_flags:
+                    raise ValueError(f"❌ '{value.upper()}' is only allowed in exit rules")
+                return Flag(value)
+            params = []
+            if self.peek() == ("op", "("):
+                self.take()
+                while self.peek() != ("op", ")"):
+                    params.append(self.take("num")[1])
+                    if self.peek() == ("op", ","):
+                        self.take()
+                self.take("op", ")")
+            return Indicator(value, tuple(params))
+        raise ValueError(f"❌ Unexpected '{value if value is not None else 'end of rule'}' in rule")
+
+
+def _expect_num(node):
+    if not isinstance(node, NUMERIC):
+        raise ValueError("❌ A condition was used where a number is expected")
+    return node
+
+
+def _expect_bool(node):
+    if isinstance(node, NUMERIC):
+        raise ValueError("❌ A bare value was used where a condition is expected (missing comparison?)")
+    return node
+
+
+def _indicators_in(node, found):
+    if isinstance(node, Indicator):
+        found.add((node.name, node.params))
+    elif isinstance(node, (Arith, Compare, Cross)):
+        _indicators_in(node.left, found)
+        _indicators_in(node.right, found)
+    elif isinstance(node, Logic):
+        for item in node.items:
+            _indicators_in(item, found)
+    elif isinstance(node, Not):
+        _indicators_in(node.item, found)
+    return found
+
+
+def _flags_in(node, found):
+    if isinstance(node, Flag):
+        found.add(node.name)
+    elif isinstance(node, (Arith, Compare, Cross)):
+        _flags_in(node.left, found)
+        _flags_in(node.right, found)
+    elif isinstance(node, Logic):
+        for item in node.items:
+            _flags_in(item, found)
+    elif isinstance(node, Not):
+        _flags_in(node.item, found)
+    return found
+
+
+def _or_terms(node):
+    """Top-level `or` alternatives of a rule, with nested (parenthesised) ors flattened."""
+    if isinstance(node, Logic) and node.op == "or":
+        return [t for item in node.items for t in _or_terms(item)]
+    return [node]
+
+
+def _split_exit(node):
+    """
+    Exit rule -> (SL/TP flags, condition or None). The flags mean "also exit on the
+    stop / target", so they may only be alternatives of the top-level `or`.
+    """
+    terms = _or_terms(node)
+    flags = {t.name for t in terms if isinstance(t, Flag)}
+    rest = [t for t in terms if not isinstance(t, Flag)]
+    if any(_flags_in(t, set()) for t in rest):
+        raise ValueError("❌ SL / TP can only be joined to an exit rule with 'or' (e.g. 'RSI > 70 or SL'), "
+                         "not used under 'and' / 'not'.")
+    if not rest:
+        return flags, None
+    return flags, rest[0] if len(rest) == 1 else Logic("or", tuple(rest))
+
+
+def _evaluate(node, values, n):
+    """Evaluate a node over whole columns."""
+    if isinstance(node, Number):
+        return node.value
+    if isinstance(node, Indicator):
+        return values[(node.name, node.params)]
+    if isinstance(node, Arith):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return ARITH_OPS[node.op](_evaluate(node.left, values, n), _evaluate(node.right, values, n))
+    if isinstance(node, Compare):
+        with np.errstate(invalid="ignore"):
+            return np.broadcast_to(COMPARE_OPS[node.op](_evaluate(node.left, values, n),
+                                                        _evaluate(node.right, values, n)), (n,))
+    if isinstance(node, Cross):
+        left = np.broadcast_to(_evaluate(node.left, values, n), (n,))
+        right = np.broadcast_to(_evaluate(node.right, values, n), (n,))
+        diff = left - right if node.above else right - left
+        with np.errstate(invalid="ignore"):
+            out = (diff > 0) & (np.concatenate([[np.nan], diff[:-1]]) <= 0)
+        return out
+    if isinstance(node, Logic):
+        parts = [_evaluate(i, values, n) for i in node.items]
+        return np.logical_or.reduce(parts) if node.op == "or" else np.logical_and.reduce(parts)
+    if isinstance(node, Not):
+        return ~_evaluate(node.item, values, n)
+    raise TypeError(f"Unknown rule node {node!r}")
+
+
+def rules_hash(rules: dict) -> str:
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+
+def compile_rules(rules: dict) -> dict:
+    """
+    Parse the JSON `entry` / `exit` expressions into typed ASTs and list the
+    indicators they need. Results are cached by rule hash.
+    """
+    key = rules_hash(rules)
+    if key not in _compiled:
+        if not rules.get("entry"):
+            raise ValueError("❌ Rules need an 'entry' expression.")
+        entry = _Parser(str(rules["entry"])).parse()
+        flags, exit_ = EXIT_FLAGS, None
+        if rules.get("exit"):
+            # SL / TP are handled by the trade simulator; only the rest is evaluated per bar
+            flags, exit_ = _split_exit(_Parser(str(rules["exit"]), allow_flags=True).parse())
+        direction = str(rules.get("direction", "Buy")).capitalize()
+        if direction not in ("Buy", "Sell"):
+            raise ValueError("❌ 'direction' must be Buy or Sell.")
+
+        indicators = sorted(_indicators_in(entry, set()) | (_indicators_in(exit_, set()) if exit_ else set()))
+        # Unknown names and wrong parameter counts fail here, not halfway through a backtest
+        for name, params in indicators:
+            check_indicator(name, params)
+
+        _compiled[key] = {
+            "entry": entry,
+            "exit": exit_,
+            "indicators": indicators,
+            "use_sl": "sl" in flags,
+            "use_tp": "tp" in flags,
+            "direction": direction,
+            "sl_pct": float(rules.get("sl_pct", 1.0)),
+            "tp_pct": float(rules.get("tp_pct", 2.0)),
+        }
+    return _compiled[key]
+
+
+def evaluate_rules(df, rules: dict, cache=None):
+    """Whole-column entry and exit masks for `rules` over `df`."""
+    compiled = compile_rules(rules)
+    values = compute_indicators(df, compiled["indicators"], cache)
+    n = len(df)
+    entry = _evaluate(compiled["entry"], values, n)
+    exit_ = _evaluate(compiled["exit"], values, n) if compiled["exit"] is not None else np.zeros(n, dtype=bool)
+    return compiled, np.asarray(entry, dtype=bool), np.asarray(exit_, dtype=bool)
+
 
 def run_custom_strategy(df, rules: dict):
-    df = df.copy()
-    df['macd'] = MACD(df['Close']).macd()
-    df['signal'] = MACD(df['Close']).macd_signal()
-    df['rsi'] = RSIIndicator(df['Close']).rsi()
+    compiled, entry_mask, exit_mask = evaluate_rules(df, rules)
+
+    close = df['Close'].to_numpy(dtype=np.float64)
+    high, low = df['High'].values, df['Low'].values
+    times = df.index
+    direction = compiled["direction"]
+    sign = 1 if direction == "Buy" else -1
+    exit_bars = np.flatnonzero(exit_mask)
 
-    # Simple logic evaluator
+    # One position at a time: walk the entry signals, skipping those while a trade is open
     trades = []
-    for i in range(1, len(df)):
-        entry_cond = (
-            df['macd'].iloc[i] > df['signal'].iloc[i] and
-            df['rsi'].iloc[i] < 30
-        ) if rules["entry"] == "MACD > Signal and RSI < 30" else False
-
-        if entry_cond:
-            entry = df['Close'].iloc[i]
-            sl = entry * 0.99
-            tp = entry * 1.02
-            trades.append({
-                "Type": "Buy",
-                "Entry": round(entry, 5),
-                "SL": round(sl, 5),
-                "TP": round(tp, 5),
-                "Date": df.index[i].strftime("%Y-%m-%d %H:%M")
-            })
+    next_free = 1
+    for i in np.flatnonzero(entry_mask).tolist():
+        if i < next_free:
+            continue
+        entry = close[i]
+        sl = entry * (1 - sign * compiled["sl_pct"] / 100)
+        tp = entry * (1 + sign * compiled["tp_pct"] / 100)
+
+        j, stopped = first_exit(high, low, i, direction,
+                                 sl if compiled["use_sl"] else -sign * np.inf,
+                                 tp if compiled["use_tp"] else sign * np.inf)
+        k = exit_bars[np.searchsorted(exit_bars, i, side="right")] if exit_bars.size and exit_bars[-1] > i else -1
+
+        if k >= 0 and (j < 0 or k < j):
+            exit_idx, exit_price, result = k, close[k], "exit"
+        elif j >= 0:
+            exit_idx, exit_price, result = j, (sl if stopped else tp), ("loss" if stopped else "win")
+        else:
+            exit_idx, exit_price, result = len(df) - 1, close[-1], "open"
+
+        trades.append({
+            "Type": direction,
+            "Entry": round(entry, 5),
+            "SL": round(sl, 5),
+            "TP": round(tp, 5),
+            "Date": times[i].strftime("%Y-%m-%d %H:%M"),
+            "Exit": round(exit_price, 5),
+            "Exit Date": times[exit_idx].strftime("%Y-%m-%d %H:%M"),
+            "Result": result,
+            "profit": round(sign * (exit_price - entry), 5)
+        })
+        next_free = exit_idx + 1
 
     return trades
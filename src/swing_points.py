@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+SETTLE_SPANS = 10
+
+
+class SwingPointIndex:
+    """
+    Local extrema (find_peaks) of price columns, computed once per
+    (column, kind, distance) and shared by S/R clustering and pattern detection.
+    Bar positions match the DataFrame the index was built from.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._times = df.index.values
+        self._values = {c: df[c].to_numpy(dtype=np.float64) for c in PRICE_COLUMNS if c in df.columns}
+        self._cache = {}
+        self._parent = None
+        self._start = 0
+
+    def __len__(self):
+        return len(self._times)
+
+    def values(self, column) -> np.ndarray:
+        return self._values[column]
+
+    def peaks(self, column, distance) -> np.ndarray:
+        return self._extrema(column, "peak", distance)
+
+    def troughs(self, column, distance) -> np.ndarray:
+        return self._extrema(column, "trough", distance)
+
+    def _signed(self, column, kind):
+        values = self._values[column]
+        return values if kind == "peak" else -values
+
+    def _extrema(self, column, kind, distance):
+        if self._parent is not None:
+            idx = self._parent._extrema(column, kind, distance)
+            return idx[idx >= self._start] - self._start
+
+        key = (column, kind, distance)
+        if key not in self._cache:
+            self._cache[key], _ = find_peaks(self._signed(column, kind), distance=distance)
+        return self._cache[key]
+
+    def extend(self, new_bars: pd.DataFrame):
+        """
+        Append confirmed bars and update every cached extrema set.
+        Only the last SETTLE_SPANS * distance bars before the append are
+        rescanned (with as much context again); older extrema are treated as
+        settled, since find_peaks' distance filter rarely cascades that far.
+        """
+        if new_bars.empty:
+            return self
+
+        n_old = len(self._times)
+        self._times = np.concatenate([self._times, new_bars.index.values])
+        for c in self._values:
+            self._values[c] = np.concatenate([self._values[c], new_bars[c].to_numpy(dtype=np.float64)])
+
+        for (column, kind, distance), old in self._cache.items():
+            cut = max(0, n_old - 1 - SETTLE_SPANS * distance)
+            lo = max(0, cut - SETTLE_SPANS * distance)
+            fresh, _ = find_peaks(self._signed(column, kind)[lo:], distance=distance)
+            fresh = fresh + lo
+            fresh = fresh[fresh >= cut]
+            kept = old[old < cut]
+
+            # Keep the spacing rule across the seam: the higher extremum wins
+            signed = self._signed(column, kind)
+            while len(kept) and len(fresh) and fresh[0] - kept[-1] < distance:
+                if signed[fresh[0]] > signed[kept[-1]]:
+                    kept = kept[:-1]
+                else:
+                    fresh = fresh[1:]
+
+            self._cache[(column, kind, distance)] = np.concatenate([kept, fresh]).astype(old.dtype)
+        return self
+
+    def tail(self, n) -> "SwingPointIndex":
+        """
+        View over the last n bars with extrema positions shifted to match.
+        Extrema requested through the view are computed and cached on this index.
+        """
+        start = max(0, len(self._times) - n)
+        view = SwingPointIndex.__new__(SwingPointIndex)
+        view._times = self._times[start:]
+        view._values = {c: v[start:] for c, v in self._values.items()}
+        view._cache = {}
+        view._parent = self
+        view._start = start
+        return view
+
+    def sync(self, df: pd.DataFrame) -> "SwingPointIndex":
+        """
+        Streaming helper: absorb the confirmed bars of a freshly fetched window
+        (everything but the still-forming last bar) and return a view aligned
+        with that window's first bar.
+        """
+        confirmed = df.iloc[:-1]
+        if len(confirmed) == 0:
+            return SwingPointIndex(confirmed)
+
+        first = confirmed.index.values[0]
+        last = self._times[-1] if len(self._times) else None
+        if last is None or first < self._times[0] or first > last:
+            # No overlap with what we hold, start over from this window
+            self.__init__(confirmed)
+        else:
+            self.extend(confirmed[confirmed.index.values > last])
+
+        pos = np.searchsorted(self._times, first)
+        return self.tail(len(self._times) - pos)
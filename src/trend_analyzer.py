@@ -1,13 +1,18 @@
 import pandas as pd
 import numpy as np
 from ta.trend import MACD
+from src.indicators import compute_indicators
+from src.profiling import profiled
 
-def detect_trend(df: pd.DataFrame, short_window=20, long_window=50) -> dict:
-    df = df.copy()
 
-    # Calculate Moving Averages
-    df['SMA_short'] = df['Close'].rolling(window=short_window).mean()
-    df['SMA_long'] = df['Close'].rolling(window=long_window).mean()
+def trend_indicator_keys(short_window=20, long_window=50) -> list:
+    return [("sma", (short_window,)), ("sma", (long_window,)), ("macd", ()), ("signal", ())]
+
+
+@profiled()
+def detect_trend(df: pd.DataFrame, short_window=20, long_window=50, cache=None) -> dict:
+    """`cache` is an indicator cache (see compute_indicators) shared with other stages."""
+    arrays = compute_indicators(df, trend_indicator_keys(short_window, long_window), cache)
 
     # Price Slope
     y = df['Close'].tail(20).values
@@ -15,11 +20,8 @@ def detect_trend(df: pd.DataFrame, short_window=20, long_window=50) -> dict:
     slope = np.polyfit(x, y, 1)[0]
 
     # MACD
-    macd = MACD(close=df['Close'])
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    macd_value = df['macd'].iloc[-1]
-    macd_signal = df['macd_signal'].iloc[-1]
+    macd_value = arrays[("macd", ())][-1]
+    macd_signal = arrays[("signal", ())][-1]
 
     # Price structure
     recent_highs = df['High'].tail(10)
@@ -29,8 +31,8 @@ def detect_trend(df: pd.DataFrame, short_window=20, long_window=50) -> dict:
     is_lh = recent_highs.is_monotonic_decreasing
     is_ll = recent_lows.is_monotonic_decreasing
 
-    sma_short = df['SMA_short'].iloc[-1]
-    sma_long = df['SMA_long'].iloc[-1]
+    sma_short = arrays[("sma", (short_window,))][-1]
+    sma_long = arrays[("sma", (long_window,))][-1]
     price = df['Close'].iloc[-1]
 
     trend = "Sideways"
@@ -89,3 +91,82 @@ def detect_trend(df: pd.DataFrame, short_window=20, long_window=50) -> dict:
         "confidence": round(min(confidence, 0.95), 2),
         "justification": "; ".join(reasons)
     }
+
+
+def _rolling_slope(y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Least-squares slope of every trailing window, same as polyfit(x, y, 1)[0].
+    In closed form the slope is sum((k - k_mean) * y_k) / sum((k - k_mean)^2),
+    a fixed linear filter, so one convolution covers all windows.
+    """
+    k = np.arange(window, dtype=np.float64)
+    weights = (k - k.mean()) / ((k - k.mean()) ** 2).sum()
+    slope = np.full(len(y), np.nan)
+    if len(y) >= window:
+        slope[window - 1:] = np.convolve(y, weights[::-1], mode="valid")
+    return slope
+
+
+def _rolling_all(flags: np.ndarray, window: int) -> np.ndarray:
+    """True where the last `window` flags are all True."""
+    counts = np.concatenate([[0], np.cumsum(flags, dtype=np.int64)])
+    out = np.zeros(len(flags), dtype=bool)
+    if len(flags) >= window:
+        out[window - 1:] = (counts[window:] - counts[:-window]) == window
+    return out
+
+
+def detect_trend_series(df: pd.DataFrame, short_window=20, long_window=50,
+                        slope_window=20, structure_window=10) -> pd.DataFrame:
+    """
+    Per-bar version of detect_trend: the same four votes (MA alignment, slope,
+    MACD, HH/HL structure) evaluated for every bar at once.
+    Returns trend, confidence and the vote counts indexed like `df`.
+    """
+    close = df['Close']
+    sma_short = close.rolling(window=short_window).mean().to_numpy()
+    sma_long = close.rolling(window=long_window).mean().to_numpy()
+
+    slope = _rolling_slope(close.to_numpy(dtype=np.float64), slope_window)
+
+    macd = MACD(close=close)
+    macd_value = macd.macd().to_numpy()
+    macd_signal = macd.macd_signal().to_numpy()
+
+    # tail(n).is_monotonic_* <=> the last n - 1 diffs all have the same sign (or are zero)
+    high_diff = np.diff(df['High'].to_numpy(dtype=np.float64), prepend=np.nan)
+    low_diff = np.diff(df['Low'].to_numpy(dtype=np.float64), prepend=np.nan)
+    is_hh = _rolling_all(high_diff >= 0, structure_window - 1)
+    is_hl = _rolling_all(low_diff >= 0, structure_window - 1)
+    is_lh = _rolling_all(high_diff <= 0, structure_window - 1)
+    is_ll = _rolling_all(low_diff <= 0, structure_window - 1)
+
+    bullish = (
+        (sma_short > sma_long).astype(np.int8)
+        + (slope > 0)
+        + (macd_value > macd_signal)
+        + (is_hh & is_hl)
+    )
+    bearish = (
+        (sma_short < sma_long).astype(np.int8)
+        + (slope < 0)
+        + (macd_value < macd_signal)
+        + (~(is_hh & is_hl) & is_lh & is_ll)
+    )
+
+    up = bullish >= 2
+    down = ~up & (bearish >= 2)
+    confidence = np.select(
+        [up, down],
+        [0.6 + 0.1 * (bullish - 2), 0.6 + 0.1 * (bearish - 2)],
+        default=0.5
+    )
+    trend = np.select([up, down], [1, 2], default=0)
+
+    return pd.DataFrame({
+        "trend": pd.Categorical.from_codes(trend, ["Sideways", "Uptrend", "Downtrend"]),
+        "confidence": np.round(np.minimum(confidence, 0.95), 2),
+        "bullish_signals": bullish,
+        "bearish_signals": bearish,
+        "slope": slope
+    }, index=df.index)
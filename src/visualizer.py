@@ -5,7 +5,10 @@ import warnings
 from ta.volatility import AverageTrueRange
 import plotly.graph_objects as go
 import plotly.io as pio
+from src.bars import as_frame
+from src.profiling import profiled
 
+@profiled()
 def plot_chart_with_levels(
     df,
     levels,
@@ -17,11 +20,11 @@ def plot_chart_with_levels(
     show_bollinger=True,
     interactive=False
 ):
-    df = df.copy()
     required_cols = ['Open', 'High', 'Low', 'Close']
     if 'Volume' in df.columns:
         required_cols.append('Volume')
-    df = df[required_cols]
+    # as_frame returns a separate frame object, so re-indexing below does not mutate the caller's frame
+    df = as_frame(df, required_cols)
     df.index = pd.to_datetime(df.index)
     df.index.name = 'Date'
 
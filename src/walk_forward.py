@@ -0,0 +1,119 @@
+import os
+import itertools
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.backtester import backtest_summary
+from src.strategies import resolve_strategy
+from src.shared_bars import share_bars, resolve_bars
+
+METRICS = ("profit", "winrate", "total")
+
+# Per-process state: the frame and its indicator cache, shared by every fold the process runs
+_worker = {}
+
+
+def expand_grid(param_grid: dict) -> list:
+    """{"fast": [5, 10], "slow": [30, 50]} -> every combination as a params dict."""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[k] for k in names))]
+
+
+def make_folds(n, train_bars=2000, test_bars=500, step=None) -> list:
+    """Rolling (train_start, train_end, test_start, test_end) bar ranges; test follows train."""
+    step = step or test_bars
+    return [(start, start + train_bars, start + train_bars, start + train_bars + test_bars)
+            for start in range(0, n - train_bars - test_bars + 1, step)]
+
+
+def _init_worker(data):
+    _worker.clear()
+    _worker.update(df=resolve_bars(data), cache={})
+
+
+def _run_fold(fold, strategy, param_sets, metric, min_trades):
+    df, cache = _worker["df"], _worker["cache"]
+    train_start, train_end, test_start, test_end = fold
+
+    best, best_train = None, None
+    for params in param_sets:
+        stats = backtest_summary(df, strategy, params, cache, train_start, train_end)
+        if stats["total"] < min_trades:
+            continue
+        if best_train is None or stats[metric] > best_train[metric]:
+            best, best_train = params, stats
+
+    if best is None:
+        return {"fold": fold, "params": None, "train": None, "test": None}
+    test = backtest_summary(df, strategy, best, cache, test_start, test_end)
+    return {"fold": fold, "params": best, "train": best_train, "test": test}
+
+
+def walk_forward_optimize(
+    df: pd.DataFrame,
+    strategy="MA Crossover",
+    param_grid=None,
+    train_bars=2000,
+    test_bars=500,
+    step=None,
+    metric="profit",
+    min_trades=5,
+    max_workers=None
+) -> dict:
+    """
+    Walk-forward optimization of a registered strategy. Every parameter set
+    from `param_grid` is scored on each rolling train window, and the best
+    one is evaluated on the test window that follows. Folds run in a process
+    pool, and each process keeps one indicator cache over the full history,
+    so overlapping folds reuse indicator columns. `max_workers=1` runs in-process.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"❌ Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}")
+    param_sets = expand_grid(param_grid or {})
+    for params in param_sets:
+        resolve_strategy(strategy, params)
+
+    folds = make_folds(len(df), train_bars, test_bars, step)
+    if not folds:
+        raise ValueError(f"❌ Need at least {train_bars + test_bars} bars for one fold, got {len(df)}.")
+
+    run = partial(_run_fold, strategy=strategy, param_sets=param_sets, metric=metric, min_trades=min_trades)
+    if max_workers == 1:
+        _init_worker(df)
+        results = [run(fold) for fold in folds]
+    else:
+        # Workers map the bars from shared memory rather than each unpickling the frame
+        with share_bars(df) as shared, ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                           initargs=(shared.handle,)) as pool:
+            # Contiguous chunks keep neighbouring (overlapping) folds on the same worker cache
+            chunksize = max(1, len(folds) // (4 * (max_workers or os.cpu_count() or 1)))
+            results = list(pool.map(run, folds, chunksize=chunksize))
+
+    index = df.index
+    rows = []
+    for i, r in enumerate(results):
+        train_start, train_end, test_start, test_end = r["fold"]
+        train, test = r["train"] or {}, r["test"] or {}
+        rows.append({
+            "fold": i,
+            "train_start": index[train_start],
+            "train_end": index[train_end - 1],
+            "test_start": index[test_start],
+            "test_end": index[test_end - 1],
+            "params": r["params"],
+            "train_profit": train.get("profit"),
+            "train_trades": train.get("total", 0),
+            "test_profit": test.get("profit", 0.0),
+            "test_trades": test.get("total", 0),
+            "test_wins": test.get("wins", 0),
+            "test_winrate": test.get("winrate", 0),
+        })
+
+    folds_df = pd.DataFrame(rows)
+    oos_trades = int(folds_df["test_trades"].sum())
+    return {
+        "folds": folds_df,
+        "oos_profit": round(float(folds_df["test_profit"].sum()), 5),
+        "oos_trades": oos_trades,
+        "oos_winrate": round(100 * folds_df["test_wins"].sum() / oos_trades, 2) if oos_trades else 0
+    }
@@ -0,0 +1,96 @@
+import math
+import numpy as np
+import pytest
+from benchmarks.synthetic import synthetic_ohlcv
+from src.backtester import generate_trades, resolve_trade_exits, run_backtest, optimize_ma_crossover
+from src.strategies import STRATEGIES
+
+EXIT_PARAMS = {
+    "default": {},
+    "tight_pct": {"sl_pct": 0.1, "tp_pct": 0.2},
+    "atr_levels": {"sl_atr": 1.5, "tp_atr": 3.0},
+    "trailing": {"sl_atr": 2.0, "tp_atr": 6.0, "trail_atr": 1.0},
+    "max_bars": {"sl_pct": 0.3, "tp_pct": 0.6, "max_bars": 60},
+    "trailing_max_bars": {"sl_atr": 1.5, "tp_atr": 3.0, "trail_atr": 1.0, "max_bars": 120},
+}
+
+
+@pytest.fixture(scope="module")
+def df():
+    return synthetic_ohlcv(3_000, seed=7)
+
+
+def brute_force_exit(high, low, close, trade):
+    """
+    Bar-by-bar reference: the stop is max(SL, best price since entry before this
+    bar - trail), checked before the target; a time limit exits at that bar's close.
+    Returns (exit bar or -1, exit price, reason: 0 open, 1 stop, 2 target, 3 time).
+    """
+    n, e = len(high), trade["entry_idx"]
+    buy = trade["Type"] == "Buy"
+    sign = 1.0 if buy else -1.0
+    stop0, target, best = sign * trade["SL"], sign * trade["TP"], sign * trade["Entry"]
+    trail = trade.get("Trail", 0.0) or math.inf
+    max_bars = trade.get("Max Bars", 0)
+    last = e + max_bars if max_bars > 0 else n - 1
+    timed = max_bars > 0 and last <= n - 1
+    for t in range(e + 1, min(last, n - 1) + 1):
+        fav, adv = (high[t], low[t]) if buy else (-low[t], -high[t])
+        stop = max(stop0, best - trail)
+        if adv <= stop:
+            return t, sign * stop, 1
+        if fav >= target:
+            return t, trade["TP"], 2
+        best = max(best, fav)
+    if timed:
+        return last, close[last], 3
+    return -1, math.nan, 0
+
+
+@pytest.mark.parametrize("exits", EXIT_PARAMS)
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_run_backtest_matches_bar_loop(df, strategy, exits):
+    params = EXIT_PARAMS[exits]
+    trades = generate_trades(df, strategy, params)
+    ledger = run_backtest(df, strategy=strategy, params=params, log=False, use_cache=False)["trades"]
+    assert len(ledger) == len(trades)
+
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    expected = np.array([brute_force_exit(high, low, close, t) for t in trades], dtype=float).reshape(-1, 3)
+    c = ledger.columns
+    np.testing.assert_array_equal(c["exit_idx"], expected[:, 0])
+    np.testing.assert_array_equal(c["reason"], expected[:, 2])
+    np.testing.assert_allclose(c["exit_price"], expected[:, 1], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("strategy", ["MA Crossover", "RSI Reversal"])
+def test_scan_and_pyramid_paths_agree(df, strategy):
+    # A few trades without a cache take the forward scan, with a cache the pyramids
+    trades = generate_trades(df, strategy, EXIT_PARAMS["tight_pct"])
+    few = trades[::max(1, len(trades) // 5)][:5]
+    scanned = resolve_trade_exits(df, few)
+    indexed = resolve_trade_exits(df, few, cache={})
+    for key in scanned:
+        np.testing.assert_array_equal(scanned[key], indexed[key])
+
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    expected = [brute_force_exit(high, low, close, t)[0] for t in few]
+    np.testing.assert_array_equal(scanned["exit_idx"], [j if j >= 0 else len(df) - 1 for j in expected])
+
+
+@pytest.mark.parametrize("fast, slow", [(5, 20), (10, 30), (10, 50), (20, 50)])
+def test_ma_sweep_matches_run_backtest(df, fast, slow):
+    pct = {"sl_pct": 0.1, "tp_pct": 0.2}
+    sweep = optimize_ma_crossover(df, short_windows=[fast], long_windows=[slow], **pct)
+    row = sweep.iloc[0]
+    result = run_backtest(df, strategy="MA Crossover", params={"fast": fast, "slow": slow, **pct},
+                          log=False, use_cache=False)
+
+    assert (row["Short"], row["Long"]) == (fast, slow)
+    assert row["Trades"] == result["total"]
+    assert row["Wins"] == result["wins"]
+    assert row["Losses"] == result["losses"]
+    # The ledger rounds each trade's profit to 5 decimals, so compare against the exact per-trade sum
+    c = result["trades"].columns
+    exact = np.where(c["reason"] > 0, np.where(c["is_buy"], 1, -1) * (c["exit_price"] - c["entry"]), 0.0).sum()
+    assert row["Total Profit"] == pytest.approx(round(float(exact), 5), abs=1e-9)
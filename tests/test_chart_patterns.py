@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import synthetic_ohlcv
+from src.backtester import generate_trades
+from src.chart_patterns import pattern_signal_series
+
+
+@pytest.fixture(scope="module")
+def df():
+    return synthetic_ohlcv(4_000, seed=3)
+
+
+def test_signal_only_uses_bars_up_to_each_bar(df):
+    full = pattern_signal_series(df).to_numpy()
+    assert np.count_nonzero(full) > 0
+    # Cutting the history anywhere must not change (or add) any earlier signal
+    for cut in range(300, len(df), 250):
+        np.testing.assert_array_equal(pattern_signal_series(df.iloc[:cut]).to_numpy(), full[:cut])
+
+
+def test_pattern_trigger_trades_pattern_events(df):
+    signal = pattern_signal_series(df).to_numpy()
+    trades = generate_trades(df, "Pattern Trigger", {})
+    assert len(trades) > 0
+    for t in trades:
+        assert signal[t["entry_idx"]] == (1 if t["Type"] == "Buy" else -1)
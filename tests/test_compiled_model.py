@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+from src.compiled_model import export_compiled_model, load_compiled_model, predict_compiled, predict_proba_compiled
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_compiled_probabilities_match_predict_proba(tmp_path, n_classes):
+    rng = np.random.default_rng(n_classes)
+    X = rng.normal(size=(600, 6))
+    label = (X[:, 0] + X[:, 1] ** 2 > 0.5).astype(int)
+    if n_classes == 3:
+        label += X[:, 2] > 1
+    y = np.array(["Buy", "Hold", "Sell"])[label]
+    model = GradientBoostingClassifier(n_estimators=40, max_depth=3, random_state=0).fit(X[:400], y[:400])
+
+    path = export_compiled_model(model, out_path=str(tmp_path / "model.npz"), check_X=X[400:])
+    compiled = load_compiled_model(path)
+    np.testing.assert_allclose(predict_proba_compiled(compiled, X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(predict_compiled(compiled, X), model.predict(X))
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+import src.journal as journal
+import src.result_cache as rc
+from benchmarks.synthetic import synthetic_ohlcv
+from src.backtester import run_backtest
+
+
+@pytest.fixture(autouse=True)
+def journal_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "JOURNAL_DB", str(tmp_path / "journal.db"))
+    monkeypatch.setattr(journal, "JOURNAL_FILE", str(tmp_path / "journal.csv"))
+    monkeypatch.setattr(journal, "_ready", set())
+    monkeypatch.setattr(rc, "CACHE_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(rc, "ENABLED", True)
+    monkeypatch.setattr(rc, "_memory", type(rc._memory)())
+    monkeypatch.setattr(rc, "_disk_bytes", {})
+    return tmp_path
+
+
+def _write_csv(path, n):
+    pd.DataFrame({
+        "Strategy": ["Live Signal" if i % 2 else "RSI Reversal" for i in range(n)],
+        "Entry": [1.1 + i / 1000 for i in range(n)],
+        "SL": 1.09, "TP": 1.12, "Result": "win", "RR": 2.0,
+        "Date": [f"2024-01-01 00:{i:02d}" for i in range(n)],
+        "Screenshot": None,
+    }).to_csv(path, index=False)
+
+
+def test_csv_is_imported_once(journal_files):
+    _write_csv(journal.JOURNAL_FILE, 6)
+    assert journal.query_trades()["total"] == 6
+    assert journal.query_trades(source="live")["total"] == 3
+
+    # A new process (nothing marked ready) must not import the CSV again
+    journal._ready.clear()
+    assert journal.query_trades()["total"] == 6
+
+
+def test_same_run_is_logged_once():
+    df = synthetic_ohlcv(3_000, seed=2)
+    first = run_backtest(df, strategy="RSI Reversal")
+    logged = journal.query_trades(source="backtest", page_size=None)
+    assert logged["total"] == first["total"] > 0
+    assert logged["rows"]["Run"].nunique() == 1
+
+    # Same data, params and code -> same run id, whether served from memory or recomputed
+    run_backtest(df, strategy="RSI Reversal")
+    rc.clear_results()
+    run_backtest(df, strategy="RSI Reversal")
+    assert journal.query_trades(source="backtest")["total"] == first["total"]
+
+    # Without the result cache every run gets its own id
+    run_backtest(df, strategy="RSI Reversal", use_cache=False)
+    assert journal.query_trades(source="backtest")["total"] == 2 * first["total"]
+
+
+def test_pages_cover_every_match_once():
+    rows = [(1.1, 1.09, 1.12, "win" if i % 3 else "loss", 2.0, f"2024-01-01 {i // 60:02d}:{i % 60:02d}")
+            for i in range(250)]
+    journal.log_trades("MA Crossover", rows, run_id="backtest-1")
+    journal.log_trade("Live Signal", 1.1, 1.09, 1.12, "open", 2.0, "2024-01-02 00:00")
+
+    pages = [journal.query_trades(strategy="MA Crossover", page=p, page_size=100) for p in range(3)]
+    assert [len(p["rows"]) for p in pages] == [100, 100, 50]
+    assert all(p["total"] == 250 for p in pages)
+    dates = pd.concat([p["rows"]["Date"] for p in pages])
+    assert dates.is_unique and dates.is_monotonic_decreasing
+
+    losses = journal.query_trades(result="loss", page_size=None)
+    assert losses["total"] == len(losses["rows"]) == 84
+    assert journal.query_trades(strategy="MA Crossover", page=3, page_size=100)["rows"].empty
+    assert journal.journal_values("strategy") == ["Live Signal", "MA Crossover"]
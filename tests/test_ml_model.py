@@ -0,0 +1,35 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("twelvedata")  # src.dataset_builder -> data_handler -> live_fetcher
+from src.dataset_builder import MANIFEST_FILE
+from src.ml_model import FEATURE_COLS, train_pooled_model
+
+
+def _write_dataset(path, labels):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(len(labels), len(FEATURE_COLS))), columns=FEATURE_COLS)
+    data["label"] = labels
+    data.to_parquet(path / "shard_0000.parquet", index=False)
+    (path / MANIFEST_FILE).write_text(json.dumps({"shards": [{"path": "shard_0000.parquet", "rows": len(labels)}]}))
+
+
+def test_batches_with_other_classes_are_reported(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Batches of 100: Buy/Sell, Buy/Sell, Buy only, Buy/Hold/Sell
+    labels = ["Buy", "Sell"] * 100 + ["Buy"] * 100 + ["Buy", "Hold", "Sell"] * 33 + ["Buy"]
+    _write_dataset(tmp_path, labels)
+
+    with pytest.warns(UserWarning, match=r"Skipped 2 of 4 batches .*#2 \['Buy'\], #3 \['Buy', 'Hold', 'Sell'\]"):
+        model = train_pooled_model(tmp_path, batch_size=100, trees_per_batch=2)
+    assert model.n_estimators == 4
+    assert list(model.classes_) == ["Buy", "Sell"]
+
+
+def test_no_warning_when_every_batch_is_used(tmp_path, monkeypatch, recwarn):
+    monkeypatch.chdir(tmp_path)
+    _write_dataset(tmp_path, ["Buy", "Sell"] * 200)
+    train_pooled_model(tmp_path, batch_size=100, trees_per_batch=2)
+    assert not [w for w in recwarn if "Skipped" in str(w.message)]
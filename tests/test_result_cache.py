@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pytest
+import src.result_cache as rc
+from benchmarks.synthetic import synthetic_ohlcv
+from src.backtester import run_backtest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(rc, "CACHE_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(rc, "ENABLED", True)
+    monkeypatch.setattr(rc, "_memory", type(rc._memory)())
+    monkeypatch.setattr(rc, "_disk_bytes", {})
+    monkeypatch.setattr(rc, "_code_version", {})
+    return tmp_path / "results"
+
+
+def _files(path):
+    return sorted(f for f in os.listdir(path) if f.endswith(".pkl")) if path.exists() else []
+
+
+def test_key_changes_with_code_files(tmp_path, monkeypatch):
+    source = tmp_path / "strategy_code.py"
+    source.write_text("THRESHOLD = 30\n")
+    # Absolute names are joined as-is onto the src/ directory
+    monkeypatch.setattr(rc, "CODE_FILES", (str(source),))
+    before = rc.result_key("run_backtest", "digest", "RSI Reversal", {"window": 14})
+
+    source.write_text("THRESHOLD = 25\n")
+    rc._code_version.clear()
+    after = rc.result_key("run_backtest", "digest", "RSI Reversal", {"window": 14})
+    assert before != after
+
+
+def test_swing_points_is_part_of_the_code_version():
+    assert "swing_points.py" in rc.CODE_FILES
+
+
+def test_disk_eviction_goes_down_to_ninety_percent(cache_dir, monkeypatch):
+    value = np.zeros(1_000)
+    rc.store_result("probe", value)
+    size = os.path.getsize(cache_dir / "probe.pkl")
+    rc.clear_results()
+
+    monkeypatch.setattr(rc, "DISK_LIMIT_BYTES", 10 * size)
+    for i in range(10):
+        rc.store_result(f"k{i:02d}", value)
+    assert len(_files(cache_dir)) == 10
+
+    # One file over the limit: the oldest are dropped until at most 90% of it is used
+    rc.store_result("k10", value)
+    files = _files(cache_dir)
+    assert sum(os.path.getsize(cache_dir / f) for f in files) <= rc.DISK_EVICT_TO * rc.DISK_LIMIT_BYTES
+    assert len(files) == 9 and "k10.pkl" in files
+    assert rc._disk_bytes[rc.CACHE_DIR] == 9 * size
+
+
+def test_disabled_cache_stores_and_returns_nothing(cache_dir, monkeypatch):
+    monkeypatch.setattr(rc, "ENABLED", False)
+    rc.store_result("key", {"total": 1})
+    assert rc.get_result("key") is None
+    assert _files(cache_dir) == []
+
+
+def test_summaries_stay_in_memory(cache_dir):
+    rc.store_result("summary", {"total": 3}, disk=False)
+    assert rc.get_result("summary", disk=False) == {"total": 3}
+    assert _files(cache_dir) == []
+
+
+def test_hits_are_private_copies():
+    stored = {"total": 2, "trades": [1, 2]}
+    rc.store_result("key", stored)
+    stored["trades"].append(3)
+
+    hit = rc.get_result("key")
+    assert hit == {"total": 2, "trades": [1, 2]}
+    hit["total"] = 0
+    hit["trades"].clear()
+    assert rc.get_result("key") == {"total": 2, "trades": [1, 2]}
+
+
+def test_mutating_a_cached_backtest_does_not_change_the_next_hit():
+    df = synthetic_ohlcv(3_000, seed=1)
+    first = run_backtest(df, strategy="RSI Reversal", log=False)
+    profit = first["trades"].profit.copy()
+    first["total"] = -1
+    first["trades"].profit[:] = 0
+
+    again = run_backtest(df, strategy="RSI Reversal", log=False)
+    assert again["total"] == len(profit)
+    np.testing.assert_array_equal(again["trades"].profit, profit)
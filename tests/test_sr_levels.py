@@ -0,0 +1,44 @@
+from collections import Counter
+import pytest
+from scipy.signal import find_peaks
+from benchmarks.synthetic import synthetic_ohlcv
+from src.sr_levels import identify_sr_levels
+
+
+def unclustered_levels(df, distance=5, round_to=0.0005):
+    """Previous identify_sr_levels: every rounded level on its own, nearest three on each side."""
+    highs, lows = df["High"].to_numpy(), df["Low"].to_numpy()
+    levels = Counter()
+    for idx in find_peaks(highs, distance=distance)[0]:
+        levels[round(round(highs[idx] / round_to) * round_to, 5)] += 1
+    for idx in find_peaks(-lows, distance=distance)[0]:
+        levels[round(round(lows[idx] / round_to) * round_to, 5)] += 1
+    price = df["Close"].iloc[-1]
+    return {
+        "support": sorted(((p, t) for p, t in levels.items() if p < price), reverse=True)[:3],
+        "resistance": sorted((p, t) for p, t in levels.items() if p > price)[:3],
+    }
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_zero_threshold_matches_unclustered_levels(seed):
+    df = synthetic_ohlcv(2_000, seed=seed)
+    got = identify_sr_levels(df, threshold=0)
+    expected = unclustered_levels(df)
+    for side in ("support", "resistance"):
+        assert [(lvl["price"], lvl["touches"]) for lvl in got[side]] == expected[side]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_clusters_are_reported_at_the_member_nearest_price(seed):
+    df = synthetic_ohlcv(2_000, seed=seed)
+    got = identify_sr_levels(df, threshold=0.01)
+    expected = unclustered_levels(df)
+    price = df["Close"].iloc[-1]
+    for side in ("support", "resistance"):
+        # The nearest level never moves away from price because of clustering
+        assert got[side][0]["price"] == expected[side][0][0]
+        assert got[side][0]["touches"] >= expected[side][0][1]
+        distances = [abs(lvl["price"] - price) for lvl in got[side]]
+        assert distances == sorted(distances)
+        assert all(b - a > 0.01 * price for a, b in zip(distances, distances[1:]))
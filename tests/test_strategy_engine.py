@@ -0,0 +1,55 @@
+import pytest
+from benchmarks.synthetic import synthetic_ohlcv
+from src.strategy_engine import compile_rules, evaluate_rules, run_custom_strategy
+
+
+@pytest.mark.parametrize("entry, message", [
+    ("RSI(14, 3) < 30", "RSI takes up to 1 parameter"),
+    ("close(5) > open", "CLOSE takes no parameters"),
+    ("MACD(12, 26, 9, 4) > Signal", "MACD takes up to 3 parameters"),
+    ("foo(3) > 1", "Unknown indicator 'foo'"),
+])
+def test_wrong_arity_fails_at_compile_time(entry, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rules({"entry": entry})
+
+
+def test_wrong_arity_in_exit_rule():
+    with pytest.raises(ValueError, match="SMA takes up to 1 parameter"):
+        compile_rules({"entry": "RSI(14) < 30", "exit": "close crosses below SMA(20, 2)"})
+
+
+def test_valid_arities_compile():
+    compiled = compile_rules({"entry": "MACD(12, 26, 9) crosses above Signal and RSI < 30",
+                              "exit": "BB_UPPER(20, 2) < close or SL"})
+    assert ("macd", (12.0, 26.0, 9.0)) in compiled["indicators"]
+    assert ("bb_upper", (20.0, 2.0)) in compiled["indicators"]
+
+
+@pytest.mark.parametrize("exit_rule", ["not SL and RSI > 70", "RSI > 70 and SL", "not (SL or TP)"])
+def test_flags_outside_top_level_or_are_rejected(exit_rule):
+    with pytest.raises(ValueError, match="SL / TP"):
+        compile_rules({"entry": "RSI < 30", "exit": exit_rule})
+
+
+@pytest.mark.parametrize("exit_rule, use_sl, use_tp", [
+    ("RSI > 70 or SL", True, False),
+    ("(SL or TP) or RSI > 70", True, True),
+    ("TP", False, True),
+    ("RSI > 70", False, False),
+])
+def test_top_level_flags_switch_stop_and_target(exit_rule, use_sl, use_tp):
+    compiled = compile_rules({"entry": "RSI < 30", "exit": exit_rule})
+    assert (compiled["use_sl"], compiled["use_tp"]) == (use_sl, use_tp)
+
+
+def test_flags_do_not_mask_the_exit_condition():
+    df = synthetic_ohlcv(5_000)
+    _, _, with_flag = evaluate_rules(df, {"entry": "RSI < 30", "exit": "RSI > 70 or SL"})
+    _, _, without = evaluate_rules(df, {"entry": "RSI < 30", "exit": "RSI > 70"})
+    assert with_flag.any() and (with_flag == without).all()
+
+
+def test_run_custom_strategy():
+    trades = run_custom_strategy(synthetic_ohlcv(5_000), {"entry": "RSI(14) < 30", "exit": "RSI(14) > 70 or SL or TP"})
+    assert trades and all(t["Result"] in ("win", "loss", "exit", "open") for t in trades)